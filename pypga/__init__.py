@@ -1,6 +1,15 @@
 """
 PYthon Programmable Gate Array
 """
-from . import boards, core, modules
+import importlib
+
+from . import core
 from .core import interface
 __version__ = "0.1.1"
+
+
+def __getattr__(name):
+    # boards and modules pull in the build toolchain and are only loaded when needed
+    if name in ("boards", "modules"):
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,16 @@
+import hashlib
 import logging
+import shutil
+import tempfile
+from pathlib import Path
 
 from pypga.core.migen_axi.platforms import redpitaya
 from misoc.integration import cpu_interface
 from pypga.boards.stemlab125_14.soc import StemlabSoc
 from pypga.core.builder import BaseBuilder
-from pypga.core.migen import AutoMigenModule
+from pypga.core.hashing import normalize_verilog
+from pypga.core.metrics import METRICS_FILENAME, collect_build_metrics, write_build_metrics
+from pypga.core.migen import AutoMigenModule, ElaborationProfile
 
 
 logger = logging.getLogger(__name__)
@@ -12,7 +18,9 @@ logger = logging.getLogger(__name__)
 
 class Builder(BaseBuilder):
     board = "stemlab125_14"
-    _build_results = ["bitstream.bin", "csr.csv"]
+    _build_results = ["bitstream.bin", "csr.csv", METRICS_FILENAME]
+    top = None
+    _source_directory = None
 
     def _create_platform(self):
         logger.debug("Creating platform")
@@ -24,6 +32,8 @@ class Builder(BaseBuilder):
             [
                 'write_cfgmem -force -format BIN -size 2 -interface SMAPx32 -disablebitswap -loadbit "up 0x0 ./top.bit" ./bitstream.bin',
                 'report_timing -file ./top_post_route_timing.rpt -sort_by group -max_paths 100 -path_type summary',
+                'report_timing_summary -file ./top_post_route_timing_summary.rpt -no_detailed_paths',
+                'report_utilization -file ./top_post_route_utilization.rpt',
             ]
         )
 
@@ -35,28 +45,61 @@ class Builder(BaseBuilder):
         with (self.build_path / "csr.csv").open("w") as f:
             f.write(cpu_interface.get_csr_csv(self.soc.get_csr_regions()))
 
-    def _get_hash(self):
-        """Returns a hash for the design, without building the actual design or requiring a build folder."""
+    def _export_metrics(self):
+        metrics = collect_build_metrics(
+            self.build_path,
+            self.toolchain,
+            board=self.board,
+            module=self.module_class.__name__,
+            hash=self.hash,
+        )
+        write_build_metrics(self.build_path, metrics)
+
+    def _elaborate(self):
+        """Creates platform, SoC and the migen module of the design. Only runs once per builder."""
+        if self.top is not None:
+            return
         self._create_platform()
         self._create_soc()
+        self.elaboration_profile = ElaborationProfile()
         self.top = AutoMigenModule(
-            self.module_class, platform=self._platform, soc=self.soc
+            self.module_class, platform=self._platform, soc=self.soc, profile=self.elaboration_profile
         )
         self.soc._attach_top(self.top)
-        # TODO: include SOC in hash, for example by running `soc.build(run=False) and hashing build path`
-        return self.top._hash()
+        logger.debug(f"Elaboration times for {self.module_class.__name__}:\n{self.elaboration_profile.report()}")
+
+    def _generate(self):
+        """Writes the Verilog sources and build scripts to a temporary folder. Only runs once per builder."""
+        if self._source_directory is not None:
+            return
+        self._elaborate()
+        self._source_directory = tempfile.TemporaryDirectory(prefix="pypga_")
+        self.toolchain.generate(self.soc, Path(self._source_directory.name))
+
+    def _get_hash(self):
+        """Returns a hash for the design, without building the actual design or requiring a build folder.
+
+        Verilog sources are normalized first, such that designs that only differ in the
+        order of their elaboration or in auto-generated signal names share the same hash.
+        """
+        self._generate()
+        hash_ = hashlib.sha256()
+        for filename in sorted(Path(self._source_directory.name).rglob("*")):
+            if filename.is_file():
+                hash_.update(filename.name.encode())
+                if filename.suffix == ".v":
+                    hash_.update(normalize_verilog(filename.read_text()).encode())
+                else:
+                    hash_.update(filename.read_bytes())
+        return hash_.hexdigest()
 
     def _build(self):
         """The actual steps required for building this design."""
-        self._create_platform()
-        self._create_soc()
-        self.top = AutoMigenModule(
-            self.module_class, platform=self._platform, soc=self.soc
-        )
-        self.soc._attach_top(self.top)
-        logger.debug("Running vivado build...")
+        self._generate()
+        shutil.copytree(self._source_directory.name, self.build_path, dirs_exist_ok=True)
         print("################ Re-Building the FPGA code as the FPGA code has been modified ##########")
-        self.soc.build(build_dir=self.build_path, run=True)
+        self.toolchain.run(self.build_path)
+        self._export_metrics()
         self._check_timing_constraints_are_met()
         self._export_register_addresses()
         logger.debug(f"Finished build for {self.__class__.__name__}.")
@@ -64,10 +107,8 @@ class Builder(BaseBuilder):
 
     def _check_timing_constraints_are_met(self):
         """Raises an exception if there are timing violations."""
-        with open(self.build_path / "vivado.log", "r") as file:
-            lines = [line.strip() for line in file.readlines()]
-            if "All user specified timing constraints are met." not in lines:
-                raise RuntimeError(
-                    "Timing constraints of this design could not be met. Please "
-                    "check the build logs for hints on how to improve timing."
-                )
+        if not self.toolchain.timing_constraints_met(self.build_path):
+            raise RuntimeError(
+                "Timing constraints of this design could not be met. Please "
+                "check the build logs for hints on how to improve timing."
+            )
@@ -1,9 +1,9 @@
-import hashlib
 import logging
 
 # only required for ADC clock PLL
 import migen
 from migen.fhdl.verilog import convert
+from pypga.core.hashing import hash_verilog
 from pypga.core.migen_axi.integration.soc_core import SoCCore
 from functools import partial
 # from migen.build.generic_platform import *
@@ -34,9 +34,4 @@ class StemlabSoc(SoCCore):
         This is used to decide whether a design has been build or still needs to be.
         """
         verilog = convert(self)
-        hash_ = hashlib.sha256()
-        hash_.update(verilog.main_source.encode())
-        for filename, content in verilog.data_files.items():
-            hash_.update(filename.encode())
-            hash_.update(content.encode())
-        return hash_.hexdigest()
+        return hash_verilog(verilog.main_source, sorted(verilog.data_files.items()))
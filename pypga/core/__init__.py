@@ -1,8 +1,9 @@
+from migen import Case, If
+from migen import Module as MigenModule
 from migen import Signal
 
 from .common import CustomizableMixin
 from .logic_function import is_logic, logic
-from .migen import If, Case, MigenModule, Signal
 from .module import Module, TopModule
 from .register import (
     BoolRegister,
@@ -0,0 +1,309 @@
+"""
+Bus-functional model of the AXI HP slave ports of the PS7, for simulation.
+
+:class:`AxiHpSlaveModel` services the AW, W and B channels of an AXI interface
+from a migen simulation generator and commits the written data to a numpy RAM
+image. Like the HP ports of the Zynq, write addresses and write data are
+accepted independently into FIFOs and committed at one beat per cycle. The
+AR and R channels are serviced from the same RAM image, at one beat per cycle.
+Backpressure (randomly deasserted ``ready``) and the latencies of the address
+and response paths are configurable, and the model counts the written bytes
+and the stall cycles of each channel, such that the throughput of DMA writers
+can be measured in simulation.
+
+:class:`SimAxiSoc` stands in for the SoC in :meth:`Module.sim` and
+:class:`SimInterface`, such that modules writing to ``soc.ps7.s_axi_hp*`` can
+be simulated::
+
+    soc = SimAxiSoc(backpressure=0.2)
+    result = DAQ(axi_hp_index=0).sim(1000, query, soc=soc)
+    print(soc.hp[0].statistics())
+"""
+import collections
+from typing import Dict, List
+
+import numpy as np
+from migen.sim import passive
+
+# the reserved RAM area of the board, see Module._ram_start
+RAM_START = 0xA000000
+RAM_SIZE = 0x2000000
+
+# AXI encodings
+BURST_FIXED = 0
+BURST_INCR = 1
+RESP_OKAY = 0
+RESP_SLVERR = 2
+
+
+def axi_hp_interface():
+    """Returns an AXI interface with the dimensions of the HP ports of the PS7."""
+    from migen_axi.interconnect import Interface
+
+    return Interface(data_width=64, addr_width=32, id_width=6)
+
+
+class AxiHpSlaveModel:
+    """Services the write and read channels of an AXI HP port in simulation.
+
+    Args:
+        bus: the AXI interface driven by the design.
+        ram: the RAM image as ``uint8`` array, starting at ``ram_start``.
+        ram_start: the bus address of the first byte of ``ram``.
+        backpressure: the probability of deasserting ``aw.ready``, ``w.ready`` and ``ar.ready``,
+          and of delaying ``r.valid``, in a cycle.
+        address_latency: the cycles from the acceptance of a write address until its
+          data can be committed.
+        response_latency: the cycles from the commit of the last beat of a burst until
+          its write response is valid.
+        read_latency: the cycles from the acceptance of a read address until its first
+          beat is valid.
+        max_outstanding: the number of accepted bursts without write response, beyond
+          which ``aw.ready`` is deasserted, and the number of read bursts whose beats
+          were not all returned, beyond which ``ar.ready`` is deasserted.
+        fifo_depth: the depth of the write data FIFO, beyond which ``w.ready`` is deasserted.
+        seed: seed of the random backpressure.
+    """
+
+    def __init__(
+        self,
+        bus,
+        ram: np.ndarray,
+        ram_start: int = RAM_START,
+        backpressure: float = 0.0,
+        address_latency: int = 0,
+        response_latency: int = 0,
+        read_latency: int = 0,
+        max_outstanding: int = 8,
+        fifo_depth: int = 128,
+        seed: int = 0,
+    ):
+        self.bus = bus
+        self.ram = ram
+        self.ram_start = ram_start
+        self.backpressure = backpressure
+        self.address_latency = address_latency
+        self.response_latency = response_latency
+        self.read_latency = read_latency
+        self.max_outstanding = max_outstanding
+        self.fifo_depth = fifo_depth
+        self._rng = np.random.default_rng(seed)
+        self.reset_statistics()
+
+    def reset_statistics(self):
+        self.cycles = 0
+        self.bursts = 0
+        self.beats = 0
+        self.bytes_written = 0
+        self.aw_stall_cycles = 0
+        self.w_stall_cycles = 0
+        self.errors = 0
+        self.read_bursts = 0
+        self.read_beats = 0
+        self.bytes_read = 0
+        self.ar_stall_cycles = 0
+        self.first_cycle = None
+        self.last_cycle = None
+
+    @property
+    def throughput(self) -> float:
+        """The written bytes per cycle from the first write address to the last write response."""
+        if self.first_cycle is None or self.last_cycle is None:
+            return 0.0
+        return self.bytes_written / (self.last_cycle - self.first_cycle + 1)
+
+    def statistics(self, clock_period: float = 8e-9) -> Dict[str, float]:
+        """Returns the counters of the model and the throughput in bytes per cycle and per second."""
+        return dict(
+            cycles=self.cycles,
+            bursts=self.bursts,
+            beats=self.beats,
+            bytes_written=self.bytes_written,
+            aw_stall_cycles=self.aw_stall_cycles,
+            w_stall_cycles=self.w_stall_cycles,
+            errors=self.errors,
+            read_bursts=self.read_bursts,
+            read_beats=self.read_beats,
+            bytes_read=self.bytes_read,
+            ar_stall_cycles=self.ar_stall_cycles,
+            throughput=self.throughput,
+            throughput_bytes_per_second=self.throughput / clock_period,
+        )
+
+    def _ready(self) -> int:
+        return int(self.backpressure == 0 or self._rng.random() >= self.backpressure)
+
+    def _commit(self, address: int, data: int, strb: int, size: int) -> bool:
+        """Writes the enabled bytes of a beat to the RAM image, returns False if out of range."""
+        width = len(self.bus.w.strb)
+        offset = address - self.ram_start
+        # narrow transfers only use the byte lanes of their address
+        lanes = offset % width
+        offset -= lanes
+        if offset < 0 or offset + width > len(self.ram):
+            return False
+        beat = np.frombuffer(data.to_bytes(width, "little"), dtype=np.uint8)
+        enabled = np.array([(strb >> i) & 1 for i in range(width)], dtype=bool)
+        if size < (width - 1).bit_length():
+            enabled[: lanes] = False
+            enabled[lanes + (1 << size) :] = False
+        self.ram[offset : offset + width][enabled] = beat[enabled]
+        self.bytes_written += int(enabled.sum())
+        return True
+
+    def _fetch(self, address: int) -> int:
+        """Returns the beat at ``address`` from the RAM image, or None if out of range."""
+        width = len(self.bus.r.data) // 8
+        offset = address - self.ram_start
+        offset -= offset % width
+        if offset < 0 or offset + width > len(self.ram):
+            return None
+        return int.from_bytes(self.ram[offset : offset + width].tobytes(), "little")
+
+    @passive
+    def generator(self):
+        aw, w, b = self.bus.aw, self.bus.w, self.bus.b
+        # accepted bursts as [cycle from which data is committed, address, beats left, size, burst, id, resp]
+        bursts = collections.deque()
+        beats = collections.deque()
+        # write responses as (valid from cycle, id, resp)
+        responses = collections.deque()
+        outstanding = 0
+        # accepted read bursts as [cycle from which beats are returned, address, beats left, size, burst, id]
+        reads = collections.deque()
+        while True:
+            cycle = self.cycles
+            if (yield self.bus.ar.valid):
+                ar = self.bus.ar
+                if (yield ar.ready):
+                    reads.append(
+                        [
+                            cycle + 1 + self.read_latency,
+                            (yield ar.addr),
+                            (yield ar.len) + 1,
+                            (yield ar.size),
+                            (yield ar.burst),
+                            (yield ar.id),
+                        ]
+                    )
+                    self.read_bursts += 1
+                else:
+                    self.ar_stall_cycles += 1
+            if (yield self.bus.r.valid) and (yield self.bus.r.ready):
+                burst = reads[0]
+                self.read_beats += 1
+                self.bytes_read += len(self.bus.r.data) // 8
+                if burst[4] == BURST_INCR:
+                    burst[1] += 1 << burst[3]
+                burst[2] -= 1
+                if burst[2] == 0:
+                    reads.popleft()
+            if (yield aw.valid):
+                if (yield aw.ready):
+                    if self.first_cycle is None:
+                        self.first_cycle = cycle
+                    bursts.append(
+                        [
+                            cycle + 1 + self.address_latency,
+                            (yield aw.addr),
+                            (yield aw.len) + 1,
+                            (yield aw.size),
+                            (yield aw.burst),
+                            (yield aw.id),
+                            RESP_OKAY,
+                        ]
+                    )
+                    outstanding += 1
+                    self.bursts += 1
+                else:
+                    self.aw_stall_cycles += 1
+            if (yield w.valid):
+                if (yield w.ready):
+                    beats.append(((yield w.data), (yield w.strb), (yield w.last)))
+                else:
+                    self.w_stall_cycles += 1
+            if (yield b.valid) and (yield b.ready):
+                responses.popleft()
+                outstanding -= 1
+                self.last_cycle = cycle
+            # commit one beat per cycle, like the 64-bit data path of the HP ports
+            if bursts and beats and bursts[0][0] <= cycle:
+                burst = bursts[0]
+                _, address, left, size, kind, id_, _ = burst
+                data, strb, last = beats.popleft()
+                self.beats += 1
+                if not self._commit(address, data, strb, size):
+                    burst[6] = RESP_SLVERR
+                if kind == BURST_INCR:
+                    burst[1] = address + (1 << size)
+                burst[2] = left - 1
+                if burst[2] == 0 or last:
+                    if burst[2] != 0 or not last:
+                        # w.last does not match the burst length
+                        burst[6] = RESP_SLVERR
+                    if burst[6] != RESP_OKAY:
+                        self.errors += 1
+                    bursts.popleft()
+                    responses.append((cycle + 1 + self.response_latency, id_, burst[6]))
+            # drive the handshake signals of the next cycle
+            yield aw.ready.eq(int(outstanding < self.max_outstanding) & self._ready())
+            yield w.ready.eq(int(len(beats) < self.fifo_depth) & self._ready())
+            yield self.bus.ar.ready.eq(int(len(reads) < self.max_outstanding) & self._ready())
+            if reads and reads[0][0] <= cycle + 1 and self._ready():
+                r = self.bus.r
+                _, address, left, _, _, id_ = reads[0]
+                data = self._fetch(address)
+                yield r.valid.eq(1)
+                yield r.data.eq(0 if data is None else data)
+                yield r.resp.eq(RESP_OKAY if data is not None else RESP_SLVERR)
+                yield r.last.eq(int(left == 1))
+                yield r.id.eq(id_)
+            else:
+                yield self.bus.r.valid.eq(0)
+            if responses and responses[0][0] <= cycle + 1:
+                _, id_, resp = responses[0]
+                yield b.valid.eq(1)
+                yield b.id.eq(id_)
+                yield b.resp.eq(resp)
+            else:
+                yield b.valid.eq(0)
+            self.cycles += 1
+            yield
+
+
+class SimPs7:
+    """Stands in for the PS7 core, providing the four AXI HP slave interfaces ``s_axi_hp0`` to ``s_axi_hp3``."""
+
+    def __init__(self):
+        for index in range(4):
+            setattr(self, f"s_axi_hp{index}", axi_hp_interface())
+
+
+class SimAxiSoc:
+    """Stands in for the SoC in simulations of designs that access RAM through the AXI HP ports.
+
+    All four ports access the same RAM image. The arguments other than
+    ``ram_start`` and ``ram_size`` are passed to each :class:`AxiHpSlaveModel`.
+    """
+
+    def __init__(self, ram_start: int = RAM_START, ram_size: int = RAM_SIZE, **model_kwargs):
+        self.ps7 = SimPs7()
+        self.ram_start = ram_start
+        self.ram = np.zeros(ram_size, dtype=np.uint8)
+        self.hp: List[AxiHpSlaveModel] = [
+            AxiHpSlaveModel(getattr(self.ps7, f"s_axi_hp{index}"), self.ram, ram_start=ram_start, **model_kwargs)
+            for index in range(4)
+        ]
+
+    def sim_generators(self) -> list:
+        """Returns the simulation generators of the slave models."""
+        return [hp.generator() for hp in self.hp]
+
+    def read_from_ram(self, offset: int = 0, length: int = 1) -> np.ndarray:
+        """Reads ``length`` uint32 values at ``offset`` bytes from the start of the RAM image."""
+        return self.ram[offset : offset + 4 * length].view(np.uint32).copy()
+
+    def write_to_ram(self, offset: int, values: np.ndarray):
+        """Writes uint32 ``values`` at ``offset`` bytes from the start of the RAM image."""
+        values = np.asarray(values, dtype=np.uint32)
+        self.ram[offset : offset + 4 * len(values)] = values.view(np.uint8)
@@ -1,3 +1,4 @@
+import importlib
 import logging
 import shutil
 from abc import ABC, abstractmethod
@@ -5,13 +6,17 @@ from abc import ABC, abstractmethod
 from .common import empty_path
 from .migen import AutoMigenModule
 from .settings import settings
+from .toolchain import get_toolchain
 
 logger = logging.getLogger(__name__)
 builder_registry = {}
 
 
-def get_builder(board, module_class):
-    return builder_registry[board](module_class)
+def get_builder(board, module_class, toolchain=None):
+    if board not in builder_registry:
+        # builders register themselves when their board package is imported
+        importlib.import_module(f"pypga.boards.{board}")
+    return builder_registry[board](module_class, toolchain=toolchain)
 
 
 class BaseBuilder(ABC):
@@ -56,8 +61,9 @@ class BaseBuilder(ABC):
             f"with hash {self.hash} to {self.result_path}: {self._build_results}"
         )
 
-    def __init__(self, module_class):
+    def __init__(self, module_class, toolchain=None):
         self.module_class = module_class
+        self.toolchain = get_toolchain(toolchain)
         self.hash = self._get_hash()
         self.result_path = self._get_result_path()
         self.build_path = self._get_build_path()
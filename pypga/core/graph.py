@@ -0,0 +1,359 @@
+"""
+Signal dependency graph of a design.
+
+:class:`SignalGraph` is built in a single pass over the fragment of a migen
+module including all of its submodules. Its nodes are the signals and
+memories of the design, and an edge ``a -> b`` means that the value of ``a``
+determines the value of ``b``, either combinatorially or at the next edge of
+the clock of a domain. Edges carry the depth of the logic between both
+signals, which by default counts the operator levels of the expression and
+the multiplexers of enclosing ``If`` and ``Case`` statements.
+
+The graph is exported to JSON or GraphML for external tools, and answers
+queries like the fan-in and fan-out of a signal or the longest chain of
+combinational logic, which points to timing hotspots.
+"""
+import json
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from migen.fhdl.bitcontainer import value_bits_sign
+from migen.fhdl.namer import build_namespace
+from migen.fhdl.specials import Memory
+from migen.fhdl.structure import (
+    _ArrayProxy,
+    _Assign,
+    _Operator,
+    _Slice,
+    Case,
+    Cat,
+    ClockSignal,
+    Constant,
+    If,
+    Replicate,
+    ResetSignal,
+    Signal,
+)
+
+from .waveform import iter_signals
+
+
+def operator_levels(operator: _Operator) -> float:
+    """The default cost of an operator: one level of logic."""
+    return 1
+
+
+def describe_operator(operator: _Operator) -> str:
+    """Returns the operator with the widths of its operands, e.g. ``"*34x32"``."""
+    return operator.op + "x".join(str(value_bits_sign(o)[0]) for o in operator.operands)
+
+
+class SignalGraph:
+    """The dependency graph of the signals of a migen module and its submodules.
+
+    Args:
+        module: the migen module, e.g. an :class:`AutoMigenModule`. Its fragment is
+          finalized, so it should not be modified afterwards.
+        cost: returns the depth of the logic of an operator, which allows to estimate
+          delays with a more detailed model than operator levels.
+        mux_cost: the depth of the multiplexer of an ``If`` or ``Case`` statement or of
+          the selection of an element of an ``Array``.
+
+    Attributes:
+        nodes: maps node ids to their attributes ``name``, ``nbits``, ``signed`` and
+          ``driver``, which is ``"comb"``, the clock domain of a register, ``"memory"``,
+          or ``None`` for undriven inputs.
+        edges: maps ``(source, target, kind)`` to the attributes of the edge, where ``kind``
+          is ``"comb"`` or the clock domain. ``depth`` is the largest depth of logic between
+          source and target in any statement, and ``operators`` lists the operators on it.
+    """
+
+    def __init__(self, module, cost: Callable[[_Operator], float] = operator_levels, mux_cost: float = 1):
+        self.cost = cost
+        self.mux_cost = mux_cost
+        self.nodes: Dict[str, dict] = {}
+        self.edges: Dict[Tuple[str, str, str], dict] = {}
+        self._signals: Dict[int, Signal] = {}
+        self._paths = {}
+        for path, signal in iter_signals(module):
+            self._paths.setdefault(signal.duid, path)
+        fragment = module.get_fragment()
+        for statement in fragment.comb:
+            self._add_statement(statement, "comb", {})
+        for domain, statements in fragment.sync.items():
+            for statement in statements:
+                self._add_statement(statement, domain, {})
+        for special in fragment.specials:
+            if isinstance(special, Memory):
+                self._add_memory(special)
+        self._name_nodes()
+
+    # construction
+
+    def _node(self, signal) -> str:
+        key = f"s{signal.duid}"
+        if key not in self.nodes:
+            self._signals[signal.duid] = signal
+            self.nodes[key] = {"nbits": len(signal), "signed": signal.signed, "driver": None}
+        return key
+
+    def _add_edge(self, source: str, target: str, kind: str, depth: float, operators: Tuple[str, ...] = ()):
+        key = (source, target, kind)
+        edge = self.edges.get(key)
+        if edge is None or depth > edge["depth"]:
+            self.edges[key] = {"depth": depth, "operators": list(operators)}
+
+    def _sources(self, expression) -> Dict[str, Tuple[float, Tuple[str, ...]]]:
+        """Returns the nodes read by ``expression`` with the depth of and the operators on the deepest
+        path of logic between them and its value."""
+        if isinstance(expression, Signal):
+            return {self._node(expression): (0, ())}
+        if isinstance(expression, (Constant, ClockSignal, ResetSignal)) or expression is None:
+            return {}
+        if isinstance(expression, _Operator):
+            cost = self.cost(expression)
+            return self._merge((self._sources(o) for o in expression.operands), cost, describe_operator(expression))
+        if isinstance(expression, _Slice):
+            return self._sources(expression.value)
+        if isinstance(expression, Cat):
+            return self._merge(self._sources(o) for o in expression.l)
+        if isinstance(expression, Replicate):
+            return self._sources(expression.v)
+        if isinstance(expression, _ArrayProxy):
+            # selecting an element of an array is a multiplexer
+            sources = [self._sources(choice) for choice in expression.choices]
+            sources.append(self._sources(expression.key))
+            return self._merge(sources, self.mux_cost, "mux")
+        if isinstance(expression, int):
+            return {}
+        raise TypeError(f"Unsupported expression {expression!r}.")
+
+    @staticmethod
+    def _merge(sources: Iterable[Dict[str, tuple]], cost: float = 0, operator: str = None) -> Dict[str, tuple]:
+        """Merges the sources of several operands, adding ``operator`` of depth ``cost`` behind them."""
+        merged = {}
+        for source in sources:
+            for node, (depth, operators) in source.items():
+                if node not in merged or depth + cost > merged[node][0]:
+                    merged[node] = (depth + cost, operators + (operator,) if operator else operators)
+        return merged
+
+    def _targets(self, expression) -> List[str]:
+        if isinstance(expression, Signal):
+            return [self._node(expression)]
+        if isinstance(expression, _Slice):
+            return self._targets(expression.value)
+        if isinstance(expression, Cat):
+            return [t for o in expression.l for t in self._targets(o)]
+        if isinstance(expression, _ArrayProxy):
+            return [t for choice in expression.choices for t in self._targets(choice)]
+        raise TypeError(f"Unsupported assignment target {expression!r}.")
+
+    def _add_statement(self, statement, kind: str, conditions: Dict[str, tuple], levels: int = 0):
+        """Adds the edges of ``statement``, which is nested in ``levels`` multiplexers selected by ``conditions``."""
+        if isinstance(statement, (list, tuple)):
+            for s in statement:
+                self._add_statement(s, kind, conditions, levels)
+        elif isinstance(statement, _Assign):
+            sources = self._sources(statement.r)
+            for _ in range(levels):
+                sources = self._merge([sources], self.mux_cost, "mux")
+            sources = self._merge([sources, conditions])
+            for target in self._targets(statement.l):
+                self.nodes[target]["driver"] = kind
+                for source, (depth, operators) in sources.items():
+                    self._add_edge(source, target, kind, depth, operators)
+        elif isinstance(statement, If):
+            inner = self._merge([conditions, self._sources(statement.cond)], self.mux_cost, "mux")
+            self._add_statement(statement.t, kind, inner, levels + 1)
+            self._add_statement(statement.f, kind, inner, levels + 1)
+        elif isinstance(statement, Case):
+            inner = self._merge([conditions, self._sources(statement.test)], self.mux_cost, "mux")
+            for case in statement.cases.values():
+                self._add_statement(case, kind, inner, levels + 1)
+        else:
+            raise TypeError(f"Unsupported statement {statement!r}.")
+
+    def _add_memory(self, memory: Memory):
+        key = f"m{id(memory)}"
+        self.nodes[key] = {"name": memory.name_override or key, "nbits": memory.width, "signed": False, "driver": "memory"}
+        for index, port in enumerate(memory.ports):
+            domain = port.clock.cd
+            for name in ("adr", "we", "dat_w", "dat_r"):
+                signal = getattr(port, name)
+                if signal is not None:
+                    self._paths.setdefault(signal.duid, f"{self.nodes[key]['name']}.port{index}.{name}")
+            for signal in (port.adr, port.we, port.dat_w):
+                if signal is not None:
+                    self._add_edge(self._node(signal), key, domain, 0)
+            if port.dat_r is not None:
+                data = self._node(port.dat_r)
+                self.nodes[data]["driver"] = "comb" if port.async_read else domain
+                self._add_edge(key, data, "comb" if port.async_read else domain, 0)
+                self._add_edge(self._node(port.adr), data, "comb" if port.async_read else domain, self.mux_cost, ("mux",))
+
+    def _name_nodes(self):
+        # signals that are attributes of a module are named by their path, others like in the Verilog source
+        unnamed = [s for duid, s in self._signals.items() if duid not in self._paths]
+        namespace = build_namespace(unnamed)
+        for duid, signal in self._signals.items():
+            name = self._paths.get(duid)
+            if name is None:
+                name = namespace.get_name(signal)
+            self.nodes[f"s{duid}"]["name"] = name
+
+    # queries
+
+    def find(self, name: str) -> str:
+        """Returns the id of the node called ``name``."""
+        for key, node in self.nodes.items():
+            if node["name"] == name:
+                return key
+        raise KeyError(f"No signal {name} in the design.")
+
+    def fan_in(self, name: str) -> Dict[str, str]:
+        """Returns the names of the signals that ``name`` depends on, mapped to the kind of the dependency."""
+        key = self.find(name)
+        return {self.nodes[s]["name"]: kind for s, t, kind in self.edges if t == key}
+
+    def fan_out(self, name: str) -> Dict[str, str]:
+        """Returns the names of the signals that depend on ``name``, mapped to the kind of the dependency."""
+        key = self.find(name)
+        return {self.nodes[t]["name"]: kind for s, t, kind in self.edges if s == key}
+
+    def longest_paths(self) -> Dict[str, Tuple[float, List[str], str]]:
+        """Returns the path of combinational logic of the largest depth ending at each node.
+
+        Paths start at registers, memories and inputs, and follow combinational edges
+        and finally at most one register edge. Each node id maps to ``(depth, ids, kind)``,
+        where ``kind`` is the clock domain of the final register edge or ``"comb"``.
+        """
+        incoming: Dict[str, List[Tuple[str, str, float]]] = {key: [] for key in self.nodes}
+        for (source, target, kind), edge in self.edges.items():
+            incoming[target].append((source, kind, edge["depth"]))
+        # longest purely combinational paths, where loops are broken at the first revisited node
+        comb: Dict[str, Tuple[float, str]] = {}
+        for start in self.nodes:
+            if start in comb:
+                continue
+            stack = [(start, iter(incoming[start]))]
+            visiting = {start}
+            while stack:
+                node, it = stack[-1]
+                for source, kind, _ in it:
+                    if kind == "comb" and source not in comb and source not in visiting:
+                        visiting.add(source)
+                        stack.append((source, iter(incoming[source])))
+                        break
+                else:
+                    stack.pop()
+                    visiting.discard(node)
+                    best = (0, None)
+                    for source, kind, depth in incoming[node]:
+                        if kind == "comb" and source in comb and comb[source][0] + depth > best[0]:
+                            best = (comb[source][0] + depth, source)
+                    comb[node] = best
+        result = {}
+        for node in self.nodes:
+            depth, previous = comb[node]
+            final = "comb"
+            # a register edge closes the path at the register input
+            for source, kind, edge_depth in incoming[node]:
+                if kind != "comb" and (final == "comb" or comb[source][0] + edge_depth > depth):
+                    depth, previous, final = comb[source][0] + edge_depth, source, kind
+            path = [node]
+            while previous is not None:
+                path.append(previous)
+                previous = comb[previous][1]
+                if previous in path:
+                    break
+            result[node] = (depth, path[::-1], final)
+        return result
+
+    def path_operators(self, path: List[str], kind: str = "comb") -> List[str]:
+        """Returns the operators along a path of node ids, whose last edge is of ``kind``."""
+        operators = []
+        for i, (source, target) in enumerate(zip(path, path[1:])):
+            edge = self.edges[(source, target, kind if i == len(path) - 2 else "comb")]
+            operators += edge["operators"]
+        return operators
+
+    def longest_comb_chain(self) -> Tuple[float, List[str]]:
+        """Returns the depth and the signal names of the deepest chain of combinational logic."""
+        depth, path, _ = max(self.longest_paths().values(), key=lambda path: path[0], default=(0, [], None))
+        return depth, [self.nodes[n]["name"] for n in path]
+
+    # export
+
+    def to_dict(self) -> dict:
+        return {
+            "nodes": [{"id": key, **node} for key, node in self.nodes.items()],
+            "edges": [
+                {"source": source, "target": target, "kind": kind, **edge}
+                for (source, target, kind), edge in self.edges.items()
+            ],
+        }
+
+    def to_json(self, filename=None) -> str:
+        """Returns the graph as JSON and writes it to ``filename`` if given."""
+        text = json.dumps(self.to_dict(), indent=1)
+        if filename is not None:
+            with open(filename, "w") as f:
+                f.write(text)
+        return text
+
+    def to_graphml(self, filename=None) -> str:
+        """Returns the graph as GraphML, e.g. for yEd or networkx, and writes it to ``filename`` if given."""
+        root = ET.Element("graphml", xmlns="http://graphml.graphdrawing.org/xmlns")
+        attributes = [
+            ("node", "name", "string"),
+            ("node", "nbits", "int"),
+            ("node", "signed", "boolean"),
+            ("node", "driver", "string"),
+            ("edge", "kind", "string"),
+            ("edge", "depth", "double"),
+            ("edge", "operators", "string"),
+        ]
+        for target, name, type_ in attributes:
+            ET.SubElement(root, "key", {"id": name, "for": target, "attr.name": name, "attr.type": type_})
+        graph = ET.SubElement(root, "graph", id="design", edgedefault="directed")
+
+        def data(element, key, value):
+            if value is not None:
+                ET.SubElement(element, "data", key=key).text = str(value).lower() if isinstance(value, bool) else str(value)
+
+        for key, node in self.nodes.items():
+            element = ET.SubElement(graph, "node", id=key)
+            for name in ("name", "nbits", "signed", "driver"):
+                data(element, name, node[name])
+        for (source, target, kind), edge in self.edges.items():
+            element = ET.SubElement(graph, "edge", source=source, target=target)
+            data(element, "kind", kind)
+            data(element, "depth", edge["depth"])
+            data(element, "operators", " ".join(edge["operators"]))
+        text = ET.tostring(root, encoding="unicode")
+        if filename is not None:
+            with open(filename, "w") as f:
+                f.write(text)
+        return text
+
+    def to_graphviz(self, name: str = "design"):
+        """Returns a ``graphviz.Digraph`` with signals colored by width and signedness."""
+        import graphviz
+
+        dot = graphviz.Digraph(name)
+        for key, node in self.nodes.items():
+            saturation = 0.1 + 0.9 * node["nbits"] ** 2 / (400 + node["nbits"] ** 2)
+            color = f"{0.0 if node['signed'] else 0.333} {saturation} 0.9"
+            dot.node(
+                key,
+                f"<<b>{node['name']}</b><br/>bits={node['nbits']}<br/>signed={node['signed']}>",
+                style="filled",
+                fillcolor=color,
+            )
+        for source, target, kind in self.edges:
+            if kind == "comb":
+                dot.edge(source, target, color="black:none:black", arrowhead="none")
+            else:
+                dot.edge(source, target)
+        return dot
@@ -0,0 +1,222 @@
+"""
+Canonicalization of migen-generated Verilog for design hashes.
+
+Migen derives signal names from the order in which signals and submodules
+are created, e.g. two submodules of the same class become ``leaf0`` and
+``leaf1`` in the order of their creation. Also, the order of declarations and
+statements follows the creation order. Neither affects the hardware, but both
+change the generated Verilog and would force a rebuild of an unchanged design.
+:func:`normalize_verilog` maps such equivalent sources onto the same text.
+Ports and CSRs keep their names, since pin constraints and the register map
+refer to them, and so do string literals such as the names of data files.
+"""
+import hashlib
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_$]*")
+_NUMBERED_SEGMENT = re.compile(r"^([A-Za-z]+)(\d+)$")
+_ASSIGNMENT_TARGET = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_$]*)(\[[^\]]*\])?\s*<?=")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_PORT = re.compile(r"^\s*(?:input|output|inout)\b[^A-Za-z_]*(?:(?:reg|wire|signed)\s+)*(?:\[[^\]]*\]\s*)?([A-Za-z_][A-Za-z0-9_$]*)")
+
+# number of color refinement iterations used to tell numbered submodules apart
+_REFINEMENT_ITERATIONS = 5
+
+
+def _strip_comments(source: str) -> str:
+    """Removes comments and simulation-only code."""
+    source = re.sub(
+        r"//\s*synthesis translate_off.*?//\s*synthesis translate_on", "", source, flags=re.S
+    )
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    source = re.sub(r"//[^\n]*", "", source)
+    lines = [line.rstrip() for line in source.splitlines()]
+    return "\n".join(line for line in lines if line.strip())
+
+
+def _numbered_prefixes(identifier: str) -> List[Tuple[str, str, int]]:
+    """Returns ``(prefix, group, number)`` for each numbered segment such as ``leaf0`` in ``identifier``.
+
+    The group identifies all prefixes that only differ by their number.
+    """
+    segments = identifier.split("_")
+    prefixes = []
+    for index, segment in enumerate(segments):
+        match = _NUMBERED_SEGMENT.match(segment)
+        if match is not None:
+            prefix = "_".join(segments[: index + 1])
+            group = "_".join(segments[:index] + [match.group(1) + "#"])
+            prefixes.append((prefix, group, int(match.group(2))))
+    return prefixes
+
+
+def _is_protected(identifier: str, ports: Set[str]) -> bool:
+    """Whether ``identifier`` is a port or belongs to a CSR, whose names are referred to outside the Verilog."""
+    return identifier in ports or any(segment.startswith("csr") for segment in identifier.split("_"))
+
+
+def _canonical_numbers(source: str) -> Dict[str, str]:
+    """Returns a renaming of numbered prefixes that only depends on the structure of the design."""
+    lines = [_STRING.sub('""', line) for line in source.splitlines()]
+    ports = {match.group(1) for match in map(_PORT.match, lines) if match is not None}
+    # groups with a member in a port or CSR name keep their numbers
+    fixed = set()
+    prefix_info = {}
+    prefix_lines = {}
+    line_prefixes = []
+    for line_index, line in enumerate(lines):
+        prefixes = set()
+        for identifier in _IDENTIFIER.findall(line):
+            protected = _is_protected(identifier, ports)
+            for prefix, group, number in _numbered_prefixes(identifier):
+                if protected:
+                    fixed.add(group)
+                prefix_info[prefix] = (group, number)
+                prefix_lines.setdefault(prefix, set()).add(line_index)
+                prefixes.add(prefix)
+        line_prefixes.append(prefixes)
+    groups = {}
+    for prefix, (group, number) in prefix_info.items():
+        if group not in fixed:
+            groups.setdefault(group, []).append(prefix)
+    # only groups with several members can be permuted
+    ambiguous = {prefix for members in groups.values() if len(members) > 1 for prefix in members}
+    if not ambiguous:
+        return {}
+    pattern = re.compile(
+        r"(?<![A-Za-z0-9_$])("
+        + "|".join(re.escape(p) for p in sorted(ambiguous, key=len, reverse=True))
+        + r")(?![A-Za-z0-9$])"
+    )
+    # iteratively refine the color of each prefix by the lines it appears in
+    color = {prefix: prefix_info[prefix][0] for prefix in ambiguous}
+    for _ in range(_REFINEMENT_ITERATIONS):
+        signatures = {}
+        for prefix in ambiguous:
+            context = sorted(
+                pattern.sub(
+                    lambda match: "@" if match.group(1) == prefix else f"<{color[match.group(1)]}>",
+                    lines[line_index],
+                )
+                for line_index in prefix_lines[prefix]
+            )
+            signatures[prefix] = (color[prefix], tuple(context))
+        ranks = {signature: str(rank) for rank, signature in enumerate(sorted(set(signatures.values())))}
+        new_color = {prefix: ranks[signature] for prefix, signature in signatures.items()}
+        converged = len(set(new_color.values())) == len(set(color.values()))
+        color = new_color
+        if converged:
+            break
+    renaming = {}
+    for group, members in groups.items():
+        if len(members) < 2:
+            continue
+        members = sorted(members, key=lambda prefix: (color[prefix], prefix_info[prefix][1]))
+        numbers = sorted(prefix_info[prefix][1] for prefix in members)
+        stem = _NUMBERED_SEGMENT.match(members[0].split("_")[-1]).group(1)
+        parent = members[0].rsplit("_", 1)[0] + "_" if "_" in members[0] else ""
+        for prefix, number in zip(members, numbers):
+            renaming[prefix] = f"{parent}{stem}{number}"
+    return renaming
+
+
+def _rename(source: str, renaming: Dict[str, str]) -> str:
+    if not renaming:
+        return source
+    # string literals are matched as a whole, such that they are left unchanged
+    pattern = re.compile(
+        f"({_STRING.pattern})"
+        + r"|(?<![A-Za-z0-9_$])("
+        + "|".join(re.escape(p) for p in sorted(renaming, key=len, reverse=True))
+        + r")(?![A-Za-z0-9$])"
+    )
+    return pattern.sub(lambda match: match.group(1) or renaming[match.group(2)], source)
+
+
+def _split_items(lines: List[str], indent: str = "") -> List[List[str]]:
+    """Splits lines into items that start at the given indentation level."""
+    items = []
+    for line in lines:
+        body = line[len(indent) :]
+        starts_item = line.startswith(indent) and not body[:1].isspace()
+        continues_item = re.match(r"(end\b|else\b|\)|endcase\b)", body.strip()) is not None
+        if starts_item and not (continues_item and items):
+            items.append([line])
+        else:
+            items[-1].append(line)
+    return items
+
+
+def _group_by_targets(statements: List[List[str]]) -> List[List[List[str]]]:
+    """Groups statements that assign to common signals, preserving their order within each group."""
+    groups = []
+    for statement in statements:
+        targets = set()
+        for line in statement:
+            match = _ASSIGNMENT_TARGET.match(line)
+            if match is not None:
+                targets.add(match.group(1))
+        overlapping = [group for group in groups if group[0] & targets]
+        merged = (set(targets), [])
+        for group in overlapping:
+            merged[0].update(group[0])
+            merged[1].extend(group[1])
+            groups.remove(group)
+        merged[1].append(statement)
+        groups.append(merged)
+    return [group[1] for group in groups]
+
+
+def _normalize_sync_block(item: List[str]) -> List[str]:
+    """Sorts the independent statements of a clocked ``always`` block."""
+    header, body, footer = item[0], item[1:-1], item[-1]
+    statements = _split_items(body, indent="\t")
+    reset = []
+    if statements and re.match(r"\tif \(\w+\) begin$", statements[-1][0]):
+        # the reset block generated by migen assigns reset values to all registers and must stay last
+        inner = statements[-1][1:-1]
+        if all(_ASSIGNMENT_TARGET.match(line) for line in inner):
+            reset = [statements[-1][0]] + sorted(inner) + [statements[-1][-1]]
+            statements = statements[:-1]
+    groups = sorted("\n".join("\n".join(s) for s in group) for group in _group_by_targets(statements))
+    return [header] + groups + reset + [footer]
+
+
+def normalize_verilog(source: str) -> str:
+    """Returns a canonical form of migen-generated Verilog for hashing.
+
+    Comments and simulation-only code are removed, numbered submodule and signal
+    names other than ports and CSRs are renumbered according to the structure of
+    the design, and declarations, continuous assignments, ``always`` blocks and
+    independent statements within clocked blocks are sorted. The result is not
+    meant to be synthesized.
+    """
+    source = _strip_comments(source)
+    source = _rename(source, _canonical_numbers(source))
+    modules = []
+    for module in re.split(r"(?m)^(?=module\b)", source):
+        if not module.strip():
+            continue
+        lines = module.splitlines()
+        header_end = next(index for index, line in enumerate(lines) if line.rstrip().endswith(");"))
+        header, body = lines[: header_end + 1], lines[header_end + 1 :]
+        footer = [line for line in body if line.strip() == "endmodule"]
+        body = [line for line in body if line.strip() != "endmodule"]
+        items = []
+        for item in _split_items(body):
+            if re.match(r"always @\(posedge [^)]*\) begin$", item[0]):
+                item = _normalize_sync_block(item)
+            items.append("\n".join(item))
+        modules.append("\n".join(header + sorted(items) + footer))
+    return "\n".join(sorted(modules))
+
+
+def hash_verilog(main_source: str, data_files: Iterable[Tuple[str, str]] = ()) -> str:
+    """Returns a hash of Verilog source and data files that is invariant to hardware-neutral changes."""
+    hash_ = hashlib.sha256()
+    hash_.update(normalize_verilog(main_source).encode())
+    for filename, content in data_files:
+        hash_.update(filename.encode())
+        hash_.update(content.encode())
+    return hash_.hexdigest()
@@ -1,2 +1,17 @@
-from .local import LocalInterface
-from .remote import RemoteInterface
+import importlib
+
+# the interfaces are loaded on first access, as the remote interface requires the SSH stack
+# and the simulated interface requires misoc
+_interfaces = {
+    "LocalInterface": ".local",
+    "RemoteInterface": ".remote",
+    "SimInterface": ".sim",
+}
+
+
+def __getattr__(name):
+    try:
+        module_name = _interfaces[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
@@ -1 +1,8 @@
-from .interface import RemoteInterface
+import importlib
+
+
+def __getattr__(name):
+    # the remote interface requires the SSH stack, which is slow to import
+    if name == "RemoteInterface":
+        return importlib.import_module(".interface", __name__).RemoteInterface
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,6 +8,9 @@ import numpy as np
 
 
 class Client:
+    # the protocol version from which on the server supports writing to RAM
+    _ram_write_version = 2
+
     def __init__(self, token, host="127.0.0.1", port=2222, timeout=10.0):
         if len(token) != 32:
             raise ValueError("token must have 32 characters, not {len(token)}.")
@@ -33,12 +36,14 @@ class Client:
             if len(new) == 0:
                 break
         data = data.decode("ascii")
-        if data != "1" * 32:
+        # the server confirms the connection with 32 times the digit of its protocol version
+        if data not in ("1" * 32, "2" * 32):
             raise RuntimeError(
                 f"Wrong authentication token: {self._token} != {data}. This may mean "
                 f"that another client has connected to your redpitaya. Try restarting."
             )
         else:
+            self.protocol_version = int(data[0])
             logging.debug(f"Correct authentication token: {self._token} / {data}")
 
     def stop(self):
@@ -125,6 +130,42 @@ class Client:
             self._check_acknowledgement(header, ack=data[:8])
         return np.frombuffer(data[8:], dtype=np.uint32)
 
+    def write_to_ram(self, offset: int, values: np.ndarray):
+        """Writes data to the dedicated RAM area.
+
+        Args:
+            offset: the offset from the start address, in bytes.
+            values: the uint32 values to write.
+        """
+        if self.protocol_version < self._ram_write_version:
+            # older servers would interpret the data as commands
+            raise RuntimeError(
+                "The server on the board does not support writing to RAM. Rebuild the server "
+                "binaries with the Makefile in pypga/core/interface/remote/server."
+            )
+        values = np.asarray(values, dtype=np.uint32)
+        maxlen = 2**23 - 1
+        for start in range(0, len(values), maxlen):
+            chunk = values[start : start + maxlen]
+            length = len(chunk)
+            address = offset + 4 * start
+            header = b"u" + bytes(
+                bytearray(
+                    [
+                        length & 0xFF,
+                        (length >> 8) & 0xFF,
+                        (length >> 16) & 0xFF,
+                        address & 0xFF,
+                        (address >> 8) & 0xFF,
+                        (address >> 16) & 0xFF,
+                        (address >> 24) & 0xFF,
+                    ]
+                )
+            )
+            with self._socket_lock:
+                self._socket.sendall(header + chunk.tobytes())
+                self._check_acknowledgement(header)
+
     def writes(self, addr, values):
         values = values[: 65535 - 2]
         length = len(values)
@@ -38,6 +38,9 @@ class RemoteInterface(BaseInterface):
     def read_from_ram(self, offset: int = 0, length: int = 1) -> np.ndarray:
         return self.client.read_from_ram(offset, length)
 
+    def write_to_ram(self, offset: int, values: np.ndarray):
+        self.client.write_to_ram(offset, values)
+
     @property
     def extra_shell(self):
         if self._extra_shell is None:
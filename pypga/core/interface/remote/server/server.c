@@ -15,11 +15,13 @@ such that one server process waits for new incoming connections and the other
 one executes the sequence detailed below. To make sure that the
 client connects to the right server, the client must initially send the
 32-character authentication token. It the wrong token was sent, the server
-closes the connection. If the right token was sent, the following protocol is
-executed indefinitely.
+closes the connection. If the right token was sent, the server confirms the
+connection with 32 times the digit of its protocol version, '2' since 'u' was
+added, and the following protocol is executed indefinitely.
 
 The client sends 8 bytes of data:
 - Byte 1 is interpreted as a character: 'r' for read and 'w' for write, and 'c' for close.
+  'd' and 'u' read from and write to the dedicated RAM area, see below.
   All other messages are ignored.
 - Byte 2 is reserved.
 - Bytes 3+4 are interpreted as unsigned int. This number n is the amount of 4-byte-units
@@ -31,6 +33,11 @@ The client sends 8 bytes of data:
   write them to the designated FPGA address space.
 - If the command is close, or if the connection is broken, the server program will terminate.
 
+For 'd' and 'u', bytes 2-4 are the amount n of 4-byte-units, up to 2^24 - 1, and bytes 5-8
+are the offset in bytes from the start of the dedicated RAM area.
+- For 'd', the server echoes the header and sends the requested 4*n bytes.
+- For 'u', the server receives 4*n bytes, writes them to the RAM area and echoes the header.
+
 After this, the server will wait for the next command. 
 */
  
@@ -219,8 +226,8 @@ int main(int argc, char *argv[])
                  if (n != 32) error("ERROR wrote incorrect number of bytes to socket");
                  error("Authentication failure - wrong token. Terminating client!");
              }
-             //confirm connection by sending a constant token back to the client
-             n = send(newsockfd,(void*)("11111111111111111111111111111111"),32,0);
+             //confirm connection by sending the protocol version back to the client
+             n = send(newsockfd,(void*)("22222222222222222222222222222222"),32,0);
              if (n < 0) error("ERROR writing to socket");
              if (n != 32) error("ERROR wrote incorrect number of bytes to socket");
 
@@ -265,6 +272,18 @@ int main(int argc, char *argv[])
                     }
                     //fprintf(stderr, "Reading from RAM was a success!\n");
                  }
+                 else if (buffer[0] == 'u') { //write to RAM
+                    unsigned long points = buffer[1]+ (buffer[2]<<8) + (buffer[3]<<16); //number of "unsigned long" to be written
+                    if (points > 0) {
+                        void* ram_addr = ram_base + (address & RAM_MASK);
+                        if ((address & RAM_MASK) + points*sizeof(unsigned long) > RAM_SIZE) error("ERROR write beyond the RAM area");
+                        n = recv(newsockfd, ram_addr, points*sizeof(unsigned long), MSG_WAITALL);
+                        if (n < 0) error("ERROR reading from socket");
+                        if (n != points*sizeof(unsigned long)) error("ERROR read incorrect number of data bytes from socket");
+                    }
+                    n = send(newsockfd,buffer,8,0);
+                    if (n != 8) error("ERROR control sequence mirror incorrectly transmitted");
+                 }
                  else if  (buffer[0] == 'w') { //write to FPGA
                     //read new data from socket
                     n = recv(newsockfd,(void*)rw_buffer,data_length*sizeof(unsigned long),MSG_WAITALL);
@@ -0,0 +1,2 @@
+from .clock import VirtualClock
+from .interface import SimInterface
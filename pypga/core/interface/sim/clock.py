@@ -0,0 +1,73 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class VirtualClock:
+    """Replaces wall time by the time of a simulation while active as a context manager.
+
+    ``time.sleep`` advances the simulation by the corresponding number of clock cycles
+    instead of waiting, and ``time.time``, ``time.monotonic`` and ``time.perf_counter``
+    advance with the simulated cycles, including those spent on register accesses. This
+    allows to run measurement scripts written for the board unchanged against a
+    :class:`SimInterface`::
+
+        with dut._interface.virtual_clock():
+            dut.trigger()
+            time.sleep(0.001)  # simulates 125000 cycles
+            data = dut.data
+
+    Only calls through the ``time`` module are affected, not functions imported with
+    ``from time import sleep``. Other threads see the virtual time as well.
+
+    Args:
+        interface: the :class:`SimInterface` running the design.
+        clock_period: the period of the ``sys`` clock in seconds.
+        max_sleep_cycles: if given, longer sleeps only advance the simulation by this
+          number of cycles. This shortens scripts that sleep generously while waiting for
+          the design, but breaks the timing of designs that rely on the full duration.
+    """
+
+    _patched = ("sleep", "time", "monotonic", "perf_counter")
+
+    def __init__(self, interface, clock_period: float = 8e-9, max_sleep_cycles: int = None):
+        self.interface = interface
+        self.clock_period = clock_period
+        self.max_sleep_cycles = max_sleep_cycles
+        self.sleeps = 0
+        self.slept_cycles = 0
+        self._originals = None
+
+    @property
+    def elapsed(self) -> float:
+        """The simulated time in seconds since entering the context."""
+        return (self.interface.cycle - self._start_cycle) * self.clock_period
+
+    def sleep(self, seconds: float):
+        if seconds < 0:
+            raise ValueError("sleep length must be non-negative")
+        cycles = round(seconds / self.clock_period)
+        if self.max_sleep_cycles is not None and cycles > self.max_sleep_cycles:
+            logger.debug(f"Shortening a sleep of {cycles} cycles to {self.max_sleep_cycles} cycles.")
+            cycles = self.max_sleep_cycles
+        self.sleeps += 1
+        self.slept_cycles += cycles
+        if cycles > 0:
+            self.interface.run(cycles)
+
+    def __enter__(self):
+        if self._originals is not None:
+            raise RuntimeError("The virtual clock is already running.")
+        self._originals = {name: getattr(time, name) for name in self._patched}
+        self._start_cycle = self.interface.cycle
+        starts = {name: self._originals[name]() for name in self._patched if name != "sleep"}
+        time.sleep = self.sleep
+        for name, start in starts.items():
+            setattr(time, name, lambda start=start: start + self.elapsed)
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(time, name, original)
+        self._originals = None
@@ -0,0 +1,212 @@
+import logging
+import queue
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Union
+
+import numpy as np
+from migen import Module as MigenModule
+from migen.build.generic_platform import GenericPlatform
+from migen.sim import run_simulation
+from misoc.integration import cpu_interface
+from misoc.interconnect import csr_bus
+
+from ...migen import AutoMigenModule
+from ..interface import BaseInterface
+from .clock import VirtualClock
+
+logger = logging.getLogger(__name__)
+
+
+class SimSoc(MigenModule):
+    """A minimal SoC exposing the registers of a design through a CSR bus, for simulation.
+
+    The CSR banks are laid out like in the SoC of the board, such that register
+    addresses match those of the built design.
+    """
+
+    csr_base = 0x80000000
+    csr_devices = ["identifier", "top"]
+
+    def __init__(self, module_class, platform=GenericPlatform, soc=None, csr_data_width=32, csr_address_width=14):
+        self.csr_data_width = csr_data_width
+        self.submodules.top = AutoMigenModule(module_class, platform, soc)
+        self.bus = csr_bus.Interface(csr_data_width, csr_address_width)
+        self.submodules.csrbankarray = csr_bus.CSRBankArray(
+            self, self.get_csr_dev_address, data_width=csr_data_width, address_width=csr_address_width
+        )
+        self.submodules.csrcon = csr_bus.Interconnect(self.bus, self.csrbankarray.get_buses())
+
+    def get_csr_dev_address(self, name, memory):
+        if memory is not None:
+            return None
+        try:
+            return self.csr_devices.index(name)
+        except ValueError:
+            return None
+
+    def get_csr_regions(self):
+        return [
+            (name, self.csr_base + 0x800 * mapaddr, self.csr_data_width, csrs)
+            for name, csrs, mapaddr, rmap in self.csrbankarray.banks
+        ]
+
+
+class SimInterface(BaseInterface):
+    """Runs a design in the migen simulator and services register accesses through its CSR bus.
+
+    The simulation runs in a background thread and only advances while a register is
+    accessed or :meth:`run` is called, so that driver code sees the same cycle-accurate
+    behaviour as on the board.
+
+    Args:
+        module_class: the :class:`TopModule` to simulate.
+        platform: the platform passed to the logic functions of the design.
+        soc: the SoC passed to the logic functions of the design. The bus models of a
+          :class:`~pypga.core.axi_model.SimAxiSoc` run alongside the design, and its RAM
+          image is read by :meth:`read_from_ram`.
+        clocks: the clock period of each clock domain in simulator time units.
+        vcd_name: if given, all signals are traced to this VCD file.
+    """
+
+    # idle cycles after each write, standing in for the latency of the AXI to CSR bridge on the board,
+    # such that a subsequent read sees the effect of the write and memory-backed registers have settled
+    write_latency = 4
+
+    def __init__(
+        self,
+        module_class,
+        platform=GenericPlatform,
+        soc=None,
+        clocks: Dict[str, int] = None,
+        vcd_name: str = None,
+    ):
+        self.soc = SimSoc(module_class, platform=platform, soc=soc)
+        self.design_soc = soc
+        self._result_directory = tempfile.TemporaryDirectory(prefix="pypga_sim_")
+        with (Path(self._result_directory.name) / "csr.csv").open("w") as f:
+            f.write(cpu_interface.get_csr_csv(self.soc.get_csr_regions()))
+        super().__init__(self._result_directory.name)
+        self.cycle = 0
+        self._commands = queue.Queue()
+        self._results = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run_simulation,
+            kwargs=dict(clocks=clocks or {"sys": 8}, vcd_name=vcd_name),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run_simulation(self, clocks, vcd_name):
+        try:
+            generators = self.design_soc.sim_generators() if hasattr(self.design_soc, "sim_generators") else []
+            run_simulation(self.soc, [self._process(), *generators], clocks=clocks, vcd_name=vcd_name)
+        except BaseException as e:
+            logger.exception("The simulation has failed.")
+            self._error = e
+
+    def _process(self):
+        """Executes the generators sent by :meth:`_execute` until ``None`` is received."""
+        while True:
+            command = self._commands.get()
+            if command is None:
+                return
+            try:
+                result = yield from command
+            except Exception as e:
+                self._results.put((None, e))
+            else:
+                self._results.put((result, None))
+
+    def _execute(self, command):
+        """Runs the generator ``command`` in the simulation and returns its result."""
+        if not self._thread.is_alive():
+            raise RuntimeError("The simulation is not running.") from self._error
+        self._commands.put(command)
+        while True:
+            try:
+                result, error = self._results.get(timeout=0.1)
+            except queue.Empty:
+                if not self._thread.is_alive():
+                    raise RuntimeError("The simulation has stopped.") from self._error
+            else:
+                break
+        if error is not None:
+            raise error
+        return result
+
+    def _bus_address(self, address: int) -> int:
+        return (address - self.soc.csr_base) >> 2
+
+    def _read(self, address):
+        value = yield from self.soc.bus.read(self._bus_address(address))
+        self.cycle += 2
+        return value
+
+    def _write(self, address, value):
+        yield from self.soc.bus.write(self._bus_address(address), value)
+        self.cycle += 1
+        yield from self._idle(self.write_latency)
+
+    def _idle(self, cycles):
+        for _ in range(cycles):
+            yield
+        self.cycle += cycles
+
+    def _read_values(self, address, length):
+        # same protocol as the server on the board: memory-backed registers are read by first selecting the index
+        if length == 1:
+            return [(yield from self._read(address))]
+        values = []
+        for i in range(length):
+            yield from self._write(address, (i << 1) | 1)
+            values.append((yield from self._read(address)))
+        return values
+
+    def _write_values(self, address, values):
+        if len(values) == 1:
+            yield from self._write(address, values[0])
+            return
+        for i, value in enumerate(values):
+            yield from self._write(address, (i << 1) | 1)
+            yield from self._write(address, value << 1)
+
+    def read_from_address(self, address: int, length: int = 1) -> Union[int, List[int]]:
+        read_value = self._execute(self._read_values(address, length))
+        if len(read_value) == 1:
+            return read_value[0]
+        else:
+            return read_value
+
+    def write_to_address(self, address: int, value: Union[int, List[int]]):
+        try:
+            write_value = [int(v) for v in value]
+        except TypeError:
+            write_value = [int(value)]
+        self._execute(self._write_values(address, write_value))
+
+    def read_from_ram(self, offset: int = 0, length: int = 1) -> np.ndarray:
+        if not hasattr(self.design_soc, "read_from_ram"):
+            raise RuntimeError("Reading from RAM requires simulating with a SoC model such as SimAxiSoc.")
+        return self.design_soc.read_from_ram(offset, length)
+
+    def write_to_ram(self, offset: int, values: np.ndarray):
+        if not hasattr(self.design_soc, "write_to_ram"):
+            raise RuntimeError("Writing to RAM requires simulating with a SoC model such as SimAxiSoc.")
+        self.design_soc.write_to_ram(offset, values)
+
+    def run(self, cycles: int):
+        """Advances the simulation by ``cycles`` clock cycles."""
+        self._execute(self._idle(int(cycles)))
+
+    def virtual_clock(self, clock_period: float = 8e-9, max_sleep_cycles: int = None) -> VirtualClock:
+        """Returns a context manager in which ``time.sleep`` advances the simulation, see :class:`VirtualClock`."""
+        return VirtualClock(self, clock_period=clock_period, max_sleep_cycles=max_sleep_cycles)
+
+    def stop(self):
+        if self._thread.is_alive():
+            self._commands.put(None)
+            self._thread.join()
+        self._result_directory.cleanup()
@@ -0,0 +1,208 @@
+"""
+Structured metrics of gateware builds.
+
+After each build, resource utilization and timing results are extracted from
+the Vivado reports and stored as ``metrics.json`` next to the build artifacts.
+:class:`MetricsRegistry` allows to query these metrics across all stored builds,
+e.g. to track how the achievable clock rate of a design evolves over time.
+"""
+import json
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILENAME = "metrics.json"
+
+# names of the resources in the utilization report of 7-series devices
+UTILIZATION_RESOURCES = {
+    "Slice LUTs": "lut",
+    "Slice Registers": "ff",
+    "Block RAM Tile": "bram",
+    "DSPs": "dsp",
+}
+
+_CLOCK_SUMMARY_ROW = re.compile(r"^\s*(\S+)\s+\{[^}]*\}\s+([-\d.]+)\s+([-\d.]+)\s*$")
+
+
+def _to_number(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_utilization_report(text: str) -> Dict[str, Dict[str, float]]:
+    """Returns used and available amount of LUTs, flip-flops, block RAMs and DSPs."""
+    utilization = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line.startswith("|"):
+            continue
+        cells = [cell.strip() for cell in line.strip("|").split("|")]
+        name = cells[0].rstrip("*").strip()
+        key = UTILIZATION_RESOURCES.get(name)
+        if key is None or key in utilization or len(cells) < 4:
+            continue
+        try:
+            utilization[key] = {
+                "used": _to_number(cells[1]),
+                "available": _to_number(cells[-2]),
+                "percent": _to_number(cells[-1]),
+            }
+        except ValueError:
+            logger.debug(f"Could not parse utilization row: {line}")
+    return utilization
+
+
+def _get_section(lines: List[str], title: str) -> List[str]:
+    """Returns the lines of a section titled ``| title`` in a Vivado report."""
+    for index, line in enumerate(lines):
+        if line.strip() == f"| {title}":
+            break
+    else:
+        return []
+    section = []
+    # skip the underline of the title and the closing dashed line
+    for line in lines[index + 3 :]:
+        if line.startswith("| ") or re.fullmatch(r"-{20,}", line.strip()):
+            break
+        section.append(line)
+    return section
+
+
+def _get_table(section: List[str], first_column: str) -> List[str]:
+    """Returns the rows of the table in ``section`` whose header starts with ``first_column``."""
+    rows = []
+    in_table = False
+    for line in section:
+        if not in_table:
+            in_table = line.strip().startswith(first_column)
+            continue
+        if line.strip().startswith("---"):
+            continue
+        if not line.strip():
+            if rows:
+                break
+            continue
+        rows.append(line)
+    return rows
+
+
+def parse_timing_summary(text: str) -> Dict[str, Any]:
+    """Returns worst negative/hold slack, total negative slack and per-clock Fmax of a timing summary."""
+    lines = text.splitlines()
+    timing = {}
+    design = _get_table(_get_section(lines, "Design Timing Summary"), "WNS(ns)")
+    if design:
+        values = design[0].split()
+        for index, key in [(0, "wns"), (1, "tns"), (2, "tns_failing_endpoints"), (4, "whs"), (5, "ths")]:
+            timing[key] = _to_number(values[index])
+    clocks = {}
+    for row in _get_table(_get_section(lines, "Clock Summary"), "Clock"):
+        match = _CLOCK_SUMMARY_ROW.match(row)
+        if match is not None:
+            clocks[match.group(1)] = {"period": float(match.group(2))}
+    for row in _get_table(_get_section(lines, "Intra Clock Table"), "Clock"):
+        values = row.split()
+        # clocks without any setup paths only report the pulse width columns
+        if values[0] not in clocks or len(values) < 9:
+            continue
+        clock = clocks[values[0]]
+        clock["wns"] = float(values[1])
+        clock["tns"] = float(values[2])
+        clock["fmax"] = 1e3 / (clock["period"] - clock["wns"])
+    if clocks:
+        timing["clocks"] = clocks
+    return timing
+
+
+def parse_timing_paths(text: str) -> List[Dict[str, Any]]:
+    """Returns start point, end point and slack of the paths in a summary-style ``report_timing``."""
+    paths = []
+    in_table = False
+    for line in text.splitlines():
+        values = line.split()
+        if not in_table:
+            in_table = len(values) >= 3 and values[0] == "Startpoint" and values[-1].startswith("Slack")
+            continue
+        if len(values) != 3 or values[0].startswith("---"):
+            continue
+        try:
+            slack = float(values[2])
+        except ValueError:
+            continue
+        paths.append({"startpoint": values[0], "endpoint": values[1], "slack": slack})
+    return paths
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        logger.debug(f"Report {path} not found, skipping its metrics.")
+        return ""
+
+
+def collect_build_metrics(build_path: Path, toolchain, **info) -> Dict[str, Any]:
+    """Parses the reports of a build in ``build_path`` and returns its metrics.
+
+    Any keyword arguments, such as the board, module name or design hash, are stored
+    alongside the metrics.
+    """
+    build_path = Path(build_path)
+    metrics = dict(info)
+    metrics["toolchain"] = toolchain.name
+    metrics["time"] = datetime.now().isoformat()
+    metrics["utilization"] = parse_utilization_report(_read(build_path / toolchain.utilization_report_name))
+    metrics["timing"] = parse_timing_summary(_read(build_path / toolchain.timing_summary_report_name))
+    metrics["paths"] = parse_timing_paths(_read(build_path / toolchain.timing_report_name))
+    return metrics
+
+
+def write_build_metrics(path: Path, metrics: Dict[str, Any]):
+    with (Path(path) / METRICS_FILENAME).open("w") as f:
+        json.dump(metrics, f, indent=2)
+
+
+class MetricsRegistry:
+    """Queries the metrics of all builds stored below ``result_path``.
+
+    Args:
+        result_path: the folder containing the build results, defaults to ``settings.result_path``.
+    """
+
+    def __init__(self, result_path: Path = None):
+        self.result_path = Path(settings.result_path if result_path is None else result_path)
+
+    def query(self, board: str = None, module: str = None) -> List[Dict[str, Any]]:
+        """Returns the metrics of all builds matching ``board`` and ``module``, oldest first."""
+        pattern = f"{board or '*'}/{module or '*'}/*/{METRICS_FILENAME}"
+        entries = []
+        for filename in self.result_path.glob(pattern):
+            with filename.open() as f:
+                entries.append(json.load(f))
+        return sorted(entries, key=lambda entry: entry.get("time", ""))
+
+    def history(self, key: str, board: str = None, module: str = None) -> List[Tuple[str, Any]]:
+        """Returns ``(time, value)`` of a metric for all builds that report it.
+
+        Args:
+            key: dotted path of the metric, e.g. ``"timing.wns"``, ``"utilization.dsp.used"``
+              or ``"timing.clocks.clk_adc.fmax"``.
+        """
+        history = []
+        for entry in self.query(board=board, module=module):
+            value = entry
+            for part in key.split("."):
+                if not isinstance(value, dict) or part not in value:
+                    break
+                value = value[part]
+            else:
+                history.append((entry["time"], value))
+        return history
@@ -1,5 +1,5 @@
-import hashlib
 import logging
+import time
 import typing
 
 from misoc.interconnect.csr import AutoCSR, CSRStatus, CSRStorage
@@ -10,20 +10,54 @@ from migen import Signal
 from migen.build.generic_platform import GenericPlatform
 from migen.fhdl.verilog import convert
 
+from .hashing import hash_verilog
 from .register import _Register
 
 logger = logging.getLogger(__name__)
 
 
+class ElaborationProfile:
+    """Collects the time spent elaborating the submodules and logic functions of a design.
+
+    Times are keyed by the hierarchical path of the element, e.g. ``top.daq`` for the
+    submodule ``daq`` (including its own submodules and logic) or ``top.daq._daq()``
+    for the logic function ``_daq`` of that submodule.
+    """
+
+    def __init__(self):
+        self.timings = {}
+
+    def add(self, path: str, seconds: float):
+        self.timings[path] = self.timings.get(path, 0.0) + seconds
+
+    def report(self, limit: int = None) -> str:
+        """Returns a table of all timings, sorted by decreasing duration."""
+        timings = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        return "\n".join(
+            f"{seconds * 1e3:10.3f} ms  {path}" for path, seconds in timings[:limit]
+        )
+
+
 class AutoMigenModule(MigenModule, AutoCSR):
     """This class is the migen representation of a ``Module``.
 
     Args:
         module_class (:class:`Module`): The module definition to extract a migen module from.
+        profile (:class:`ElaborationProfile`): If given, the time spent in each submodule
+            and logic function is recorded in this profile.
+        path (str): The hierarchical name of this module, used for the profile.
 
     """
 
-    def __init__(self, module_class, platform: GenericPlatform, soc: typing.Any, omit_csr: bool = False):
+    def __init__(
+        self,
+        module_class,
+        platform: GenericPlatform,
+        soc: typing.Any,
+        omit_csr: bool = False,
+        profile: ElaborationProfile = None,
+        path: str = "top",
+    ):
         logger.debug(f"Creating migen module for module class {module_class.__name__}.")
         registers = module_class._pypga_registers
         logic_functions = module_class._pypga_logic
@@ -39,15 +73,25 @@ class AutoMigenModule(MigenModule, AutoCSR):
             self._add_register(register, name, omit_csr = omit_csr)
         # then create the submodules to be able to access them from the logic at this level
         for name, submodule in submodules.items():
-            self._add_submodule(submodule, name, platform, soc, omit_csr = omit_csr)
+            start = time.perf_counter()
+            self._add_submodule(
+                submodule, name, platform, soc, omit_csr = omit_csr, profile=profile, path=f"{path}.{name}"
+            )
+            if profile is not None:
+                profile.add(f"{path}.{name}", time.perf_counter() - start)
         # finally add all the custom logic
         for name, logic_function in logic_functions.items():
+            start = time.perf_counter()
             self._add_logic_function(logic_function, name, platform=platform, soc=soc)
+            if profile is not None:
+                profile.add(f"{path}.{name}()", time.perf_counter() - start)
         logger.debug(f"Finished migen module for module class {module_class.__name__}.")
 
-    def _add_submodule(self, submodule, name, platform, soc, omit_csr = False):
+    def _add_submodule(self, submodule, name, platform, soc, omit_csr = False, profile=None, path=None):
         logger.debug(f"Creating submodule {name} of type {submodule.__name__}.")
-        migen_submodule = AutoMigenModule(submodule, platform, soc, omit_csr = omit_csr)
+        migen_submodule = AutoMigenModule(
+            submodule, platform, soc, omit_csr = omit_csr, profile=profile, path=path or name
+        )
         setattr(self.submodules, name, migen_submodule)
         # TODO: remove the next line, it seems to be redundant as migen automatically does this
         setattr(
@@ -81,9 +125,5 @@ class AutoMigenModule(MigenModule, AutoCSR):
         This is used to decide whether a design has been build or still needs to be.
         """
         verilog = convert(self)
-        hash_ = hashlib.sha256()
-        hash_.update(verilog.main_source.encode())
-        for filename, content in verilog.data_files.items():
-            hash_.update(filename.encode())
-            hash_.update(content.encode())
-        return hash_.hexdigest()
+        return hash_verilog(verilog.main_source, sorted(verilog.data_files.items()))
+
@@ -2,15 +2,11 @@ import functools
 import logging
 import typing
 import os
-import inspect
 from typing import Callable
 from migen.build.generic_platform import GenericPlatform
 
-from .builder import get_builder
-from .interface import LocalInterface, RemoteInterface
 from .logic_function import is_logic
 from .register import _Register
-from .migen import AutoMigenModule
 
 logger = logging.getLogger(__name__)
 
@@ -147,212 +143,99 @@ class Module:
         return 0xA000000
     
     @classmethod
-    def sim(cls, num_steps, query, platform = GenericPlatform, soc = None, omit_csr = True):
-        from migen.sim import run_simulation
-        
+    def elaboration_report(cls, platform = GenericPlatform, soc = None, omit_csr = True, limit = None) -> str:
+        """Elaborates the module and returns the time spent in each submodule and logic function."""
+        from .migen import AutoMigenModule, ElaborationProfile
+
+        profile = ElaborationProfile()
+        AutoMigenModule(cls, platform, soc, omit_csr = omit_csr, profile = profile)
+        return profile.report(limit = limit)
+
+    @classmethod
+    def sim(
+        cls,
+        num_steps,
+        query,
+        platform = GenericPlatform,
+        soc = None,
+        omit_csr = True,
+        backend = "migen",
+        waveform = None,
+        trace = None,
+    ):
+        """Simulates the module for ``num_steps`` clock cycles.
+
+        Args:
+            query: maps dotted signal paths to ``None`` to record the signal, a dict
+              ``{cycle: value}`` to set it in the given cycles, an array, list, iterator or
+              filename of a ``.npy`` file (memory-mapped) with its value in consecutive cycles,
+              or a callable ``f(i, **signals)`` returning its value in cycle ``i`` from the
+              values of the signals named by its remaining arguments.
+            backend: ``"migen"`` for migen's simulator or ``"icarus"`` for the much faster
+              Icarus Verilog, which only supports stimuli that do not depend on signals.
+            waveform: if given, the signals are streamed to this VCD or FST file while simulating.
+            trace: shell-style patterns of the dotted paths of the signals to write to
+              ``waveform``, e.g. ``["pulseburst.*", "value"]``. All signals are written if omitted.
+            soc: the SoC passed to the logic functions. Pass a :class:`~pypga.core.axi_model.SimAxiSoc`
+              to simulate modules writing to RAM through the AXI HP ports.
+
+        Returns:
+            a :class:`SimResult` with one numpy array of samples per signal in ``query``,
+            which still unpacks into ``(t, results)`` expanded for step plots.
+        """
+        from .migen import AutoMigenModule
+        from .simulation import SIM_BACKENDS
+
         module = AutoMigenModule(cls, platform, soc, omit_csr = omit_csr)
-        t = []
-        results = {k: [] for k in query}
-        
-        def getattr_(obj, lst):
-            """
-            Equivalent for getattr() for nested objects
-            """
-            if len(lst) == 1:
-                return getattr(obj, lst[0])
-            else:
-                return getattr_(getattr(obj, lst[0]), lst[1:])
-            
-        def sim():
-            """
-            Run simulation and store parameter values in global lists
-            """
-            for i in range(num_steps):
-                t.extend([i, i+1])
-                for k, v in query.items():
-                    # try:
-                    #     yield getattr_(module, k.split('.')).eq(v(i))
-                    #     val = (yield getattr_(module, k.split('.')))
-                    # except:
-                    if v is None:
-                        val = (yield getattr_(module, k.split('.')))
-                    if isinstance(v, dict):
-                        if i in v:
-                            yield getattr_(module, k.split('.')).eq(v[i])
-                        val = (yield getattr_(module, k.split('.')))
-                    if callable(v):
-                        arglist = inspect.getfullargspec(v).args
-                        kwargs = {}
-                        for arg in arglist[1:]:
-                            kwargs[arg] = (yield getattr_(module, arg.split('.')))
-                        yield getattr_(module, k.split('.')).eq(v(i, **kwargs))
-                        val = (yield getattr_(module, k.split('.')))
-                    results[k].extend([val]*2)
-                yield
-                
-        run_simulation(module, sim())
-        return t, results    
-    
+        # SoC models such as SimAxiSoc contribute the generators of their bus models
+        generators = soc.sim_generators() if hasattr(soc, "sim_generators") else []
+        return SIM_BACKENDS[backend](
+            module, num_steps, query, waveform = waveform, trace = trace, generators = generators
+        )
+
     @classmethod
-    def vis(cls, fname, platform = GenericPlatform, soc = None, omit_csr = True):
-        from migen.fhdl.structure import _Assign, Signal, _Operator, Constant, If, Case, Cat, _Slice
-        
-        if os.path.splitext(fname)[1] != '.pdf':
-            raise ValueError('Only PDF output is supported.')
-        
-        def get_name(signal):
-            """
-            Get name of a signal, omitting common prefixes.
-            """
-            pre = signal.backtrace[-2][0]
-            if pre.endswith('automigenmodule') or pre.endswith('custom_numberregister') or pre.endswith('custom_fixedpointregister') or pre.endswith('custom_boolregister'):
-                pre = ''
-            else:
-                pre += '.'
-            return (pre + signal.backtrace[-1][0])
-        
-        def handle_signal(s):
-            return {str(id(s)): {'name': get_name(s), 'nbits': s.nbits, 'signed': s.signed}}, set()
-        
-        def handle_constant(s):
-            # Don't include constants in visualization
-            return dict(), set()
-        
-        def handle_operator(s):
-            nodes = dict()
-            edges = set()
-            for o in s.operands:
-                handler = handler_mapping[type(o)]
-                n, e = handler(o)
-                nodes.update(n)
-                edges.update(e)
-                    
-            return nodes, edges
-        
-        def handle_assign(s):
-            nodes = dict()
-            edges = set()
-            
-            nl, el = handle_signal(s.l)
-            nodes.update(nl)
-            edges.update(el)
-            
-            handler = handler_mapping[type(s.r)]
-            nr, er = handler(s.r)
-            nodes.update(nr)
-            edges.update(er)
-            
-            for n in nr:
-                edges.add((n, next(iter(nl))))
-                
-            return nodes, edges
-        
-        def handle_cat(s):
-            nodes = dict()
-            edges = set()
-            
-            for r in s.l:
-                handler = handler_mapping[type(r)]
-                n, e = handler(r)
-                nodes.update(n)
-                edges.update(e)
-                
-            return nodes, edges
-                
-        def handle_if(s):
-            nodes = dict()
-            edges = set()
-            
-            for t in s.t:
-                handler = handler_mapping[type(t)]
-                n, e = handler(t)
-                nodes.update(n)
-                edges.update(e)
-            for f in s.f:
-                handler = handler_mapping[type(f)]
-                n, e = handler(f)
-                nodes.update(n)
-                edges.update(e)
-                
-            return nodes, edges
-        
-        def handle_case(s):
-            nodes = dict()
-            edges = set()
-            
-            for k, v in s.cases.items():
-                for r in v:
-                    handler = handler_mapping[type(r)]
-                    n, e = handler(r)
-                    nodes.update(n)
-                    edges.update(e)
-                
-            return nodes, edges
-        
-        def handle_slice(s):
-            return handle_signal(s.value)
-                
-        handler_mapping = {_Assign: handle_assign,
-                           Signal: handle_signal,
-                           _Operator: handle_operator,
-                           Constant: handle_constant, 
-                           If: handle_if,
-                           Case: handle_case,
-                           Cat: handle_cat,
-                           _Slice: handle_slice}
-        
-        nodes = dict()
-        sync_edges = set()
-        comb_edges = set()
+    def graph(cls, platform = GenericPlatform, soc = None, omit_csr = True):
+        """Returns the :class:`~pypga.core.graph.SignalGraph` of the module and all of its submodules."""
+        from .graph import SignalGraph
+        from .migen import AutoMigenModule
+
+        return SignalGraph(AutoMigenModule(cls, platform, soc, omit_csr = omit_csr))
+
+    @classmethod
+    def timing_report(cls, platform = GenericPlatform, soc = None, omit_csr = True, clock_periods = None, margin = 0.2):
+        """Estimates the critical paths of each clock domain without building the design.
+
+        Args:
+            clock_periods: the clock period of each domain in ns, 8 ns by default.
+            margin: paths with a slack below this fraction of the period are critical.
+
+        Returns:
+            a :class:`~pypga.core.timing.TimingReport`, whose ``violations`` are the paths
+            estimated to fail timing.
+        """
+        from .migen import AutoMigenModule
+        from .timing import estimate_timing
+
         module = AutoMigenModule(cls, platform, soc, omit_csr = omit_csr)
+        return estimate_timing(module, clock_periods = clock_periods, margin = margin)
 
-        for s in module.sync._fm._fragment.sync['sys']:
-            #print(s)
-            handler = handler_mapping[type(s)]
-            n, e = handler(s)
-            nodes.update(n)
-            sync_edges.update(e)
-        
-        for s in module.sync._fm._fragment.comb:
-            #print(s)
-            handler = handler_mapping[type(s)]
-            n, e = handler(s)
-            nodes.update(n)
-            comb_edges.update(e)
-        
-        for s in module.comb._fm._fragment.sync['sys']:
-            #print(s)
-            handler = handler_mapping[type(s)]
-            n, e = handler(s)
-            nodes.update(n)
-            sync_edges.update(e)
-        
-        for s in module.comb._fm._fragment.comb:
-            #print(s)
-            handler = handler_mapping[type(s)]
-            n, e = handler(s)
-            nodes.update(n)
-            comb_edges.update(e)
-        
-        import graphviz
-        dot = graphviz.Digraph('DAQ')
-        
-        for k, v in nodes.items():
-            if v['signed']:
-                color = "0.0 " + str(0.1 + 0.9*v['nbits']**2 / (400 + v['nbits']**2)) + " 0.9"
-            else:
-                color = "0.333 " + str(0.1 + 0.9*v['nbits']**2 / (400 + v['nbits']**2)) + " 0.9"
-            dot.node(k, f"<<b>{v['name']}</b><br/>bits={v['nbits']}<br/>signed={v['signed']}>", style="filled", fillcolor=color)
-            
-        for p in sync_edges:
-            a, b = p
-            dot.edge(a, b)
-            
-        for p in comb_edges:
-            a, b = p
-            dot.edge(a, b, color="black:none:black", arrowhead="none")
-            
-        dot.render(os.path.splitext(fname)[0], cleanup=True)
+    @classmethod
+    def vis(cls, fname, platform = GenericPlatform, soc = None, omit_csr = True):
+        """Writes the signal dependency graph of the module to ``fname``.
+
+        The format is chosen by the extension: ``.json`` and ``.graphml`` are written
+        directly, ``.pdf`` is rendered with graphviz.
+        """
+        extension = os.path.splitext(fname)[1]
+        if extension not in (".pdf", ".json", ".graphml"):
+            raise ValueError("Only PDF, JSON and GraphML output is supported.")
+        graph = cls.graph(platform = platform, soc = soc, omit_csr = omit_csr)
+        if extension == ".json":
+            graph.to_json(fname)
+        elif extension == ".graphml":
+            graph.to_graphml(fname)
+        else:
+            graph.to_graphviz(cls.__name__).render(os.path.splitext(fname)[0], cleanup = True)
 
 
 DEFAULT_BOARD = "stemlab125_14"
@@ -360,12 +243,13 @@ DEFAULT_BOARD = "stemlab125_14"
 
 class TopModule(Module):
     @classmethod
-    def _build(cls, board=DEFAULT_BOARD):
-        builder = get_builder(board=board, module_class=cls)
+    def _build(cls, board=DEFAULT_BOARD, toolchain=None):
+        from .builder import get_builder
+
+        builder = get_builder(board=board, module_class=cls, toolchain=toolchain)
         return builder.build()
 
     @classmethod
-    @functools.wraps(RemoteInterface)
     def run(
         cls,
         *args,
@@ -374,10 +258,29 @@ class TopModule(Module):
         board=DEFAULT_BOARD,
         autobuild=True,
         forcebuild=False,
+        toolchain=None,
+        simulate=False,
+        sim_soc=None,
         **kwargs,
     ):
-        """Runs the design on a board and returns an interfaced instance."""
-        builder = get_builder(board=board, module_class=cls)
+        """Runs the design on a board and returns an interfaced instance.
+
+        ``host`` and ``password`` are passed to :class:`RemoteInterface`, or a
+        :class:`LocalInterface` is used if no host is given. With ``simulate=True``,
+        the design is not built but runs in the migen simulator behind a
+        :class:`SimInterface`, with ``sim_soc`` as SoC model, e.g. a
+        :class:`~pypga.core.axi_model.SimAxiSoc`. Measurement scripts can then
+        run in the virtual time of the simulation, see :class:`VirtualClock`.
+        """
+        if simulate:
+            from .interface import SimInterface
+
+            return cls(*args, interface=SimInterface(cls, soc=sim_soc), **kwargs)
+
+        from .builder import get_builder
+        from .interface import LocalInterface, RemoteInterface
+
+        builder = get_builder(board=board, module_class=cls, toolchain=toolchain)
         if forcebuild or not builder.result_exists:
             if autobuild or forcebuild:
                 builder.build()
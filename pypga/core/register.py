@@ -2,9 +2,6 @@ import functools
 import logging
 
 import numpy as np
-from misoc.interconnect.csr import CSRStatus, CSRStorage
-
-from migen import If, Memory, Signal
 
 from .common import CustomizableMixin
 
@@ -12,6 +9,9 @@ logger = logging.getLogger(__name__)
 
 class _Register(CustomizableMixin):
     def _add_migen_commands(self, name, module, omit_csr = False):
+        from migen import If, Memory, Signal
+        from misoc.interconnect.csr import CSRStatus, CSRStorage
+
         name_csr = f"{name}_csr"
         if self.ram_offset is not None:
             # nothing to do, the register is simply an area in RAM
@@ -46,7 +46,7 @@ class _Register(CustomizableMixin):
                     self.from_python(self.before_from_python(v)) for v in self.default
                 ]
             if self.reverse:
-                initial_data = reversed(initial_data)
+                initial_data = list(reversed(initial_data))
             memory = Memory(width=self.width, depth=self.depth, init=initial_data)
             setattr(module.specials, f"{name}_memory", memory)
             ps_port = memory.get_port(
@@ -81,6 +81,8 @@ class _Register(CustomizableMixin):
                 module.comb += pl_port.dat_w.eq(value_signal)
                 setattr(module, f"{name}_index", pl_port.adr)
                 setattr(module, f"{name}_we", pl_port.we)
+                # the value at the index of the previous cycle, e.g. to accumulate into the memory
+                setattr(module, f"{name}_dat_r", pl_port.dat_r)
             else:
                 # write to the memory when new values are sent by the PS, indicated by LSB being low
                 update_value = Signal()
@@ -103,6 +105,7 @@ class _Register(CustomizableMixin):
     reverse: bool = False  # set True to invert the order of Python arrays.
     doc: str = ""
     ram_offset: int = None  # if True, data is read from RAM rather than from FPGA bus
+    ram_sample_width: int = 64  # bits per sample in RAM: 64 for one sample per AXI beat, 16 or 32 for packed samples
 
     signed: bool = False
 
@@ -138,6 +141,20 @@ class _Register(CustomizableMixin):
     def before_from_python(self, value):
         return value
 
+    def _from_python_array(self, value) -> np.ndarray:
+        """Faster version of from_python(before_from_python()) for arrays can be implemented here in subclasses"""
+        return np.array([self.from_python(self.before_from_python(v)) for v in value], dtype=np.int64)
+
+    def _saturate_array(self, value: np.ndarray, min, max) -> np.ndarray:
+        """Clips ``value`` to ``[min, max]``, with one warning for all saturated values."""
+        if min is not None and np.any(value < min):
+            logger.warning(f"Negative saturation for {self.name}: {np.count_nonzero(value < min)} values < {min}")
+            value = np.maximum(value, min)
+        if max is not None and np.any(value > max):
+            logger.warning(f"Positive saturation for {self.name}: {np.count_nonzero(value > max)} values > {max}")
+            value = np.minimum(value, max)
+        return value
+
     def __get__(self, instance, owner=None):
         logger.debug(f"Reading {self.name} with {instance}/{owner}")
         if instance is None:
@@ -152,17 +169,87 @@ class _Register(CustomizableMixin):
                     self._get_full_name(instance), length=self.depth
                 )
             else:
-                value = instance._interface.read_from_ram(self.ram_offset, self.depth*2)[::2]
+                value = self._read_from_ram(instance)
             if self.reverse:
-                value = reversed(value)
+                value = list(reversed(value))
             return self._to_python_array(value)
 
+    @property
+    def _ram_width(self):
+        # samples of a full beat are read as their lower 32 bits
+        return min(self.ram_sample_width, 32)
+
+    def _read_from_ram(self, instance, start=0, length=None):
+        """Reads raw samples from RAM, unpacking samples that share an AXI beat."""
+        if length is None:
+            length = self.depth - start
+        # reads start at a 32-bit word
+        skip = start % max(32 // self.ram_sample_width, 1)
+        offset = self.ram_offset + (start - skip) * self.ram_sample_width // 8
+        words = -(-(skip + length) * self.ram_sample_width // 32)
+        value = np.asarray(instance._interface.read_from_ram(offset, words), dtype=np.uint32)
+        if self.ram_sample_width == 64:
+            return value[::2]
+        return value.view(np.uint16 if self.ram_sample_width == 16 else np.uint32)[skip : skip + length]
+
+    def read_from_ram(self, instance, start: int = 0, length: int = None):
+        """Reads the samples ``start`` to ``start + length`` of a register in RAM."""
+        if self.ram_offset is None:
+            raise ValueError(f"The register {self.name} is not in RAM.")
+        return self._to_python_array(self._read_from_ram(instance, start, length))
+
+    def write_to_ram(self, instance, value, start: int = 0):
+        """Writes the samples ``value`` to a register in RAM, starting at sample ``start``.
+
+        Samples are sign-extended to their width in RAM. The samples sharing the 32-bit
+        words at either end of the written range keep their values.
+        """
+        if self.ram_offset is None:
+            raise ValueError(f"The register {self.name} is not in RAM.")
+        value = self._from_python_array(value)
+        if len(value) > self.depth - start:
+            raise ValueError(f"{len(value)} samples from {start} on do not fit into the register {self.name}.")
+        if self.signed:
+            value[value >= (1 << (self.width - 1))] -= 1 << self.width
+        if self.ram_sample_width == 64:
+            words = value.view(np.uint32)
+            offset = self.ram_offset + start * 8
+        else:
+            samples_per_word = 32 // self.ram_sample_width
+            skip = start % samples_per_word
+            first = start - skip
+            count = -(-(skip + len(value)) // samples_per_word)
+            dtype = np.uint16 if self.ram_sample_width == 16 else np.uint32
+            offset = self.ram_offset + first * self.ram_sample_width // 8
+            # read the words at the ends of the range to keep the samples they share
+            samples = np.asarray(instance._interface.read_from_ram(offset, count), dtype=np.uint32).view(dtype).copy()
+            samples[skip : skip + len(value)] = value.astype(dtype)
+            words = samples.view(np.uint32)
+        instance._interface.write_to_ram(offset, words)
+
+    def read(self, instance, start: int = 0, length: int = None):
+        """Reads the samples ``start`` to ``start + length`` of a register with depth, in memory order.
+
+        Memories in the FPGA are always read from their first sample, so reading a slice at their
+        end takes as long as reading the memory up to it.
+        """
+        if length is None:
+            length = self.depth - start
+        if self.ram_offset is not None:
+            return self.read_from_ram(instance, start, length)
+        value = instance._interface.read_array(self._get_full_name(instance), length=start + length)
+        return self._to_python_array(np.atleast_1d(value)[start:])
+
     def __set__(self, instance, value):
-        if self.readonly or self.ram_offset is not None:
+        if self.readonly:
             raise ValueError(
                 f"The register {self.instance.name}.{self.name} is read-only."
             )
-        if self.depth == 1:
+        if self.ram_offset is not None:
+            if self.reverse:
+                value = list(reversed(value))
+            self.write_to_ram(instance, value)
+        elif self.depth == 1:
             value = self.from_python(self.before_from_python(value))
             instance._interface.write(self._get_full_name(instance), value)
             #self.raw_int_value=value
@@ -220,6 +307,8 @@ class _TriggerRegister(_Register):
         )
 
     def _add_migen_commands(self, name, module, omit_csr = False):
+        from misoc.interconnect.csr import CSRStorage
+
         name_csr = f"{name}_csr"
         csr_instance = CSRStorage(size=self.width, reset=self.default, name=name_csr)
         setattr(module, name_csr, csr_instance)
@@ -250,8 +339,7 @@ class _NumberRegister(_Register):
         if self.ram_offset is None:
             width=self.width
         else:
-            width=32 # it is always transferred as 32bit when coming from RAM DMA 
-            #TODO: fix this some time
+            width=self._ram_width # samples in RAM are sign-extended to their width
         if self.signed:
             if value >= (1 << (width - 1)):
                 value -= 1 << width
@@ -263,13 +351,27 @@ class _NumberRegister(_Register):
         if self.ram_offset is None:
             width=self.width
         else:
-            width=32 # it is always transferred as 32bit when coming from RAM
+            width=self._ram_width # samples in RAM are sign-extended to their width
         value = np.asarray(value, dtype="float").copy()
         value -= self.offset_from_python
         if self.signed:
             value[value >= (1 << (width - 1))] -= 1 << width
         return value
 
+    def _from_python_array(self, value) -> np.ndarray:
+        if self.width >= 63:
+            # the two's complement does not fit into int64
+            return _Register._from_python_array(self, value)
+        value = self._saturate_array(np.asarray(value), self.min, self.max)
+        return self._from_int_array(np.asarray(value, dtype=np.int64))
+
+    def _from_int_array(self, value: np.ndarray) -> np.ndarray:
+        """Faster version of from_python() for arrays of integers."""
+        value = self._saturate_array(value, self._int_min, self._int_max)
+        if self.signed:
+            value = np.where(value < 0, value + (1 << self.width), value)
+        return self._saturate_array(value + self.offset_from_python, 0, 1 << self.width)
+
     def before_from_python(self, value):
         if self.max is not None and value > self.max:
             value = self.max
@@ -312,6 +414,14 @@ class _FixedPointRegister(_NumberRegister):
     #     """Faster version of to_python() for arrays can be implented here in subclasses"""
     #     return [self.to_python(v) for v in value]    
 
+    def _from_python_array(self, value) -> np.ndarray:
+        if self.width >= 63:
+            return _Register._from_python_array(self, value)
+        value = self._saturate_array(np.asarray(value, dtype=float), self.min, self.max)
+        # saturated before the conversion, such that values beyond the range of int64 do not wrap around
+        value = self._saturate_array(np.round(value * (2**self.decimals - 1)), self._int_min, self._int_max)
+        return self._from_int_array(value.astype(np.int64))
+
     def from_python(self, value):
         rawvalue=value
         value = int(round(float(value) * (2**self.decimals - 1)))
@@ -15,6 +15,7 @@ class Settings(BaseSettings):
 
     result_path: Path = ROOT_PATH / "./out"
     build_path: Path = ROOT_PATH / "./build"
+    toolchain: str = "vivado"
 
 
 settings = Settings()
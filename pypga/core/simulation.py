@@ -0,0 +1,342 @@
+"""
+Simulation backends for :meth:`Module.sim`.
+
+The ``"migen"`` backend runs the design in migen's pure-Python simulator and
+supports all kinds of stimuli. The ``"icarus"`` backend converts the design to
+Verilog and simulates it with the compiled Icarus Verilog simulator, which is
+much faster for long simulations, but only supports stimuli that do not depend
+on the state of the design.
+"""
+import inspect
+import itertools
+import re
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, Sequence, Tuple
+
+import numpy as np
+from migen.fhdl.verilog import convert
+from migen.sim import run_simulation
+
+from .waveform import DEFAULT_PERIOD_NS, WaveformWriter, select_signals
+
+
+def get_signal(module, path: str):
+    """Returns the signal at the dotted ``path`` below ``module``, e.g. ``"pulseburst.out"``."""
+    obj = module
+    for name in path.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def load_stimulus(value):
+    """Returns a stimulus of a query in a form that can be fed to the simulation cycle by cycle.
+
+    Filenames of ``.npy`` files are memory-mapped and sequences are converted to numpy
+    arrays. Dicts, callables, iterators and ``None`` are returned unchanged.
+    """
+    if isinstance(value, (str, Path)):
+        return np.load(value, mmap_mode="r")
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value)
+    if value is None or isinstance(value, (dict, np.ndarray)) or callable(value):
+        return value
+    try:
+        return iter(value)
+    except TypeError:
+        raise TypeError(f"Unsupported stimulus: {value!r}")
+
+
+def _empty_column(signal, num_steps: int) -> np.ndarray:
+    # signals wider than 63 bits do not fit into int64
+    return np.zeros(num_steps, dtype=np.int64 if len(signal) < 64 else object)
+
+
+class SimResult:
+    """Columnar record of a simulation, with one sample of each queried signal per cycle.
+
+    ``result[key]`` returns the samples of a signal as a numpy array. For step plots,
+    :meth:`step` returns the samples with each value repeated at the start and end of
+    its cycle. Unpacking ``t, results = result`` yields such step-plot data for all
+    signals, as returned by :meth:`Module.sim` in previous versions.
+    """
+
+    def __init__(self, values: Dict[str, np.ndarray]):
+        self.values = values
+        self.cycles = np.arange(len(next(iter(values.values()), [])))
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.values[key]
+
+    def __len__(self) -> int:
+        return len(self.cycles)
+
+    def keys(self):
+        return self.values.keys()
+
+    def step(self, key: str):
+        """Returns ``(t, value)`` of a signal, expanded for a step plot."""
+        t = np.empty(2 * len(self), dtype=np.int64)
+        t[0::2] = self.cycles
+        t[1::2] = self.cycles + 1
+        return t, np.repeat(self.values[key], 2)
+
+    def __iter__(self) -> Iterator:
+        t = np.repeat(self.cycles, 2)
+        t[1::2] += 1
+        yield t
+        yield {key: np.repeat(value, 2) for key, value in self.values.items()}
+
+
+def run_migen(
+    module,
+    num_steps: int,
+    query: Dict[str, Any],
+    waveform: str = None,
+    trace: Sequence[str] = None,
+    generators: Sequence = (),
+) -> SimResult:
+    """Simulates ``module`` with migen's simulator, see :meth:`Module.sim` for the arguments.
+
+    Args:
+        generators: further simulation generators running alongside the stimuli, such as
+          bus-functional models of the SoC, which should be passive.
+    """
+    # resolve all signals and the arguments of callables once rather than in every cycle
+    signals = {k: get_signal(module, k) for k in query}
+    stimuli = {k: load_stimulus(v) for k, v in query.items()}
+    arguments = {
+        k: {arg: get_signal(module, arg) for arg in inspect.getfullargspec(v).args[1:]}
+        for k, v in stimuli.items()
+        if callable(v)
+    }
+    values = {k: _empty_column(signal, num_steps) for k, signal in signals.items()}
+    records = [(signals[k], stimuli[k], arguments.get(k), values[k]) for k in query]
+    writer = None
+    if waveform is not None:
+        writer = WaveformWriter(waveform, select_signals(module, trace))
+        traced = list(writer.signals.values())
+
+    def sim():
+        for i in range(num_steps):
+            for signal, v, args, column in records:
+                if isinstance(v, dict):
+                    if i in v:
+                        yield signal.eq(v[i])
+                elif isinstance(v, np.ndarray):
+                    # arrays are played once, after their end the signal is left to the design
+                    if i < len(v):
+                        yield signal.eq(int(v[i]))
+                elif args is not None:
+                    kwargs = {}
+                    for arg, arg_signal in args.items():
+                        kwargs[arg] = (yield arg_signal)
+                    yield signal.eq(int(v(i, **kwargs)))
+                elif v is not None:
+                    value = next(v, None)
+                    if value is not None:
+                        yield signal.eq(int(value))
+                column[i] = (yield signal)
+            if writer is not None:
+                sample = []
+                for signal in traced:
+                    sample.append((yield signal))
+                writer.sample(i, sample)
+            yield
+
+    try:
+        run_simulation(module, [sim(), *generators])
+    finally:
+        if writer is not None:
+            writer.close(num_steps)
+    return SimResult(values)
+
+
+# testbench for the icarus backend: values are sampled before each rising clock edge, and stimuli
+# are applied right after it, such that they take effect one cycle later like in the migen simulator
+_TESTBENCH = """\
+`timescale 1ns / 1ps
+module pypga_testbench;
+{declarations}
+integer cycle;
+integer results;
+top dut(
+{connections}
+);
+initial begin
+{initialization}
+	results = $fopen("results.txt", "w");
+	for (cycle = 0; cycle < {num_steps}; cycle = cycle + 1) begin
+		#{half_period};
+		$fwrite(results, "{formats}\\n"{samples});
+		sys_clk = 1;
+		#{half_period};
+{stimuli}
+		sys_clk = 0;
+	end
+	$fclose(results);
+	$finish;
+end
+endmodule
+"""
+
+_PORT = re.compile(r"^\s*(input|output|inout)\s+(?:reg\s+)?(?:signed\s+)?(\[[^\]]+\]\s+)?(\w+)", re.M)
+
+
+def _get_ports(main_source: str) -> Dict[str, Tuple[str, str]]:
+    """Returns direction and range of the ports of the top module."""
+    header = main_source[: main_source.index(");")]
+    return {name: (direction, (width or "").strip()) for direction, width, name in _PORT.findall(header)}
+
+
+def _to_unsigned(value: int, width: int) -> int:
+    return int(value) & ((1 << width) - 1)
+
+
+def run_icarus(
+    module,
+    num_steps: int,
+    query: Dict[str, Any],
+    waveform: str = None,
+    trace: Sequence[str] = None,
+    build_dir: str = None,
+    generators: Sequence = (),
+) -> SimResult:
+    """Simulates ``module`` with Icarus Verilog, see :meth:`Module.sim` for the arguments.
+
+    Stimuli must be dicts or callables of the cycle only, as the testbench is
+    generated before the simulation starts. Waveforms are dumped by Icarus
+    itself, in the flat namespace of the generated Verilog.
+
+    Args:
+        build_dir: the folder for the generated sources and results, a
+          temporary folder is used if omitted.
+    """
+    if generators:
+        raise ValueError("Simulation generators, e.g. of bus models, are only supported by the migen backend.")
+    signals = {k: get_signal(module, k) for k in query}
+    stimuli = {}
+    for k, v in query.items():
+        v = load_stimulus(v)
+        if v is None:
+            continue
+        valid = np.zeros(num_steps, dtype=bool)
+        values = np.zeros(num_steps, dtype=object)
+        if isinstance(v, dict):
+            for i, value in v.items():
+                if 0 <= i < num_steps:
+                    valid[i], values[i] = True, value
+        elif isinstance(v, np.ndarray):
+            length = min(len(v), num_steps)
+            valid[:length], values[:length] = True, v[:length]
+        elif callable(v):
+            if len(inspect.getfullargspec(v).args) > 1:
+                raise ValueError(
+                    f"The stimulus for {k} depends on signals of the design, which is only "
+                    f"supported by the migen simulation backend."
+                )
+            valid[:] = True
+            values[:] = [v(i) for i in range(num_steps)]
+        else:
+            samples = list(itertools.islice(v, num_steps))
+            valid[: len(samples)], values[: len(samples)] = True, samples
+        stimuli[k] = (values, valid)
+    for tool in ["iverilog", "vvp"]:
+        if shutil.which(tool) is None:
+            raise RuntimeError(f"The icarus simulation backend requires `{tool}` to be installed.")
+    verilog = convert(module, ios=set(signals.values()))
+    names = {k: verilog.ns.get_name(signal) for k, signal in signals.items()}
+    ports = _get_ports(verilog.main_source)
+    declarations = ["reg sys_clk;", "reg sys_rst;"]
+    connections = []
+    for name, (direction, width) in ports.items():
+        if name not in ("sys_clk", "sys_rst"):
+            declarations.append(f"{'reg' if direction == 'input' else 'wire'} {width} {name};".replace("  ", " "))
+        connections.append(f"\t.{name}({name})")
+    initialization = ["\tsys_clk = 0;", "\tsys_rst = 0;"]
+    initialization += [
+        f"\t{name} = 0;" for name, (direction, width) in ports.items() if direction == "input" and name not in ("sys_clk", "sys_rst")
+    ]
+    stimuli_lines = []
+    stimuli_files = {}
+    for index, (k, (values, valid)) in enumerate(stimuli.items()):
+        if not valid.any():
+            continue
+        # stimulate ports directly and internal signals through hierarchical references
+        target = names[k] if ports.get(names[k], ("",))[0] == "input" else f"dut.{names[k]}"
+        width = len(signals[k])
+        memory = f"stimulus{index}"
+        declarations.append(f"reg [{width - 1}:0] {memory}[0:{num_steps - 1}];")
+        declarations.append(f"reg {memory}_valid[0:{num_steps - 1}];")
+        initialization.append(f'\t$readmemh("{memory}.mem", {memory});')
+        initialization.append(f'\t$readmemh("{memory}_valid.mem", {memory}_valid);')
+        stimuli_lines.append(f"\t\tif ({memory}_valid[cycle]) {target} = {memory}[cycle];")
+        unsigned = [_to_unsigned(value, width) for value in values]
+        stimuli_files[f"{memory}.mem"] = "\n".join(f"{value:x}" for value in unsigned)
+        stimuli_files[f"{memory}_valid.mem"] = "\n".join(np.where(valid, "1", "0"))
+    if waveform is not None:
+        dumped = []
+        for signal in select_signals(module, trace).values():
+            try:
+                dumped.append(f"dut.{verilog.ns.get_name(signal)}")
+            except KeyError:
+                # signals that are not used by the design do not exist in the Verilog source
+                pass
+        if not dumped:
+            raise ValueError(f"No signals of the design match {trace}.")
+        dumpfile = "waveform" + Path(waveform).suffix
+        initialization.append(f'\t$dumpfile("{dumpfile}");')
+        initialization.append(f"\t$dumpvars(0, {', '.join(dumped)});")
+    testbench = _TESTBENCH.format(
+        declarations="\n".join(declarations),
+        connections=",\n".join(connections),
+        initialization="\n".join(initialization),
+        num_steps=num_steps,
+        half_period=DEFAULT_PERIOD_NS // 2,
+        formats=" ".join("%0d" for _ in query),
+        samples="".join(f", dut.{names[k]}" for k in query),
+        stimuli="\n".join(stimuli_lines),
+    )
+    with tempfile.TemporaryDirectory(prefix="pypga_sim_") as temporary_dir:
+        path = Path(build_dir or temporary_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "top.v").write_text(verilog.main_source)
+        for filename, content in verilog.data_files.items():
+            (path / filename).write_text(content)
+        (path / "testbench.v").write_text(testbench)
+        for filename, content in stimuli_files.items():
+            (path / filename).write_text(content)
+        subprocess.run(
+            ["iverilog", "-o", "testbench.vvp", "-s", "pypga_testbench", "testbench.v", "top.v"],
+            cwd=path,
+            check=True,
+            capture_output=True,
+        )
+        fst = ["-fst"] if waveform is not None and Path(waveform).suffix == ".fst" else []
+        subprocess.run(["vvp", "-n", "testbench.vvp"] + fst, cwd=path, check=True, capture_output=True)
+        if waveform is not None:
+            shutil.copyfile(path / dumpfile, waveform)
+        samples = np.array((path / "results.txt").read_text().split()).reshape(num_steps, len(query))
+    return SimResult({k: _parse_samples(samples[:, j], signal) for j, (k, signal) in enumerate(signals.items())})
+
+
+def _parse_samples(column: np.ndarray, signal) -> np.ndarray:
+    """Converts the decimal strings printed by the testbench into the values of ``signal``."""
+    # undefined values are reported as zero, like in the migen simulator
+    column = np.where(np.char.isdigit(np.char.lstrip(column, "-")), column, "0")
+    if len(signal) < 64:
+        column = column.astype(np.int64)
+    else:
+        # wider values do not fit into int64 and are kept as Python integers
+        column = np.array([int(value) for value in column], dtype=object)
+    if signal.signed:
+        column[column >= 1 << (len(signal) - 1)] -= 1 << len(signal)
+    return column
+
+
+SIM_BACKENDS = {
+    "migen": run_migen,
+    "icarus": run_icarus,
+}
@@ -0,0 +1,108 @@
+"""
+Parallel parameter sweeps of simulations.
+
+:func:`sweep` simulates a module for every combination of a grid of
+parameters in a pool of processes and stacks the results. Since module classes
+created by factories like ``DAQ(...)`` cannot be sent to other processes, the
+factory and its arguments are sent instead and each process elaborates its own
+design.
+"""
+import inspect
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+
+def _simulate(task) -> Dict[str, np.ndarray]:
+    factory, factory_params, params, query, num_steps, seed, sim_kwargs = task
+    module_class = factory(**factory_params)
+    if callable(query):
+        query = query(np.random.default_rng(seed), **params)
+    return module_class.sim(num_steps, query, **sim_kwargs).values
+
+
+class SweepResult:
+    """The stacked results of a sweep.
+
+    ``result[key]`` returns the samples of a signal with shape ``(*shape, num_steps)``,
+    where ``shape`` has one axis per parameter in the order of the grid.
+    """
+
+    def __init__(self, grid: Dict[str, Sequence], params: List[Dict[str, Any]], values: Dict[str, np.ndarray]):
+        self.grid = grid
+        self.params = params
+        self.shape = tuple(len(v) for v in grid.values())
+        self.values = values
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        value = self.values[key]
+        return value.reshape(self.shape + value.shape[1:])
+
+    def keys(self):
+        return self.values.keys()
+
+    def to_dataframe(self):
+        """Returns a ``pandas.DataFrame`` with one row per parameter combination and cycle."""
+        import pandas as pd
+
+        num_steps = next(iter(self.values.values())).shape[1]
+        columns = {
+            name: np.repeat([params[name] for params in self.params], num_steps) for name in self.grid
+        }
+        columns["cycle"] = np.tile(np.arange(num_steps), len(self.params))
+        for key, value in self.values.items():
+            columns[key] = value.ravel()
+        return pd.DataFrame(columns)
+
+
+def sweep(
+    factory: Callable,
+    grid: Dict[str, Sequence],
+    query,
+    num_steps: int,
+    processes: int = None,
+    seed: int = 0,
+    **sim_kwargs,
+) -> SweepResult:
+    """Simulates a module for every combination of the parameters in ``grid``.
+
+    Args:
+        factory: returns the module class to simulate, e.g. ``DAQ``. Parameters of the grid
+          that are arguments of the factory are passed to it.
+        grid: the values of each parameter, e.g. ``{"data_width": [12, 14]}``.
+        query: the query passed to :meth:`Module.sim`, or a callable ``query(rng, **params)``
+          returning it for the given parameters. ``rng`` is a ``numpy.random.Generator``
+          seeded from ``seed`` and the index of the combination, such that random stimuli
+          are reproducible regardless of the number of processes.
+        num_steps: the number of simulated cycles.
+        processes: the number of worker processes, defaults to the number of cores.
+          With ``processes=1``, all simulations run in this process, which allows to use
+          lambdas and locally defined functions for ``factory`` and ``query``.
+        sim_kwargs: further arguments to :meth:`Module.sim`, e.g. ``backend="icarus"``.
+    """
+    factory_arguments = inspect.signature(factory).parameters
+    accepts_any = any(p.kind == inspect.Parameter.VAR_KEYWORD for p in factory_arguments.values())
+    names = list(grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    seeds = np.random.SeedSequence(seed).spawn(len(combinations))
+    tasks = [
+        (
+            factory,
+            {k: v for k, v in params.items() if accepts_any or k in factory_arguments},
+            params,
+            query,
+            num_steps,
+            seed,
+            sim_kwargs,
+        )
+        for params, seed in zip(combinations, seeds)
+    ]
+    if processes == 1:
+        results = list(map(_simulate, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_simulate, tasks))
+    values = {key: np.stack([result[key] for result in results]) for key in results[0]}
+    return SweepResult(grid, combinations, values)
@@ -0,0 +1,157 @@
+"""
+Static estimation of the critical paths of a design before it is built.
+
+The delay of each operator of the :class:`SignalGraph` is estimated from its
+kind and the widths of its operands with a coarse model of the fabric of the
+Zynq-7000 (speed grade -1): bitwise logic and multiplexers cost a LUT level,
+adders and comparators a carry chain growing with their width, and
+multipliers one or more cascaded DSP48 slices. The deepest
+register-to-register path ending at each register is compared with the clock
+period of its domain, which flags long chains like an unpipelined wide
+multiplication long before a Vivado run would.
+
+The estimates are not a replacement for the timing analysis of Vivado, but
+are consistent enough to compare design variants and to find hotspots.
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, List
+
+from migen.fhdl.bitcontainer import value_bits_sign
+from migen.fhdl.structure import Constant, _Operator
+
+from .graph import SignalGraph
+
+# delays in ns, including typical routing
+LUT_DELAY = 0.5
+CARRY_DELAY_PER_BIT = 0.03
+DSP_DELAY = 3.9
+DSP_CASCADE_DELAY = 1.6
+# clock-to-out and setup time of the registers at both ends of a path
+REGISTER_OVERHEAD = 0.6
+# operand widths of a single DSP48E1 multiplier, without sign bits
+DSP_WIDTHS = (24, 17)
+
+
+def _is_power_of_two(operand) -> bool:
+    return isinstance(operand, Constant) and operand.value > 0 and operand.value & (operand.value - 1) == 0
+
+
+def operator_delay(operator: _Operator) -> float:
+    """Returns the estimated delay of an operator in ns."""
+    op = operator.op
+    widths = [value_bits_sign(o)[0] for o in operator.operands]
+    width = max(widths)
+    if op in ("<<<", ">>>"):
+        if isinstance(operator.operands[1], Constant):
+            return 0.0
+        # barrel shifter of 4:1 multiplexers
+        return math.ceil(math.log2(max(width, 2)) / 2) * LUT_DELAY
+    if op == "*":
+        if any(_is_power_of_two(o) for o in operator.operands):
+            return 0.0
+        a, b = sorted(widths, reverse=True)
+        slices = math.ceil(a / DSP_WIDTHS[0]) * math.ceil(b / DSP_WIDTHS[1])
+        return DSP_DELAY + (slices - 1) * DSP_CASCADE_DELAY
+    if op in ("+", "-", "<", "<=", ">", ">="):
+        return LUT_DELAY + CARRY_DELAY_PER_BIT * width
+    if op in ("==", "!="):
+        # tree of 6-input LUTs
+        return math.ceil(math.log(max(2 * width, 2), 6)) * LUT_DELAY
+    return LUT_DELAY
+
+
+@dataclass
+class TimingPath:
+    """The deepest path of logic ending at a register.
+
+    Attributes:
+        domain: the clock domain of the register.
+        names: the signals along the path, from its start to the register.
+        operators: the operators along the path, e.g. ``["*34x32", "mux"]``.
+        delay: the estimated delay of the path in ns, including the register overhead.
+        period: the clock period of the domain in ns.
+    """
+
+    domain: str
+    names: List[str]
+    operators: List[str]
+    delay: float
+    period: float
+
+    @property
+    def slack(self) -> float:
+        return self.period - self.delay
+
+    @property
+    def logic_levels(self) -> int:
+        return len(self.operators)
+
+    def __str__(self):
+        return (
+            f"{self.domain:>6} {self.delay:6.2f} ns {self.slack:+6.2f} ns {self.logic_levels:3d}  "
+            f"{' -> '.join(self.names)}  [{' '.join(self.operators)}]"
+        )
+
+
+class TimingReport:
+    """The critical paths of each clock domain of a design.
+
+    Args:
+        graph: the graph of the design, built with :func:`operator_delay` as cost.
+        clock_periods: the clock period of each domain in ns.
+        default_period: the clock period of domains missing in ``clock_periods``.
+        margin: paths with a slack below this fraction of the period are reported as critical.
+    """
+
+    def __init__(
+        self, graph: SignalGraph, clock_periods: Dict[str, float] = None, default_period: float = 8.0, margin: float = 0.2
+    ):
+        self.graph = graph
+        self.clock_periods = clock_periods or {}
+        self.margin = margin
+        self.paths: List[TimingPath] = []
+        for node, (depth, path, kind) in graph.longest_paths().items():
+            if kind == "comb":
+                continue
+            self.paths.append(
+                TimingPath(
+                    domain=kind,
+                    names=[graph.nodes[n]["name"] for n in path],
+                    operators=graph.path_operators(path, kind),
+                    delay=depth + REGISTER_OVERHEAD,
+                    period=self.clock_periods.get(kind, default_period),
+                )
+            )
+        self.paths.sort(key=lambda path: path.slack)
+
+    def domain(self, domain: str) -> List[TimingPath]:
+        """Returns the paths ending at registers of ``domain``, starting with the most critical."""
+        return [path for path in self.paths if path.domain == domain]
+
+    @property
+    def violations(self) -> List[TimingPath]:
+        """The paths that are estimated not to meet timing."""
+        return [path for path in self.paths if path.slack < 0]
+
+    @property
+    def critical(self) -> List[TimingPath]:
+        """The paths with a slack below ``margin`` of the clock period, including violations."""
+        return [path for path in self.paths if path.slack < self.margin * path.period]
+
+    def report(self, limit: int = 10) -> str:
+        """Returns a table of the most critical paths."""
+        lines = [f"{'domain':>6} {'delay':>9} {'slack':>9} {'lvl':>3}  path"]
+        lines += [str(path) for path in self.paths[:limit]]
+        if self.violations:
+            lines.append(f"{len(self.violations)} path(s) are estimated to fail timing.")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+def estimate_timing(module, clock_periods: Dict[str, float] = None, default_period: float = 8.0, margin: float = 0.2):
+    """Returns the :class:`TimingReport` of a migen module, see :class:`TimingReport` for the arguments."""
+    graph = SignalGraph(module, cost=operator_delay, mux_cost=LUT_DELAY)
+    return TimingReport(graph, clock_periods=clock_periods, default_period=default_period, margin=margin)
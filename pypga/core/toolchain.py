@@ -0,0 +1,107 @@
+import hashlib
+import logging
+import os
+from abc import ABC, abstractmethod
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+toolchain_registry = {}
+
+
+def get_toolchain(name=None):
+    """Returns an instance of the toolchain ``name``, defaulting to ``settings.toolchain``."""
+    if name is None:
+        name = settings.toolchain
+    try:
+        return toolchain_registry[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown toolchain {name}. Available toolchains: {list(toolchain_registry)}."
+        )
+
+
+class BaseToolchain(ABC):
+    """Turns an elaborated SoC into build artifacts in a build folder."""
+
+    name = None
+    build_name = "top"
+    bitstream_name = "bitstream.bin"
+    log_name = "vivado.log"
+    timing_report_name = "top_post_route_timing.rpt"
+    timing_summary_report_name = "top_post_route_timing_summary.rpt"
+    utilization_report_name = "top_post_route_utilization.rpt"
+
+    def __init_subclass__(cls):
+        if cls.name is None:
+            raise ValueError(
+                f"{cls.__name__} is a subclass of BaseToolchain "
+                f"but does not define the ``name`` attribute."
+            )
+        toolchain_registry[cls.name] = cls
+
+    def timing_constraints_met(self, build_path) -> bool:
+        """Returns True if the build log reports that all timing constraints are met."""
+        with open(build_path / self.log_name, "r") as file:
+            lines = [line.strip() for line in file.readlines()]
+        return "All user specified timing constraints are met." in lines
+
+    def generate(self, soc, build_path):
+        """Writes the Verilog sources, constraints and build scripts for ``soc`` to ``build_path``."""
+        soc.build(build_dir=build_path, build_name=self.build_name, run=False)
+
+    @abstractmethod
+    def run(self, build_path):
+        """Creates all build artifacts from the sources previously generated in ``build_path``."""
+        pass
+
+
+class VivadoToolchain(BaseToolchain):
+    """Runs synthesis, implementation and bitstream generation with Vivado."""
+
+    name = "vivado"
+
+    def run(self, build_path):
+        """Runs Vivado through migen's build script, like ``soc.build(run=True)``.
+
+        The script works around locale issues of Vivado, and a failed run raises ``OSError``.
+        """
+        from migen.build.xilinx.vivado import _run_vivado
+
+        logger.debug("Running vivado build...")
+        cwd = os.getcwd()
+        os.chdir(build_path)
+        try:
+            _run_vivado(self.build_name)
+        finally:
+            os.chdir(cwd)
+
+
+class FakeToolchain(BaseToolchain):
+    """
+    Generates the Verilog and build scripts, but replaces the Vivado run by
+    deterministic placeholder artifacts.
+
+    This allows to run and benchmark the entire build pipeline, including
+    result caching and register address export, on machines without Vivado.
+    The placeholder bitstream is derived from the generated Verilog, such that
+    identical designs result in identical artifacts.
+    """
+
+    name = "fake"
+
+    def run(self, build_path):
+        logger.debug("Running fake build...")
+        digest = hashlib.sha256()
+        for filename in sorted(build_path.glob("*.v")):
+            digest.update(filename.read_bytes())
+        (build_path / self.bitstream_name).write_bytes(
+            b"pypga fake bitstream\n" + digest.hexdigest().encode() + b"\n"
+        )
+        (build_path / self.log_name).write_text(
+            "INFO: [pypga] fake toolchain, no implementation was run.\n"
+            "All user specified timing constraints are met.\n"
+        )
+        (build_path / self.timing_report_name).write_text(
+            "Fake timing report generated by pypga. No paths were analyzed.\n"
+        )
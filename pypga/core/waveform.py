@@ -0,0 +1,159 @@
+"""
+Waveform output of simulations.
+
+Signals are selected by their dotted hierarchical path in the design, e.g.
+``"pulseburst.count"``, using shell-style wildcards. :class:`VcdWriter` streams
+the values of the selected signals to a VCD file cycle by cycle and only keeps
+the last value of each signal in memory, such that arbitrarily long simulations
+can be inspected in viewers like GTKWave. FST files are converted from VCD with
+GTKWave's ``vcd2fst``.
+"""
+import fnmatch
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from migen import Module as MigenModule
+from migen import Signal
+
+# nanoseconds per simulated clock cycle in waveform files
+DEFAULT_PERIOD_NS = 8
+
+
+def iter_signals(module: MigenModule, prefix: str = "") -> Iterator[Tuple[str, Signal]]:
+    """Yields ``(path, signal)`` for all signals that are attributes of ``module`` or its submodules."""
+    visited = set()
+
+    def walk(module, prefix):
+        if id(module) in visited:
+            return
+        visited.add(id(module))
+        submodules = [(name, submodule) for name, submodule in module._submodules if name is not None]
+        for name, value in sorted(vars(module).items()):
+            if name.startswith("_"):
+                continue
+            if isinstance(value, Signal):
+                yield prefix + name, value
+            elif isinstance(value, MigenModule):
+                submodules.append((name, value))
+        for name, submodule in submodules:
+            yield from walk(submodule, f"{prefix}{name}.")
+
+    yield from walk(module, prefix)
+
+
+def select_signals(module: MigenModule, patterns: Sequence[str] = None) -> Dict[str, Signal]:
+    """Returns the signals of ``module`` whose path matches any of ``patterns``, or all signals if omitted."""
+    selected = {}
+    seen = set()
+    for path, signal in iter_signals(module):
+        if signal.duid in seen:
+            continue
+        if patterns is None or any(fnmatch.fnmatchcase(path, pattern) for pattern in patterns):
+            selected[path] = signal
+            seen.add(signal.duid)
+    return selected
+
+
+def _vcd_codes() -> Iterator[str]:
+    characters = [chr(i) for i in range(33, 127)]
+    n = 0
+    while True:
+        code = ""
+        q = n
+        while True:
+            q, r = divmod(q, len(characters))
+            code = characters[r] + code
+            if q == 0:
+                break
+        yield code
+        n += 1
+
+
+class VcdWriter:
+    """Streams the values of signals to a VCD file, writing only the changes of each cycle.
+
+    Args:
+        filename: the VCD file to write.
+        signals: the signals to trace by their dotted path, which determines their scope.
+        period_ns: the duration of a clock cycle in the file.
+    """
+
+    def __init__(self, filename, signals: Dict[str, Signal], period_ns: int = DEFAULT_PERIOD_NS):
+        if not signals:
+            raise ValueError("No signals to write to the waveform.")
+        self.period_ns = period_ns
+        self.signals = signals
+        codes = _vcd_codes()
+        self._codes = [next(codes) for _ in signals]
+        self._widths = [len(signal) for signal in signals.values()]
+        self._values = [None] * len(signals)
+        self._file = open(filename, "w")
+        self._write_header()
+
+    def _write_header(self):
+        f = self._file
+        f.write("$timescale 1ns $end\n")
+        scope = []
+        for (path, signal), code, width in zip(self.signals.items(), self._codes, self._widths):
+            *parents, name = path.split(".")
+            common = 0
+            while common < min(len(scope), len(parents)) and scope[common] == parents[common]:
+                common += 1
+            for _ in scope[common:]:
+                f.write("$upscope $end\n")
+            for parent in parents[common:]:
+                f.write(f"$scope module {parent} $end\n")
+            scope = parents
+            f.write(f"$var wire {width} {code} {name} $end\n")
+        for _ in scope:
+            f.write("$upscope $end\n")
+        f.write("$enddefinitions $end\n")
+
+    def _format(self, index: int, value: int) -> str:
+        width = self._widths[index]
+        if value < 0:
+            value += 1 << width
+        if width == 1:
+            return f"{value}{self._codes[index]}\n"
+        return f"b{value:b} {self._codes[index]}\n"
+
+    def sample(self, cycle: int, values: List[int]):
+        """Records the values of all signals, in the order of ``signals``, in clock cycle ``cycle``."""
+        changes = []
+        for index, value in enumerate(values):
+            if value != self._values[index]:
+                self._values[index] = value
+                changes.append(self._format(index, value))
+        if changes:
+            self._file.write(f"#{cycle * self.period_ns}\n")
+            self._file.writelines(changes)
+
+    def close(self, cycle: int = None):
+        """Closes the file, optionally marking the end of the simulation at ``cycle``."""
+        if cycle is not None:
+            self._file.write(f"#{cycle * self.period_ns}\n")
+        self._file.close()
+
+
+class WaveformWriter(VcdWriter):
+    """A :class:`VcdWriter` that converts its output to FST if ``filename`` ends with ``.fst``."""
+
+    def __init__(self, filename, signals: Dict[str, Signal], period_ns: int = DEFAULT_PERIOD_NS):
+        self.filename = Path(filename)
+        self._temporary_directory = None
+        if self.filename.suffix == ".fst":
+            if shutil.which("vcd2fst") is None:
+                raise RuntimeError("Writing FST files requires `vcd2fst` from GTKWave to be installed.")
+            self._temporary_directory = tempfile.TemporaryDirectory(prefix="pypga_waveform_")
+            filename = Path(self._temporary_directory.name) / "waveform.vcd"
+        super().__init__(filename, signals, period_ns=period_ns)
+
+    def close(self, cycle: int = None):
+        super().close(cycle)
+        if self._temporary_directory is not None:
+            vcd = Path(self._temporary_directory.name) / "waveform.vcd"
+            subprocess.run(["vcd2fst", str(vcd), str(self.filename)], check=True, capture_output=True)
+            self._temporary_directory.cleanup()
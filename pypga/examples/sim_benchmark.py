@@ -0,0 +1,38 @@
+"""
+Compares the speed of the migen and icarus simulation backends of ``Module.sim``
+on a DAQ burst of 2**12 samples with a sampling period of 30 cycles.
+
+Run with ``python -m pypga.examples.sim_benchmark``, requires Icarus Verilog.
+"""
+import time
+
+import numpy as np
+
+from pypga.modules.daq import DAQ
+
+SAMPLES = 2**12
+SAMPLING_PERIOD = 30
+
+
+def benchmark(num_steps: int = SAMPLES * SAMPLING_PERIOD):
+    daq = DAQ(data_depth=SAMPLES, data_width=14, data_decimals=13, data_signed=True)
+    adc = np.random.default_rng(0).integers(-(2**13), 2**13, num_steps)
+    query = {
+        "sampling_period_cycles": {0: SAMPLING_PERIOD - 2},
+        "trigger": {10: 1, 11: 0},
+        "input": lambda i: int(adc[i]),
+        "value": None,
+        "pulseburst.out": None,
+    }
+    results = {}
+    for backend in ["icarus", "migen"]:
+        start = time.perf_counter()
+        results[backend] = daq.sim(num_steps, query, omit_csr=False, backend=backend)
+        duration = time.perf_counter() - start
+        print(f"{backend:>8}: {duration:8.2f} s for {num_steps} cycles ({num_steps / duration:10.0f} cycles/s)")
+    for key in query:
+        assert np.array_equal(results["icarus"][key], results["migen"][key]), f"The backends disagree on {key}."
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,8 +1,12 @@
+from typing import Optional
+
 import numpy as np
+from migen import Constant
 
 from pypga.core import (
     BoolRegister,
     FixedPointRegister,
+    If,
     MigenModule,
     Module,
     NumberRegister,
@@ -11,7 +15,10 @@ from pypga.core import (
     logic,
 )
 from pypga.core.register import TriggerRegister
+from pypga.modules.migen.axireader import MigenAxiReader
+from pypga.modules.migen.packer import MigenSampleUnpacker
 from pypga.modules.migen.pulsegen import MigenPulseBurstGen
+from pypga.modules.pulsegen import read_timestamp
 
 
 def ramp(start: float = -1, stop: float = 1, points: int = 1024):
@@ -32,14 +39,25 @@ def Awg(
     default_sampling_period_cycles=10,
     repetitions_width=32,
     default_repetitions=1,
+    axi_hp_index: Optional[int] = None,
+    dma_sample_width: int = 16,
+    _ram_start_address: int = 0xa000000,
 ):
     """
     A programmable AWG module.
 
     Args:
+        data_depth: the number of points of the waveform in block RAM, or
+          with ``axi_hp_index`` the maximum number of points in RAM.
         data (list): initial values of the AWG.
         width (int or NoneType): the bit-width of each value, or None to
             automatically infer this from the data.
+        axi_hp_index: If an integer in [0, 1, 2, 3] is passed here, the waveform
+          is streamed from the RAM area of this AXI HP bus, see :meth:`upload`,
+          such that its length can be changed without a new bitstream. The
+          DAQ uses the same RAM areas, so both must use different indices.
+        dma_sample_width: the bits per point in RAM when streaming through AXI HP.
+          With 16 or 32, four or two points are packed into each 64-bit beat.
 
     Input signals / args:
         on: whether the AWG should go to its next point or pause.
@@ -55,17 +73,60 @@ def Awg(
 
 
     """
+    if axi_hp_index is not None:
+        if dma_sample_width not in (16, 32, 64):
+            raise ValueError("dma_sample_width must be 16, 32 or 64.")
+        if data_width > dma_sample_width:
+            raise ValueError(f"{data_width}-bit data does not fit into {dma_sample_width}-bit samples.")
+        if data_depth * dma_sample_width // 8 > 0x800000:
+            raise ValueError(f"{data_depth} points do not fit into the 8 MB of RAM of an AXI HP bus.")
+    # points per 64-bit beat
+    lanes = 64 // dma_sample_width
 
     class _Awg(Module):
-        data: FixedPointRegister(
-            width=data_width,
-            depth=data_depth,
-            default=initial_data,
-            reverse=True,
-            readonly=False,
-            signed=data_signed,
-            decimals=data_decimals,
-        )
+        if axi_hp_index is None:
+            data: FixedPointRegister(
+                width=data_width,
+                depth=data_depth,
+                default=initial_data,
+                reverse=True,
+                readonly=False,
+                signed=data_signed,
+                decimals=data_decimals,
+            )
+        else:
+            # the waveform in chronological order, in the RAM area of the AXI HP bus
+            data: FixedPointRegister(
+                width=data_width,
+                depth=data_depth,
+                default=None,
+                readonly=False,
+                signed=data_signed,
+                decimals=data_decimals,
+                ram_offset=axi_hp_index * 0x800000,
+                ram_sample_width=dma_sample_width,
+            )
+            # the number of points of the waveform
+            length: NumberRegister(width=32, default=data_depth, min=1, max=data_depth, signed=False)
+            # restarts the prefetch at the first point, e.g. after the waveform or its length changed
+            rewind: TriggerRegister()
+            # whether a point was due before it arrived from RAM, or a read from RAM failed
+            underflow: BoolRegister(readonly=True)
+            error: BoolRegister(readonly=True)
+
+            def upload(self, waveform):
+                """Writes ``waveform`` to RAM and prefetches it for the next trigger.
+
+                Must not be called while a waveform is played. The beats of bursts in flight
+                are discarded before the first points are prefetched, which takes a few
+                microseconds, and a trigger before underflows.
+                """
+                if not 1 <= len(waveform) <= data_depth:
+                    raise ValueError(f"The waveform must have between 1 and {data_depth} points.")
+                self.data = waveform
+                self.length = len(waveform)
+                self.rewind()
+
         sampling_period_cycles: NumberRegister(
             width=sampling_period_width,
             default=default_sampling_period_cycles - 2,
@@ -82,6 +143,9 @@ def Awg(
         )
         always_on: BoolRegister(default=False)
         software_trigger: TriggerRegister()
+        # the 64-bit cycle count at the trigger of the last waveform
+        trigger_timestamp_low: NumberRegister(width=32, readonly=True, signed=False)
+        trigger_timestamp_high: NumberRegister(width=32, readonly=True, signed=False)
 
         @logic
         def _awg(self):
@@ -96,16 +160,70 @@ def Awg(
             self.submodules.pulseburst = MigenPulseBurstGen(
                 trigger=self._trigger,
                 reset=False,
-                pulses=data_depth - 1,
+                pulses=data_depth - 1 if axi_hp_index is None else self.length - 1,
                 period=self.sampling_period_cycles,
+                timestamp_width=64,
             )
             self.comb += [
+                self.trigger_timestamp_low.eq(self.pulseburst.timestamp[:32]),
+                self.trigger_timestamp_high.eq(self.pulseburst.timestamp[32:]),
                 self.done.eq(~self.pulseburst.busy),
-                self.data_index.eq(self.pulseburst.count),
                 self.out_trigger.eq(self.pulseburst.out),
-                self.out.eq(self.data),
             ]
 
+        if axi_hp_index is None:
+            @logic
+            def _awg_data(self):
+                self.comb += [
+                    self.data_index.eq(self.pulseburst.count),
+                    self.out.eq(self.data),
+                ]
+        else:
+            @logic
+            def _awg_data(self, platform, soc):
+                if axi_hp_index not in range(4):
+                    raise ValueError(f"Only 4 AXI_HP ports are available, the desired index {axi_hp_index} is out of range.")
+                hp = getattr(soc.ps7, f"s_axi_hp{axi_hp_index}")
+                # the waveform is read from RAM over and over again, such that the FIFO holds
+                # the first points of the next repetition when the current one is done
+                beats = Signal(32)
+                read = Signal()
+                self.comb += beats.eq((self.length + lanes - 1) >> (lanes.bit_length() - 1))
+                self.submodules.reader = MigenAxiReader(
+                    address=Constant(_ram_start_address + axi_hp_index * 0x800000, 32),
+                    length=beats,
+                    re=read,
+                    reset=self.rewind,
+                    axi_hp=hp,
+                )
+                self.submodules.unpacker = MigenSampleUnpacker(
+                    data=self.reader.data,
+                    next=self.pulseburst.out,
+                    length=self.length,
+                    reset=self.rewind,
+                    sample_width=dma_sample_width,
+                    signed=data_signed,
+                )
+                # like the block RAM, the output follows the pulse of its point by a cycle
+                current = Signal((data_width, data_signed))
+                self.sync += If(self.pulseburst.out, current.eq(self.unpacker.out))
+                self.comb += [
+                    read.eq(self.unpacker.re),
+                    self.out.eq(current),
+                    self.underflow.eq(self.reader.underflow),
+                    self.error.eq(self.reader.error),
+                ]
+
+        @property
+        def trigger_timestamp(self) -> int:
+            """The clock cycle of the trigger of the last waveform, counted since the FPGA was configured."""
+            return read_timestamp(self, "trigger_timestamp")
+
+        @property
+        def trigger_time(self) -> float:
+            """The time in seconds of the trigger of the last waveform since the FPGA was configured."""
+            return self.trigger_timestamp * self._clock_period
+
         @property
         def sampling_period(self) -> float:
             return self.sampling_period_cycles * self._clock_period
@@ -114,13 +232,18 @@ def Awg(
         def sampling_period(self, sampling_period: float):
             self.sampling_period_cycles = sampling_period / self._clock_period
 
+        @property
+        def points(self) -> int:
+            """The number of points of the waveform."""
+            return data_depth if axi_hp_index is None else self.length
+
         @property
         def period(self) -> float:
-            return data_depth * self.sampling_period
+            return self.points * self.sampling_period
 
         @period.setter
         def period(self, period: float):
-            self.sampling_period = period / data_depth
+            self.sampling_period = period / self.points
 
         @property
         def frequency(self) -> float:
@@ -131,6 +254,9 @@ def Awg(
             self.period = 1.0 / frequency
 
         def set_ramp(self, start: float = -1.0, stop: float = 1.0):
-            self.data = ramp(start=start, stop=stop, points=data_depth)
+            if axi_hp_index is None:
+                self.data = ramp(start=start, stop=stop, points=data_depth)
+            else:
+                self.upload(ramp(start=start, stop=stop, points=self.length))
 
     return _Awg
@@ -16,6 +16,7 @@ def AXIWriter(axi_hp_index=0):
         error: BoolRegister(readonly=True)
         idle: BoolRegister(readonly=True)
         ready: BoolRegister(readonly=True)
+        overflow: BoolRegister(readonly=True)
 
         @logic
         def _connect_to_soc(self, platform, soc):
@@ -27,6 +28,12 @@ def AXIWriter(axi_hp_index=0):
                 reset=self.reset,
                 axi_hp=hp,
             )
+            self.comb += [
+                self.error.eq(self.axiwriter.error),
+                self.idle.eq(self.axiwriter.idle),
+                self.ready.eq(self.axiwriter.ready),
+                self.overflow.eq(self.axiwriter.overflow),
+            ]
 
         def read_from_ram(self, offset: int = 0, length: int = 1) -> np.ndarray:
             return self._interface.read_from_ram(offset, length)
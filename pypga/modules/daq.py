@@ -2,9 +2,16 @@
 DAQ with
 * averaging
 * min / max of timebin
+* continuous acquisition into a ring buffer in RAM
+* point-by-point averaging of repeated traces
+* CIC decimation with an optional compensating FIR filter
+* a hardware trigger with hysteresis, holdoff and pre-trigger samples
+* timestamps of the triggers
 """
 
-from typing import Optional
+import logging
+import time
+from typing import Iterator, Optional
 
 import numpy as np
 from pypga.core import (
@@ -21,10 +28,40 @@ from pypga.core import (
 )
 from pypga.core.register import TriggerRegister
 from pypga.modules.migen.axiwriter import MigenAxiWriter
+from pypga.modules.migen.decimator import MigenCicDecimator, MigenFirFilter
+from pypga.modules.migen.divider import MigenPipelinedMultiplier, MigenReciprocal
+from pypga.modules.migen.packer import MigenSamplePacker
 from pypga.modules.migen.pulsegen import MigenPulseBurstGen
+from pypga.modules.migen.trigger import TRIGGER_MODES, MigenDelayLine, MigenTrigger
+from pypga.modules.pulsegen import read_timestamp
 
 from migen import Cat, Constant, Replicate
 
+logger = logging.getLogger(__name__)
+
+
+def cic_compensation(taps: int, stages: int, cutoff: float = 0.25, oversampling: int = 64) -> np.ndarray:
+    """Returns the coefficients of a FIR filter that compensates the droop of a CIC filter.
+
+    The filter is designed by the window method for the inverse of the response of
+    the CIC filter up to ``cutoff``, in units of the decimated sampling rate, and
+    to block above, with a gain of one at zero frequency.
+
+    Args:
+        taps: the number of coefficients.
+        stages: the number of stages of the CIC filter.
+        cutoff: the edge of the passband, below the Nyquist frequency of 0.5.
+        oversampling: the density of the frequency grid of the design.
+    """
+    points = oversampling * taps
+    frequency = np.fft.rfftfreq(points)
+    # the response of a CIC filter with a large decimation rate
+    droop = np.abs(np.sinc(frequency)) ** stages
+    response = np.where(frequency <= cutoff, 1 / droop, 0)
+    impulse = np.roll(np.fft.irfft(response, points), taps // 2)[:taps]
+    coefficients = impulse * np.hamming(taps)
+    return coefficients / np.sum(coefficients)
+
 
 def DAQ(
     data_depth: int = 1024,
@@ -34,6 +71,15 @@ def DAQ(
     default_sampling_period: int = 10,
     data_signed: bool = False,
     axi_hp_index: Optional[int] = None,
+    dma_sample_width: int = 64,
+    banks: int = 1,
+    trace_averaging_bits: int = 0,
+    average_latency: int = 3,
+    cic_stages: int = 0,
+    fir_taps: int = 0,
+    fir_decimals: int = 16,
+    hardware_trigger: bool = False,
+    pretrigger_depth: int = 0,
     _ram_start_address: int = 0xa000000,
     _ram_size: int = 0x2000000,
     max_samples_in_bits=20,
@@ -46,6 +92,33 @@ def DAQ(
           is used to directly write data to RAM, otherwise data is sent
           to the PS using a register. The value of this number can be one 
           in [0, 1, 2, 3], indicating the index of the AXI HP bus to use.
+        dma_sample_width: the bits per sample in RAM when writing through AXI HP.
+          With 16 or 32, four or two samples are packed into each 64-bit beat,
+          which multiplies the capture depth and transfer speed accordingly.
+        banks: with 2, consecutive acquisitions alternate between two banks of
+          ``data_depth`` samples, such that one bank can be read out while the
+          next acquisition fills the other one.
+        trace_averaging_bits: if nonzero, up to ``2**trace_averaging_bits``
+          consecutive traces are summed up point by point in the ``data``
+          register, which is widened accordingly, such that only their
+          average needs to be read out.
+        average_latency: the pipeline stages of the multiplier that divides
+          the sum of a sampling period by its number of samples. Samples are
+          written ``average_latency + 3`` cycles after their period ended, or
+          after the latency of the decimation filter if that is longer.
+        cic_stages: if nonzero, ``reduce_mode = 7`` decimates the input with a
+          CIC filter of this many stages, which suppresses the aliases that the
+          average of each sampling period lets through.
+        fir_taps: if nonzero, the CIC filter is followed by a FIR filter with
+          the coefficients in the ``fir_coefficients`` register, e.g. to
+          compensate the droop of the CIC filter, see :func:`cic_compensation`.
+          The sampling period must be at least ``fir_taps + 4`` cycles.
+        fir_decimals: the fractional bits of the FIR coefficients.
+        hardware_trigger: if True, the DAQ also triggers on the level or an edge
+          of its input, see :meth:`set_trigger`.
+        pretrigger_depth: if nonzero, the input is acquired through a circular
+          buffer of this many cycles, a power of two, such that acquisitions can
+          start up to ``pretrigger_depth - 2`` cycles before their trigger.
 
     Input signals / args:
         on: whether the AWG should go to its next point or pause.
@@ -56,6 +129,27 @@ def DAQ(
     Output signals:
         value: a signal with the ROM value at the current index.
     """
+    if dma_sample_width not in (16, 32, 64):
+        raise ValueError("dma_sample_width must be 16, 32 or 64.")
+    if data_width is not None and data_width > dma_sample_width:
+        raise ValueError(f"{data_width}-bit data does not fit into {dma_sample_width}-bit samples.")
+    if banks not in (1, 2):
+        raise ValueError("banks must be 1 or 2.")
+    if trace_averaging_bits and (axi_hp_index is not None or banks != 1):
+        raise ValueError("Traces can only be averaged in a single bank of BRAM.")
+    if trace_averaging_bits and (data_width or 0) + trace_averaging_bits > 31:
+        raise ValueError("The sum of the traces must fit into 31 bits.")
+    if fir_taps and not cic_stages:
+        raise ValueError("The FIR filter requires a CIC filter.")
+    if pretrigger_depth and (pretrigger_depth < 4 or pretrigger_depth & (pretrigger_depth - 1)):
+        raise ValueError("pretrigger_depth must be a power of two of at least 4.")
+    # samples per 64-bit beat
+    lanes = 64 // dma_sample_width
+    if axi_hp_index is not None and data_depth % lanes:
+        raise ValueError(f"data_depth must be a multiple of the {lanes} samples per beat.")
+    # the samples in memory, all banks together
+    memory_depth = data_depth * banks
+
     class _DAQ(Module):
         sampling_period_cycles: NumberRegister(
             width=sampling_period_width,
@@ -63,14 +157,6 @@ def DAQ(
             offset_from_python=-2,
             min=2, #Leo: why 2? #TODO: in future this should be 0 by defining it from the python view
         )#Leo: error here between cycles and no cycles?
-        
-        #used for simulating a division: multiply by the bit shifted inverse and then bitshift
-        inverse_factor_sampling_period_cycles: NumberRegister(
-            width=sampling_period_width,
-            default=int(2**16/default_sampling_period),
-            #offset_from_python=-2,
-            #min=2,
-        )
         length: NumberRegister(
             width=sampling_period_width,
             default=data_depth,
@@ -81,7 +167,199 @@ def DAQ(
         
         
         reduce_mode: NumberRegister(default=0,width=3,signed=False)
-        
+
+        if axi_hp_index is not None:
+            # in continuous mode, bursts follow each other without gaps and the memory is a ring buffer
+            continuous: BoolRegister(default=False)
+            # the number of samples acknowledged by the RAM since the start of the acquisition, modulo 2**32
+            write_pointer: NumberRegister(width=32, readonly=True, signed=False)
+
+            def start_continuous(self):
+                """Starts acquiring into the ring buffer until :meth:`stop_continuous` is called."""
+                self.continuous = True
+                self._read_pointer = 0
+                self._last_write_pointer = 0
+                self.software_trigger()
+
+            def stop_continuous(self):
+                """Stops the acquisition at the end of the current burst of ``length`` samples."""
+                self.continuous = False
+
+            def read_continuous(self) -> np.ndarray:
+                """Returns the samples written to the ring buffer since the last call.
+
+                If more than the ``data_depth * banks`` samples of the ring buffer were written
+                since, the older ones were overwritten and only the latest ones are returned.
+                Must be called at least every 2**32 samples. With two banks, the stream is only
+                contiguous if ``length`` equals ``data_depth``.
+                """
+                pointer = self.write_pointer
+                # extend the 32-bit pointer of the hardware to the total number of samples
+                total = self._last_write_pointer + (pointer - self._last_write_pointer) % 2**32
+                self._last_write_pointer = total
+                available = total - self._read_pointer
+                if available > memory_depth:
+                    logger.warning(f"The ring buffer overran, {available - memory_depth} samples were lost.")
+                    self._read_pointer = total - memory_depth
+                    available = memory_depth
+                start = self._read_pointer % memory_depth
+                first = min(available, memory_depth - start)
+                register = type(self).data
+                chunks = [register.read_from_ram(self, start, first)]
+                if available > first:
+                    chunks.append(register.read_from_ram(self, 0, available - first))
+                self._read_pointer = total
+                return np.concatenate(chunks)
+
+            def stream(self, poll_interval: float = 1e-3) -> Iterator[np.ndarray]:
+                """Starts a continuous acquisition and yields the new samples every ``poll_interval`` seconds."""
+                self.start_continuous()
+                try:
+                    while True:
+                        time.sleep(poll_interval)
+                        samples = self.read_continuous()
+                        if len(samples):
+                            yield samples
+                finally:
+                    self.stop_continuous()
+
+        if banks == 2:
+            # the bank of the last complete acquisition and the number of complete acquisitions, modulo 2**32
+            completed_bank: NumberRegister(width=1, readonly=True, signed=False)
+            completed_bursts: NumberRegister(width=32, readonly=True, signed=False)
+
+            def read_bank(self, bank: int) -> np.ndarray:
+                """Returns the samples of ``bank`` in chronological order, like the ``data`` register."""
+                return type(self).data.read(self, bank * data_depth, data_depth)
+
+            def read_next_bank(self, timeout: float = 1.0, poll_interval: float = 1e-4) -> np.ndarray:
+                """Waits for the next acquisition to complete and returns the samples of its bank.
+
+                The first call returns the last complete bank if any. If more than one acquisition
+                completed since the previous call, the older banks were overwritten or are being
+                overwritten, and only the last one is returned.
+                """
+                last = getattr(self, "_completed_bursts", None)
+                deadline = time.time() + timeout
+                while True:
+                    bursts = self.completed_bursts
+                    if bursts != last and (last is not None or bursts > 0):
+                        break
+                    if time.time() > deadline:
+                        raise TimeoutError(f"No acquisition completed within {timeout} s.")
+                    time.sleep(poll_interval)
+                missed = 0 if last is None else (bursts - last) % 2**32 - 1
+                if missed:
+                    logger.warning(f"{missed} acquisition(s) were completed before they could be read.")
+                self._completed_bursts = bursts
+                return self.read_bank(self.completed_bank)
+
+        if trace_averaging_bits:
+            # the number of traces to sum up and the number of traces summed up so far
+            averages: NumberRegister(width=trace_averaging_bits + 1, default=1, min=1, signed=False)
+            traces: NumberRegister(width=trace_averaging_bits + 1, readonly=True, signed=False)
+            clear_traces: TriggerRegister()
+
+            def start_averaging(self, averages: int):
+                """Discards the summed traces and sums up the next ``averages`` traces."""
+                if not 1 <= averages <= 2**trace_averaging_bits:
+                    raise ValueError(f"Between 1 and {2**trace_averaging_bits} traces can be averaged.")
+                self.averages = averages
+                self.clear_traces()
+
+            def get_average(self, timeout: float = 1.0, poll_interval: float = 1e-3) -> np.ndarray:
+                """Waits until all traces are summed up and returns their average."""
+                deadline = time.time() + timeout
+                while self.traces < self.averages:
+                    if time.time() > deadline:
+                        raise TimeoutError(f"Only {self.traces} of {self.averages} traces were acquired within {timeout} s.")
+                    time.sleep(poll_interval)
+                return self.data / self.traces
+
+        if fir_taps:
+            # signed coefficients with fir_decimals fractional bits, passing the CIC output through by default
+            fir_coefficients: NumberRegister(
+                width=18,
+                depth=fir_taps,
+                signed=True,
+                default=[2**fir_decimals] + [0] * (fir_taps - 1),
+            )
+
+            def set_fir_coefficients(self, coefficients):
+                """Sets the coefficients of the FIR filter from floats, padded with zeros to ``fir_taps``."""
+                coefficients = np.pad(np.asarray(coefficients, dtype=float), (0, fir_taps - len(coefficients)))
+                self.fir_coefficients = np.round(coefficients * 2**fir_decimals).astype(int)
+
+        if hardware_trigger:
+            # one of the values of TRIGGER_MODES, the hardware trigger is off by default
+            trigger_mode: NumberRegister(width=3, default=TRIGGER_MODES["off"], signed=False)
+            trigger_level: FixedPointRegister(width=data_width, default=0, signed=data_signed, decimals=data_decimals)
+            trigger_hysteresis: FixedPointRegister(width=data_width, default=0, signed=False, decimals=data_decimals)
+            trigger_holdoff_cycles: NumberRegister(width=32, default=0, signed=False)
+
+            def set_trigger(self, mode: str, level: float = 0, hysteresis: float = 0, holdoff: float = 0):
+                """Configures the hardware trigger.
+
+                Args:
+                    mode: "off", "above" or "below" to trigger on the level of the input,
+                      or "rising" or "falling" to trigger on its edges.
+                    level: the trigger level.
+                    hysteresis: how far the input must return beyond the level before
+                      the next edge can trigger, to not trigger repeatedly on noise.
+                    holdoff: the time in seconds after a trigger during which no further trigger is accepted.
+                """
+                if mode not in TRIGGER_MODES:
+                    raise ValueError(f"The trigger mode must be one of {list(TRIGGER_MODES)}.")
+                self.trigger_mode = TRIGGER_MODES["off"]
+                self.trigger_level = level
+                self.trigger_hysteresis = hysteresis
+                self.trigger_holdoff = holdoff
+                self.trigger_mode = TRIGGER_MODES[mode]
+
+            @property
+            def trigger_holdoff(self) -> float:
+                return self.trigger_holdoff_cycles * self._clock_period
+
+            @trigger_holdoff.setter
+            def trigger_holdoff(self, holdoff: float):
+                self.trigger_holdoff_cycles = holdoff / self._clock_period
+
+        if pretrigger_depth:
+            # the cycles by which the acquisition starts before its trigger
+            pretrigger_cycles: NumberRegister(
+                width=pretrigger_depth.bit_length(), default=0, max=pretrigger_depth - 2, signed=False
+            )
+
+            @property
+            def pretrigger(self) -> float:
+                return self.pretrigger_cycles * self._clock_period
+
+            @pretrigger.setter
+            def pretrigger(self, pretrigger: float):
+                self.pretrigger_cycles = pretrigger / self._clock_period
+
+        # the 64-bit cycle count at the trigger of the last acquisition
+        trigger_timestamp_low: NumberRegister(width=32, readonly=True, signed=False)
+        trigger_timestamp_high: NumberRegister(width=32, readonly=True, signed=False)
+
+        @property
+        def trigger_timestamp(self) -> int:
+            """The clock cycle of the trigger of the last acquisition, counted since the FPGA was configured.
+
+            With a pre-trigger, the acquisition starts ``pretrigger_cycles`` earlier.
+            """
+            return read_timestamp(self, "trigger_timestamp")
+
+        @property
+        def trigger_time(self) -> float:
+            """The time in seconds of the trigger of the last acquisition since the FPGA was configured.
+
+            All modules of a design count from the same cycle, such that the difference
+            of their trigger times is e.g. the latency from an AWG trigger to the
+            acquisition of its response.
+            """
+            return self.trigger_timestamp * self._clock_period
+
         @property
         def sampling_period(self) -> float:
             return self.sampling_period_cycles * self._clock_period
@@ -89,8 +367,8 @@ def DAQ(
 
         @sampling_period.setter
         def sampling_period(self, sampling_period: float):
+            # the FPGA takes a few dozen cycles to compute the reciprocal for the average
             self.sampling_period_cycles = sampling_period / self._clock_period
-            self.inverse_factor_sampling_period_cycles = int(2**16 / self.sampling_period_cycles)
 
         @property
         def period(self) -> float:
@@ -138,81 +416,187 @@ def DAQ(
             #self.input = Signal(data_width, reset=0)            
             self.input = Signal.like(self.value)  
             self.not_above_threshold = Signal(1)
+            # the input as it is acquired, which the pre-trigger buffer delays such that
+            # a trigger on the input starts the acquisition pretrigger_cycles earlier
+            acquired = self.input
+            if pretrigger_depth:
+                self.submodules.pretrigger_buffer = MigenDelayLine(
+                    self.input, self.pretrigger_cycles + MigenTrigger.latency, depth=pretrigger_depth
+                )
+                acquired = self.pretrigger_buffer.out
             
             self._trigger = Signal(reset=0)
-            self.comb += [self._trigger.eq(self.trigger | self.software_trigger)]
+            # retriggers the burst at its end in continuous mode
+            self._continue = Signal(reset=0)
+            # low when no further acquisition may be triggered
+            self._armed = Signal(reset=1)
             self.submodules.pulseburst = MigenPulseBurstGen(
-                trigger=self._trigger,
+                trigger=(self._trigger & self._armed) | self._continue,
                 reset=False,
                 pulses=self.length - 1, #  dynamically setting the length
                 period=self.sampling_period_cycles,
+                timestamp_width=64,
             )
             self.comb += [
-                # sum up the input values and divide
-                #self.average_value.eq((self.sumvalue * self.inverse_factor_sampling_period_cycles) >>16), # simulate a division by multiplying with the inverse and bit shift it
-                #self.average_value.eq(self.input),
-                #adding this kills the timing contraints 
+                self.trigger_timestamp_low.eq(self.pulseburst.timestamp[:32]),
+                self.trigger_timestamp_high.eq(self.pulseburst.timestamp[32:]),
             ]
+            if hardware_trigger:
+                self.submodules.trigger_engine = MigenTrigger(
+                    self.input,
+                    mode=self.trigger_mode,
+                    level=self.trigger_level,
+                    hysteresis=self.trigger_hysteresis,
+                    holdoff=self.trigger_holdoff_cycles,
+                    # only triggers that start an acquisition start the holdoff
+                    enable=self._armed & ~self.pulseburst.busy,
+                )
+                self.comb += [self._trigger.eq(self.trigger | self.software_trigger | self.trigger_engine.out)]
+            else:
+                self.comb += [self._trigger.eq(self.trigger | self.software_trigger)]
             #Leo: comb is just wiring, right?
             #Leo: should this  be in comb or sync? -> sync when in doubt (because no timing problem, BUT arithmetic problems trough delayed)
-            
-            
-            self.edge_count = Signal(22)        
+
+
+            self.edge_count = Signal(22)
             self.sumvalue=Signal((data_width+max_samples_in_bits,data_signed),reset=0)
-            self.oldsum = Signal.like(self.sumvalue)            
-            
-            # self.average_value_1 = Signal.like(self.average_value)
-            # self.average_value_2 = Signal.like(self.average_value)
-            # self.average_value_3 = Signal.like(self.average_value)
-            # TODO: the first or the last value when averaging has a glitch (i do not know which one)
+            # the sum of the last complete sampling period
+            self.oldsum = Signal.like(self.sumvalue)
+            # the result of the last complete sampling period for the other reduce modes
+            reduced = Signal.like(self.value)
+
+            # the average is the sum times the reciprocal of the samples per period, which is only
+            # recomputed when the sampling period changes, with enough fractional bits for the
+            # average to be exact to its last bit, and exact for powers of two
+            fraction_bits = len(self.sumvalue)
+            samples_per_period = Signal(sampling_period_width + 1)
+            self.comb += samples_per_period.eq(self.sampling_period_cycles + 2)
+            self.submodules.reciprocal = MigenReciprocal(samples_per_period, fraction_bits=fraction_bits)
+            # the reciprocal of at least two samples fits into the fractional bits
+            self.submodules.multiplier = MigenPipelinedMultiplier(
+                self.oldsum, self.reciprocal.out[:fraction_bits], latency=average_latency
+            )
+            # the decimation filter runs alongside, at the end of each sampling period
+            filter_latency = 0
+            if cic_stages:
+                self.submodules.cic = MigenCicDecimator(
+                    acquired,
+                    self.pulseburst.out,
+                    rate=samples_per_period,
+                    stages=cic_stages,
+                    max_rate_bits=max_samples_in_bits,
+                )
+                filtered = self.cic.out
+                filter_latency = self.cic.latency
+                if fir_taps:
+                    self.submodules.fir = MigenFirFilter(
+                        filtered, self.cic.out_strobe, self.fir_coefficients, taps=fir_taps, decimals=fir_decimals
+                    )
+                    self.comb += self.fir_coefficients_index.eq(self.fir.coefficient_index)
+                    filtered = self.fir.out
+                    filter_latency += self.fir.latency
+
+            def delayed(signal, cycles):
+                for _ in range(cycles):
+                    register = Signal.like(signal)
+                    self.sync += register.eq(signal)
+                    signal = register
+                return signal
+
+            # the results of a period are aligned to be registered in value after this many cycles:
+            # the average is latched, divided, and registered in average_value
+            delay = max(average_latency + 3, filter_latency + 1)
+            results = {
+                0: delayed(self.average_value, delay - average_latency - 3),
+                "default": delayed(reduced, delay - 2),
+            }
+            if cic_stages:
+                results[7] = delayed(filtered, delay - filter_latency - 1)
+
+            # the strobe, index and start of the samples, delayed like their value
+            self._sample = Signal()
+            self._sample_count = Signal.like(self.pulseburst.count)
+            self._start = Signal()
+            strobes = Signal(delay)
+            starts = Signal(delay)
+            counts = [self.pulseburst.count]
+            for _ in range(delay):
+                counts.append(Signal.like(self.pulseburst.count))
+                self.sync += counts[-1].eq(counts[-2])
+            self.sync += [
+                strobes.eq(Cat(self.pulseburst.out, strobes)),
+                starts.eq(Cat(self._trigger & self._armed & ~self.pulseburst.busy, starts)),
+            ]
+            self.comb += [
+                self._sample.eq(strobes[-1]),
+                self._sample_count.eq(counts[-1]),
+                self._start.eq(starts[-1]),
+            ]
+            # the last sample of a burst
+            self._burst_end = Signal()
+            self.comb += self._burst_end.eq(self._sample & (self._sample_count == 0))
+            # the bank written by the current acquisition
+            self.bank = Signal()
+            # high when all samples of the bank _complete_bank are in memory
+            self._bank_complete = Signal()
+            self._complete_bank = Signal()
+            if banks == 2:
+                self.sync += [
+                    If(self._burst_end, self.bank.eq(~self.bank)),
+                    If(
+                        self._bank_complete,
+                        self.completed_bank.eq(self._complete_bank),
+                        self.completed_bursts.eq(self.completed_bursts + 1),
+                    ),
+                ]
+
+            # TODO: the first value of a burst reduces the samples before the trigger
             self.sync += [
-                self.oldsum.eq(self.sumvalue),
-                self.not_above_threshold.eq(self.input < self.edge_threshold),
-                #self.value.eq(self.average_value_1),
-                # self.average_value_1.eq(self.average_value_2),  #mulitplication takes 3 cycles
-                # self.average_value_2.eq(self.average_value_3),
-                self.average_value.eq((self.oldsum * self.inverse_factor_sampling_period_cycles) >>16), # simulate a division by multiplying with the inverse and bit shift it
-                self.busy.eq(self.pulseburst.busy),#its mainly a interface to PC so put it into sync , because timing not critical here (so make everything less critical)
+                self.not_above_threshold.eq(acquired < self.edge_threshold),
+                self.average_value.eq(self.multiplier.out >> fraction_bits),
+                self.busy.eq(self.pulseburst.busy | (strobes != 0)),#its mainly a interface to PC so put it into sync , because timing not critical here (so make everything less critical)
                 If(self.pulseburst.out == 1,
-                   self.sumvalue.eq(self.input),#reset     
-                   self.value_max.eq(self.input),
-                   self.value_min.eq(self.input),
+                   # latch the results of the period that ends here
+                   self.oldsum.eq(self.sumvalue),
+                   Case(self.reduce_mode, {
+                        1: reduced.eq(self.value_max),
+                        2: reduced.eq(self.value_min),
+                        3: reduced.eq(acquired),
+                        4: reduced.eq(self.edge_count), #count rising edges
+                        5: reduced.eq(self.offset), #TODO: remove, just for debugging
+                        6: reduced.eq(self.count), #TODO: remove, just for debugging
+                   }),
+                   self.sumvalue.eq(acquired),#reset
+                   self.value_max.eq(acquired),
+                   self.value_min.eq(acquired),
                    self.count.eq(0),
                    self.edge_count.eq(0),
                 ).Elif(self.pulseburst.busy,
-                    self.sumvalue.eq(self.sumvalue+self.input),
+                    self.sumvalue.eq(self.sumvalue+acquired),
                     self.count.eq(self.count+1),
-                    If(self.value_max < self.input,
-                       self.value_max.eq(self.input)
+                    If(self.value_max < acquired,
+                       self.value_max.eq(acquired)
                     ),
-                    If(self.value_min > self.input,
-                       self.value_min.eq(self.input)
+                    If(self.value_min > acquired,
+                       self.value_min.eq(acquired)
                     ),
-                    If(self.not_above_threshold & (self.input > self.edge_threshold), 
-                       self.edge_count.eq(self.edge_count+1)),                    
+                    If(self.not_above_threshold & (acquired > self.edge_threshold),
+                       self.edge_count.eq(self.edge_count+1)),
                 ),
-                Case(self.reduce_mode, {
-                     0: self.value.eq(self.average_value),
-                     1: self.value.eq(self.value_max),
-                     2: self.value.eq(self.value_min),
-                     3: self.value.eq(self.input),
-                     4: self.value.eq(self.edge_count), #count rising edges
-                     5: self.value.eq(self.offset), #TODO: remove, just for debugging
-                     6: self.value.eq(self.count), #TODO: remove, just for debugging
-                 })  
+                Case(self.reduce_mode, {mode: self.value.eq(result) for mode, result in results.items()}),
             ]
-        
-    
+
+
         #Leo: is this also set when we are using DRM? Or is is then automatically not used? add to the if?
         data: FixedPointRegister(
-            width=data_width,
-            depth=data_depth,
+            width=None if data_width is None else data_width + trace_averaging_bits,
+            depth=memory_depth,
             default=None,
-            reversed=True,
             readonly=True,
             signed=data_signed,
             decimals=data_decimals,
             ram_offset=None if axi_hp_index is None else axi_hp_index * 0x800000, #This automatically reserves no space if this offset is set
+            ram_sample_width=dma_sample_width,
         ) 
         
         #data.we
@@ -224,11 +608,42 @@ def DAQ(
         if axi_hp_index is None:
             @logic
             def _daq_data(self):
+                # like in RAM, samples are stored in chronological order: the sample count runs down to
+                # zero from the number of pulses of the burst, which is the raw length minus one
+                index = Signal.like(self._sample_count)
+                self.comb += index.eq(self.length - 1 - self._sample_count)
+                if banks == 2:
+                    self.comb += [self._bank_complete.eq(self._burst_end), self._complete_bank.eq(self.bank)]
+                if trace_averaging_bits:
+                    # read-modify-write: the sum at the index of a sample is read in the cycle of the sample
+                    # and written back with the sample added in the next one, before the index changes
+                    sample = Signal.like(self.value)
+                    write = Signal()
+                    write_last = Signal()
+                    previous = Signal((len(self.data_dat_r), data_signed))
+                    # the first trace overwrites the sums of previous averages
+                    overwrite = Signal(reset=1)
+                    self.sync += [
+                        write.eq(self._sample),
+                        write_last.eq(self._burst_end),
+                        If(self._sample, sample.eq(self.value)),
+                        If(self.clear_traces, self.traces.eq(0), overwrite.eq(1)).Elif(
+                            write_last, self.traces.eq(self.traces + 1), overwrite.eq(0)
+                        ),
+                    ]
+                    self.comb += [
+                        self._armed.eq(self.traces < self.averages),
+                        previous.eq(self.data_dat_r),
+                        self.data_index.eq(index),
+                        self.data_we.eq(write),
+                        If(overwrite, self.data.eq(sample)).Else(self.data.eq(previous + sample)),
+                    ]
+                    return
                 self.comb += [
-                    self.data_index.eq(self.pulseburst.count),# Leo: where is data_index defined? and where does self.pulseburst come from?
-                    self.data_we.eq(self.pulseburst.out),
+                    self.data_index.eq(index + self.bank * data_depth),
+                    self.data_we.eq(self._sample),
                     If(
-                        self.pulseburst.out == 1,
+                        self._sample == 1,
                         self.data.eq(self.value),
                     ),
                 ]
@@ -238,28 +653,69 @@ def DAQ(
                 if axi_hp_index not in range(4):
                     raise ValueError(f"Only 4 AXI_HP ports are available, the desired index {axi_hp_index} is out of range.")
                 hp = getattr(soc.ps7, f"s_axi_hp{axi_hp_index}")
+                # an acquisition starts with a trigger while idle, continuous mode keeps it running
+                running = Signal()
+                self.comb += self._continue.eq(running)
+                self.sync += If(~self.continuous, running.eq(0)).Elif(
+                    self._trigger & ~self.pulseburst.busy, running.eq(1)
+                )
+                # the samples of an acquisition start to arrive with the delayed trigger
+                start = self._start
+                # samples are written in chronological order and packed into 64-bit beats, such that RAM
+                # holds an array of dma_sample_width-bit samples, which is a ring buffer in continuous mode
+                index = Signal(max=max(memory_depth, 2))
+                # with two banks, each burst starts at the beginning of its bank
+                last = Signal()
+                if banks == 2:
+                    advance = If(self._burst_end, index.eq(~self.bank * data_depth)).Elif(
+                        index == memory_depth - 1, index.eq(0)
+                    )
+                    self.comb += last.eq(self._burst_end)
+                else:
+                    advance = If(index == memory_depth - 1, index.eq(0))
+                    self.comb += last.eq((index == memory_depth - 1) | (self._burst_end & ~running))
+                self.sync += If(start, index.eq(self.bank * data_depth)).Elif(
+                    self._sample,
+                    advance.Else(index.eq(index + 1)),
+                )
+                self.submodules.packer = MigenSamplePacker(
+                    data=self.value,
+                    we=self._sample,
+                    index=index,
+                    last=last,
+                    sample_width=dma_sample_width,
+                )
                 address = Signal(32)
-                # TODO: Find out what the size of one RAM block is
-                ram_base_address = Constant(_ram_start_address + axi_hp_index * 0x800000, 32) #Leo: why constant?
-                ram_size = 0x2000000  #bit: 0b1000000000000000000000
-                ram_mask = Constant(ram_size-1, 32) # -> 0b0111111111111111111111111
-                #why sync here
+                ram_base_address = Constant(_ram_start_address + axi_hp_index * 0x800000, 32)
+                ram_mask = Constant(_ram_size - 1, 32)
                 #protect to write not outside reserved DMA memroy region
-                self.sync += address.eq(
-                    ram_base_address | 
-                    (ram_mask &
-                     Cat(#cat removes upper range
-                        Constant(0, 3), #increase adress pointer by 8,16,24,32
-                        self.pulseburst.count, #0b000p set adress to self.pulsberst.countx8
-                        Constant(0, 32)))
-                    ) # Leo: what is this?
+                self.comb += address.eq(
+                    ram_base_address |
+                    (ram_mask & Cat(Constant(0, 3), self.packer.out_index)) # 8 bytes per beat
+                )
                 self.submodules.axiwriter = MigenAxiWriter(
                     address=address,
-                    data=self.value,
-                    we=self.pulseburst.out,
-                    reset=self._trigger,
+                    data=self.packer.out,
+                    we=self.packer.out_we,
+                    reset=start,
                     axi_hp=hp,
                 )
+                self.comb += self.write_pointer.eq(self.axiwriter.beats_written * lanes)
+                if banks == 2:
+                    # a bank is complete once the writes of its last beat are acknowledged
+                    beats = Signal(32)
+                    pending = Signal()
+                    target = Signal(32)
+                    self.sync += [
+                        If(start, beats.eq(0)).Elif(self.packer.out_we, beats.eq(beats + 1)),
+                        If(
+                            self._burst_end,
+                            pending.eq(1),
+                            target.eq(beats + self.packer.out_we),
+                            self._complete_bank.eq(self.bank),
+                        ).Elif(self._bank_complete, pending.eq(0)),
+                    ]
+                    self.comb += self._bank_complete.eq(pending & (self.axiwriter.beats_written == target))
                 #Leo: why does this write into data? --> because of the adress
 
 
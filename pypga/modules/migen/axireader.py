@@ -0,0 +1,134 @@
+from typing import Any, Union
+
+from migen import Constant, If, Mux, ResetInserter, Signal
+from migen.genlib.fifo import SyncFIFO
+
+from pypga.core import MigenModule
+
+
+class MigenAxiReader(MigenModule):
+    def __init__(
+        self,
+        address: Union[Signal, Constant, int],
+        length: Signal,
+        re: Signal,
+        reset: Union[Signal, Constant, bool],
+        axi_hp: Any,  # an AXI_HP instance
+        burst_length: int = 16,
+        fifo_depth: int = 512,
+        max_outstanding: int = 8,
+    ):
+        """
+        A Module that streams data from RAM in AXI read bursts, over and over again.
+
+        The ``length`` beats from ``address`` on are read in INCR bursts of up to
+        ``burst_length`` beats into a FIFO, after which reading starts over at
+        ``address``. A burst is only requested while the FIFO has room for it and
+        all beats in flight, such that the FIFO is kept full ahead of the consumer
+        and the read data channel never stalls.
+
+        Args:
+            address: RAM address of the first beat, a multiple of ``8 * burst_length``
+              such that bursts do not cross a 4 kB boundary.
+            length: the number of beats to read before starting over, at least one.
+            re: Read enable, the beat in ``data`` is consumed when high.
+            reset: Empties the FIFO, restarts reading at ``address`` and clears the
+              underflow and error flags when high. The beats of bursts in flight are
+              discarded when they arrive.
+            axi_hp: the AXI HP slave interface of the PS7 to read from.
+            burst_length: the maximum number of beats of a burst, at most 16.
+            fifo_depth: the number of beats that can be prefetched.
+            max_outstanding: the maximum number of bursts whose beats have not all arrived.
+
+        Output signals:
+            data: the next beat.
+            valid: high when ``data`` holds a beat.
+            underflow: high after a beat was read while the FIFO was empty.
+            error: high after a read was answered with an error response.
+            outstanding: the number of bursts whose beats have not all arrived.
+        """
+        if not 1 <= burst_length <= 16:
+            raise ValueError("AXI3 bursts have 1 to 16 beats.")
+        if fifo_depth < burst_length:
+            raise ValueError("The FIFO must hold at least one burst.")
+        # high-level signals
+        self.data = Signal(len(axi_hp.r.data))
+        self.valid = Signal()
+        self.underflow = Signal()
+        self.error = Signal()
+        # low-level signals
+        self.outstanding = Signal(max=max_outstanding + 1)
+
+        ###
+        ar = axi_hp.ar
+        r = axi_hp.r
+        self.submodules.fifo = fifo = ResetInserter()(SyncFIFO(len(r.data), fifo_depth))
+        self.comb += [
+            fifo.reset.eq(reset),
+            self.data.eq(fifo.dout),
+            self.valid.eq(fifo.readable),
+            fifo.re.eq(re),
+        ]
+
+        # the beat at which the next burst starts, and the number of beats of that burst
+        position = Signal(len(length))
+        remaining = Signal(len(length))
+        beats = Signal(max=burst_length + 1)
+        # the beats requested but not yet arrived, and how many of them belong to the stream before a reset
+        requested = Signal(max=fifo_depth + burst_length + 1)
+        discard = Signal.like(requested)
+        credit = Signal()
+        issue = Signal()
+        pending = Signal()
+        arrived = Signal()
+        self.comb += [
+            remaining.eq(length - position),
+            If(remaining < burst_length, beats.eq(remaining)).Else(beats.eq(burst_length)),
+            credit.eq(fifo.level + (requested - discard) + burst_length <= fifo_depth),
+            issue.eq(~pending & ~reset & credit & (self.outstanding < max_outstanding)),
+            arrived.eq(r.valid & r.ready),
+        ]
+
+        # address channel: the address of a burst is registered until it is accepted
+        address_offset = Signal(32)
+        self.comb += [
+            ar.id.eq(0),
+            ar.size.eq(3),  # Width of burst: 3 = 8 bytes = 64 bits.
+            ar.burst.eq(1),  # INCR
+            ar.cache.eq(0b1111),  # bufferable, and cacheable
+            ar.valid.eq(pending),
+            address_offset.eq(position << 3),
+        ]
+        self.sync += [
+            If(
+                issue,
+                pending.eq(1),
+                ar.addr.eq(address + address_offset),
+                ar.len.eq(beats - 1),
+                If(position + beats >= length, position.eq(0)).Else(position.eq(position + beats)),
+            ).Elif(
+                ar.valid & ar.ready,
+                pending.eq(0),
+            ),
+            If(reset, position.eq(0)),
+        ]
+
+        # read data channel: the FIFO has room for all beats in flight
+        self.comb += [
+            r.ready.eq(1),
+            fifo.din.eq(r.data),
+            fifo.we.eq(arrived & (discard == 0)),
+        ]
+        self.sync += [
+            requested.eq(requested + Mux(issue, beats, 0) - arrived),
+            If(reset, discard.eq(requested - arrived)).Elif(arrived & (discard != 0), discard.eq(discard - 1)),
+            If(
+                issue & ~(arrived & r.last),
+                self.outstanding.eq(self.outstanding + 1),
+            ).Elif(
+                ~issue & (arrived & r.last),
+                self.outstanding.eq(self.outstanding - 1),
+            ),
+            If(reset, self.underflow.eq(0)).Elif(re & ~fifo.readable, self.underflow.eq(1)),
+            If(reset, self.error.eq(0)).Elif(arrived & (r.resp != 0), self.error.eq(1)),
+        ]
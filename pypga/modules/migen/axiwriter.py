@@ -1,7 +1,7 @@
 from typing import Any, Union
 
-from migen import Cat, ClockDomainsRenamer, Constant, If, Signal
-from migen.genlib.fifo import AsyncFIFOBuffered
+from migen import Cat, Constant, If, Signal
+from migen.genlib.fifo import SyncFIFO
 
 from pypga.core import MigenModule
 
@@ -14,107 +14,190 @@ class MigenAxiWriter(MigenModule):
         we: Signal,
         reset: Union[Signal, Constant, bool],
         axi_hp: Any,  # an AXI_HP instance
+        burst_length: int = 16,
+        fifo_depth: int = 512,
+        max_outstanding: int = 8,
+        flush_cycles: int = None,
     ):
         """
-        A Module that writes the data given to it to RAM.
+        A Module that writes the data given to it to RAM in AXI bursts.
+
+        Samples are queued in a FIFO and samples written to consecutive addresses
+        are combined into INCR bursts of up to ``burst_length`` beats. A burst is
+        issued when it is full, when the next sample is not written to the next
+        address or would cross a 4 kB boundary, or when no sample has arrived for
+        ``flush_cycles`` cycles.
 
         Args:
-            data: Data to write. Must be a 64-bit register.
-            address: RAM address to write to. Must be a 32-bit register.
-            we: Write enable signal, data is written when high.
+            address: RAM address to write the sample to. Must be a 32-bit register.
+            data: Data to write, up to 64 bits wide.
+            we: Write enable signal, data is queued when high.
+            reset: Clears the overflow and error flags and ``beats_written`` when high.
+              The responses to the beats queued before are not counted, even if they
+              arrive after the reset.
+            axi_hp: the AXI HP slave interface of the PS7 to write to.
+            burst_length: the maximum number of beats of a burst, at most 16.
+            fifo_depth: the number of samples that can be queued.
+            max_outstanding: the maximum number of bursts waiting for a write response.
+            flush_cycles: the cycles without a sample after which an incomplete burst is
+              issued, ``burst_length`` by default.
 
         Output signals:
-            ack: .
+            idle: high when all queued samples have been written and acknowledged.
+            error: high after a write was answered with an error response.
+            overflow: high after a sample was dropped because the FIFO was full.
+            ready: high while the FIFO can accept samples.
+            outstanding: the number of bursts waiting for a write response.
+            beats_written: the number of beats queued since the last reset that the slave acknowledged.
         """
+        if not 1 <= burst_length <= 16:
+            raise ValueError("AXI3 bursts have 1 to 16 beats.")
+        if flush_cycles is None:
+            flush_cycles = burst_length
         # high-level signals
         self.idle = Signal()
         self.error = Signal()
+        self.overflow = Signal()
         # low-level signals
         self.ready = Signal()
-        # obsolete
-        self.aw_valid = Signal()
-        self.w_valid = Signal()
-        self.aw_ready = Signal()
-        self.w_ready = Signal()
-        
-        self._address = Signal(32) #For debugging purposes: read out the address in the testbench
+        self.outstanding = Signal(max=max_outstanding + 1)
+        self.beats_written = Signal(32)
 
         ###
-        # fifo = ClockDomainsRenamer({"write": "sys", "read": "sys"})(
-        #     AsyncFIFOBuffered(64, 32)
-        # )  # 64 bits, 32 samples
-        # self.submodules += fifo
-
         aw = axi_hp.aw
         w = axi_hp.w
         b = axi_hp.b
+        # queued samples, bursts assembled from them and the lengths of the bursts whose address was sent
+        self.submodules.data_fifo = data_fifo = SyncFIFO(len(w.data), fifo_depth)
+        self.submodules.burst_fifo = burst_fifo = SyncFIFO(len(aw.addr) + 4, max(burst_length, 2))
+        self.submodules.length_fifo = length_fifo = SyncFIFO(4, max_outstanding)
+        self.submodules.response_fifo = response_fifo = SyncFIFO(4, max_outstanding)
 
-        aw_valid = Signal()
-        w_valid = Signal()
-
-        self.sync += [
-            If((we == 1), aw_valid.eq(1))
-            .Elif(
-                aw.ready,
-                aw_valid.eq(0),
-            )
-            .Else(
-                aw_valid.eq(0),
+        # burst assembly
+        beats = Signal(max=burst_length + 1)
+        burst_address = Signal(len(aw.addr))
+        next_address = Signal(len(aw.addr))
+        idle_count = Signal(max=flush_cycles + 1)
+        accept = Signal()
+        continues = Signal()
+        close = Signal()
+        start = Signal()
+        self.comb += [
+            self.ready.eq(data_fifo.writable),
+            accept.eq(we & data_fifo.writable & burst_fifo.writable),
+            data_fifo.din.eq(data),
+            data_fifo.we.eq(accept),
+            continues.eq((beats != 0) & (address == next_address) & (next_address[:12] != 0)),
+            # bursts are closed before a sample that does not continue them, or when they are full or stale
+            If(
+                accept,
+                If(
+                    ~continues & (beats != 0),
+                    close.eq(1),
+                    burst_fifo.din.eq(Cat(burst_address, beats - 1)),
+                ).Elif(
+                    beats == burst_length - 1,
+                    close.eq(1),
+                    burst_fifo.din.eq(Cat(burst_address, beats)),
+                ),
+            ).Elif(
+                (beats != 0) & (idle_count == flush_cycles) & burst_fifo.writable,
+                close.eq(1),
+                burst_fifo.din.eq(Cat(burst_address, beats - 1)),
             ),
-            If((we == 1), w_valid.eq(1))
-            .Elif(
-                w.ready,
-                w_valid.eq(0),
-            )
-            .Else(
-                w_valid.eq(0),
+            burst_fifo.we.eq(close),
+            start.eq(accept & (~continues | (beats == 0))),
+        ]
+        self.sync += [
+            If(
+                accept,
+                idle_count.eq(0),
+                next_address.eq(address + 8),
+                If(start, burst_address.eq(address)),
+                If(
+                    start,
+                    # a single-beat burst is closed right away
+                    beats.eq(1 if burst_length > 1 else 0),
+                ).Elif(
+                    beats == burst_length - 1,
+                    beats.eq(0),
+                ).Else(
+                    beats.eq(beats + 1),
+                ),
+            ).Elif(
+                close,
+                beats.eq(0),
+            ).Elif(
+                idle_count != flush_cycles,
+                idle_count.eq(idle_count + 1),
             ),
+            If(reset, self.overflow.eq(0)).Elif(we & ~accept, self.overflow.eq(1)),
         ]
+        if burst_length == 1:
+            # every sample is a burst of its own
+            self.comb += If(accept, close.eq(1), burst_fifo.din.eq(Cat(address, 0)))
 
-        # address part
+        # address channel
+        aw_valid = Signal()
         self.comb += [
             aw.id.eq(0),
-            aw.addr.eq(address),
-            self._address.eq(address),
-            aw.len.eq(
-                0
-            ),  # Number of transfers in burst (0->1 transfer, 1->2 transfers ...)
+            aw.addr.eq(burst_fifo.dout[: len(aw.addr)]),
+            aw.len.eq(burst_fifo.dout[len(aw.addr) :]),
             aw.size.eq(3),  # Width of burst: 3 = 8 bytes = 64 bits.
-            aw.burst.eq(0),  # no burst, fixed width
+            aw.burst.eq(1),  # INCR
             aw.cache.eq(0b1111),  # bufferable, and cacheable
+            aw_valid.eq(
+                burst_fifo.readable & length_fifo.writable & response_fifo.writable & (self.outstanding < max_outstanding)
+            ),
             aw.valid.eq(aw_valid),
-            self.aw_valid.eq(aw_valid),
-            self.aw_ready.eq(aw.ready),
+            burst_fifo.re.eq(aw_valid & aw.ready),
+            length_fifo.din.eq(aw.len),
+            length_fifo.we.eq(aw_valid & aw.ready),
+            response_fifo.din.eq(aw.len),
+            response_fifo.we.eq(aw_valid & aw.ready),
         ]
 
-        # data part
+        # data channel: the beats of a burst are in the FIFO before its address is sent
+        w_beat = Signal(4)
         self.comb += [
             w.id.eq(0),
-            w.data.eq(data),
+            w.data.eq(data_fifo.dout),
             w.strb.eq(0b11111111),
-            w.last.eq(w_valid),
-            w.valid.eq(w_valid),
-            self.w_valid.eq(w_valid),
-            self.w_ready.eq(w.ready),
+            w.valid.eq(length_fifo.readable & data_fifo.readable),
+            w.last.eq(w_beat == length_fifo.dout),
+            data_fifo.re.eq(w.valid & w.ready),
+            length_fifo.re.eq(w.valid & w.ready & w.last),
         ]
-        #         beat_count = Signal(max=AXI_BURST_LEN)
-
-        #         self.sync += [
-        #             If(w.valid & w.ready,
-        #                 w.last.eq(0),
-        #                 If(w.last,
-        #                     beat_count.eq(0)
-        #                 ).Else(
-        #                     If(beat_count == AXI_BURST_LEN-2, w.last.eq(1)),
-        #                     beat_count.eq(beat_count + 1)
-        #                 )
-        #             )
-        #         ]
+        self.sync += If(w.valid & w.ready, If(w.last, w_beat.eq(0)).Else(w_beat.eq(w_beat + 1)))
 
-        #         # status part
-        self.comb += b.ready.eq(1)
-        #         self.sync += [
-        #             If(self.start.re, self.bus_error.status.eq(0)),
-        #             If(b.valid & b.ready & (b.resp != axi.Response.okay),
-        #                 self.bus_error.status.eq(1))
-        #         ]
+        # response channel: the beats queued but not acknowledged, and how many of them were queued before a reset
+        unacknowledged = Signal(max=fifo_depth + (max_outstanding + 1) * burst_length + 1)
+        discard = Signal.like(unacknowledged)
+        acknowledged = Signal(5)
+        counted = Signal()
+        self.comb += [
+            b.ready.eq(1),
+            response_fifo.re.eq(b.valid),
+            If(b.valid, acknowledged.eq(response_fifo.dout + 1)),
+            counted.eq(b.valid & (discard < acknowledged)),
+        ]
+        self.sync += [
+            unacknowledged.eq(unacknowledged + accept - acknowledged),
+            If(reset, discard.eq(unacknowledged + accept - acknowledged)).Elif(
+                b.valid, If(counted, discard.eq(0)).Else(discard.eq(discard - acknowledged))
+            ),
+            If(
+                (aw.valid & aw.ready) & ~b.valid,
+                self.outstanding.eq(self.outstanding + 1),
+            ).Elif(
+                ~(aw.valid & aw.ready) & b.valid,
+                self.outstanding.eq(self.outstanding - 1),
+            ),
+            If(reset, self.error.eq(0)).Elif(counted & (b.resp != 0), self.error.eq(1)),
+            If(reset, self.beats_written.eq(0)).Elif(
+                counted, self.beats_written.eq(self.beats_written + acknowledged - discard)
+            ),
+        ]
+        self.comb += self.idle.eq(
+            ~data_fifo.readable & ~burst_fifo.readable & (beats == 0) & (self.outstanding == 0)
+        )
@@ -0,0 +1,141 @@
+from migen import Array, Cat
+from migen.fhdl.bitcontainer import value_bits_sign
+from migen.fhdl.structure import _Value
+
+from pypga.core import If, MigenModule, Signal
+
+
+class MigenCicDecimator(MigenModule):
+    def __init__(
+        self,
+        input: Signal,
+        strobe: Signal,
+        rate: _Value,
+        stages: int = 3,
+        max_rate_bits: int = 20,
+    ):
+        """
+        Cascaded integrator-comb (CIC) decimation filter.
+
+        The integrators run at the clock rate, and the combs at the rate of
+        ``strobe``, which marks the end of each decimation period. Compared to
+        averaging, each stage adds a zero at the multiples of the output rate,
+        which suppresses aliases. The gain ``rate**stages`` is divided by the
+        next power of two, ``2**(stages * ceil(log2(rate)))``, which leaves a gain
+        of one for power-of-two rates, and of at least ``2**-stages`` otherwise.
+
+        Args:
+            input: the signal to filter.
+            strobe: high for one cycle at the end of each decimation period.
+            rate: the clock cycles per decimation period, used for the gain.
+            stages: the number of integrator and comb stages.
+            max_rate_bits: ``log2`` of the maximum rate, which sets the width of the stages.
+
+        Output signals:
+            out: the filtered signal, with the width and sign of ``input``.
+            out_strobe: high for one cycle when ``out`` is updated, ``stages + 1``
+              cycles after ``strobe``.
+        """
+        self.latency = stages + 1
+        self.out = Signal.like(input)
+        self.out_strobe = Signal()
+        ###
+        width = len(input) + stages * max_rate_bits
+        signed = value_bits_sign(input)[1]
+        # two's complement wrap-around in the integrators cancels in the combs
+        integrators = [Signal((width, signed)) for _ in range(stages)]
+        self.sync += [integrator.eq(integrator + source) for integrator, source in zip(integrators, [input] + integrators)]
+        # the comb stages are pipelined, stage i is updated i cycles after the strobe
+        strobes = Signal(stages + 1)
+        self.sync += strobes.eq(Cat(strobe, strobes))
+        source = integrators[-1]
+        for i in range(stages):
+            previous = Signal((width, signed))
+            difference = Signal((width, signed))
+            self.sync += If(
+                strobes[i - 1] if i else strobe,
+                previous.eq(source),
+                difference.eq(source - previous),
+            )
+            source = difference
+        # the normalizing shift follows changes of the rate within max_rate_bits cycles
+        rate_bits = Signal(max=max_rate_bits + 2)
+        last = Signal(max_rate_bits + 1)
+        shift = Signal(max=stages * (max_rate_bits + 1) + 1)
+        self.comb += last.eq(rate - 1)
+        self.sync += [
+            If((last >> rate_bits) != 0, rate_bits.eq(rate_bits + 1)).Elif(
+                (rate_bits != 0) & ((last >> (rate_bits - 1)) == 0), rate_bits.eq(rate_bits - 1)
+            ),
+            shift.eq(rate_bits * stages),
+            If(strobes[stages - 1], self.out.eq(source >> shift)),
+            self.out_strobe.eq(strobes[stages - 1]),
+        ]
+
+
+class MigenFirFilter(MigenModule):
+    def __init__(
+        self,
+        input: Signal,
+        strobe: Signal,
+        coefficient: Signal,
+        taps: int,
+        decimals: int = 16,
+    ):
+        """
+        FIR filter with a single multiplier that computes one tap per cycle.
+
+        The coefficients are read from a memory, such as a register with depth:
+        ``coefficient_index`` selects the coefficient that ``coefficient`` holds in
+        the next cycle. A new input may arrive every ``taps + 4`` cycles at most.
+
+        Args:
+            input: the signal to filter.
+            strobe: high for one cycle when ``input`` is a new sample.
+            coefficient: the coefficient at ``coefficient_index`` of the previous cycle,
+              a signed fixed-point number with ``decimals`` fractional bits.
+            taps: the number of coefficients.
+            decimals: the fractional bits of the coefficients.
+
+        Output signals:
+            out: the filtered signal, with the width and sign of ``input``.
+            out_strobe: high for one cycle when ``out`` is updated, ``taps + 4``
+              cycles after ``strobe``.
+            coefficient_index: the index of the coefficient to read.
+        """
+        self.latency = taps + 4
+        self.out = Signal.like(input)
+        self.out_strobe = Signal()
+        self.coefficient_index = Signal(max=max(taps, 2))
+        ###
+        history = Array(Signal.like(input) for _ in range(taps))
+        sample = Signal.like(input)
+        product = Signal((len(input) + len(coefficient) + 1, True))
+        accumulator = Signal((len(product) + taps.bit_length(), True))
+        # the stages of the multiply-accumulate pipeline, and the last tap in each of them
+        issue = Signal()
+        multiply = Signal()
+        accumulate = Signal()
+        last = Signal(3)
+        index = self.coefficient_index
+        self.sync += [
+            If(
+                strobe,
+                history[0].eq(input),
+                *[history[i].eq(history[i - 1]) for i in range(1, taps)],
+                index.eq(0),
+                issue.eq(1),
+            ).Elif(
+                issue,
+                If(index == taps - 1, issue.eq(0)).Else(index.eq(index + 1)),
+            ),
+            # the sample is registered along with the coefficient read from memory
+            sample.eq(history[index]),
+            multiply.eq(issue),
+            product.eq(sample * coefficient),
+            accumulate.eq(multiply),
+            last.eq(Cat(issue & (index == taps - 1), last)),
+            If(strobe, accumulator.eq(0)).Elif(accumulate, accumulator.eq(accumulator + product)),
+            self.out_strobe.eq(last[2]),
+            If(last[2], self.out.eq(accumulator >> decimals)),
+        ]
@@ -0,0 +1,118 @@
+import math
+from typing import Tuple
+
+from migen import Cat
+from migen.fhdl.bitcontainer import value_bits_sign
+from migen.fhdl.structure import _Value
+
+from pypga.core import If, MigenModule, Signal
+
+
+class MigenReciprocal(MigenModule):
+    def __init__(self, divisor: Signal, fraction_bits: int = 32):
+        """
+        Computes ``round(2**fraction_bits / divisor)`` by long division, one bit per cycle.
+
+        The reciprocal is recomputed whenever ``divisor`` changes and takes
+        ``fraction_bits + 2`` cycles, during which ``out`` keeps the previous result.
+        This suits divisors that change rarely, such as a register, and leaves
+        the division of each sample to a multiplication with ``out``.
+
+        Args:
+            divisor: the unsigned divisor. Zero yields the largest value of ``out``.
+            fraction_bits: the number of fractional bits of the result.
+
+        Output signals:
+            out: the reciprocal, zero until the first result is available.
+            busy: high while a new reciprocal is computed.
+        """
+        width = fraction_bits + 1
+        self.out = Signal(width)
+        self.busy = Signal()
+        ###
+        current = Signal(len(divisor))
+        numerator = Signal(width)
+        quotient = Signal(width)
+        remainder = Signal(len(divisor) + 1)
+        shifted = Signal(len(divisor) + 1)
+        bit = Signal()
+        step = Signal(max=width + 1)
+        self.comb += [
+            # bring down the next bit of the numerator
+            shifted.eq(Cat(numerator[-1], remainder)),
+            bit.eq(shifted >= current),
+        ]
+        self.sync += If(
+            ~self.busy,
+            If(
+                divisor != current,
+                current.eq(divisor),
+                # adding half the divisor rounds the quotient to the nearest integer
+                numerator.eq((1 << fraction_bits) + (divisor >> 1)),
+                remainder.eq(0),
+                step.eq(width),
+                self.busy.eq(1),
+            ),
+        ).Else(
+            numerator.eq(numerator << 1),
+            If(bit, remainder.eq(shifted - current)).Else(remainder.eq(shifted)),
+            quotient.eq(Cat(bit, quotient)),
+            step.eq(step - 1),
+            If(step == 1, self.out.eq(Cat(bit, quotient)), self.busy.eq(0)),
+        )
+
+
+class MigenPipelinedMultiplier(MigenModule):
+    def __init__(self, a: _Value, b: _Value, latency: int = 3, chunk_widths: Tuple[int, int] = (24, 17)):
+        """
+        Multiplies two signals in a pipeline that meets timing for wide operands.
+
+        The operands are split into chunks that fit the multipliers of a DSP48
+        slice, whose partial products are registered and summed up in a tree of
+        adders with a register after each level. Latency beyond what this
+        requires is added as registers at the output, which Vivado can retime.
+
+        Args:
+            a: the first factor.
+            b: the second factor.
+            latency: the cycles from the inputs to ``out``.
+            chunk_widths: the unsigned operand widths of a single multiplier.
+
+        Output signals:
+            out: the product, ``latency`` cycles after the inputs.
+        """
+        signed = value_bits_sign(a)[1] or value_bits_sign(b)[1]
+        self.out = Signal((len(a) + len(b), signed))
+        ###
+        terms = []
+        for a_offset, a_chunk in self._chunks(a, chunk_widths[0]):
+            for b_offset, b_chunk in self._chunks(b, chunk_widths[1]):
+                product = Signal.like(self.out)
+                self.sync += product.eq((a_chunk * b_chunk) << (a_offset + b_offset))
+                terms.append(product)
+        levels = math.ceil(math.log2(len(terms)))
+        if latency < levels + 1:
+            raise ValueError(f"A {len(a)}x{len(b)} multiplication requires a latency of at least {levels + 1}.")
+        while len(terms) > 1:
+            pairs = [terms[i : i + 2] for i in range(0, len(terms), 2)]
+            terms = []
+            for pair in pairs:
+                total = Signal.like(self.out)
+                self.sync += total.eq(pair[0] + pair[1] if len(pair) == 2 else pair[0])
+                terms.append(total)
+        for _ in range(latency - levels - 1):
+            delayed = Signal.like(self.out)
+            self.sync += delayed.eq(terms[0])
+            terms = [delayed]
+        self.comb += self.out.eq(terms[0])
+
+    def _chunks(self, operand, width):
+        """Splits an operand into chunks of ``width`` bits, the last of which carries the sign."""
+        chunks = []
+        for offset in range(0, len(operand), width):
+            bits = operand[offset : offset + width]
+            top = offset + width >= len(operand)
+            chunk = Signal((len(bits), value_bits_sign(operand)[1] and top))
+            self.comb += chunk.eq(bits)
+            chunks.append((offset, chunk))
+        return chunks
@@ -0,0 +1,121 @@
+from migen import Case, If, Signal
+
+from pypga.core import MigenModule
+
+
+class MigenSamplePacker(MigenModule):
+    def __init__(
+        self,
+        data: Signal,
+        we: Signal,
+        index: Signal,
+        last: Signal = False,
+        sample_width: int = 16,
+        beat_width: int = 64,
+    ):
+        """
+        Packs consecutive samples into the lanes of wider words, e.g. four 16-bit
+        samples into a 64-bit AXI beat.
+
+        Sample ``index`` occupies lane ``index % lanes`` of word ``index // lanes``,
+        such that the words in memory form an array of ``sample_width``-bit samples
+        indexed by ``index``. The index must count up, as a word is emitted with
+        the sample of its highest lane or with the ``last`` sample, and the lanes
+        below are taken from the preceding samples.
+
+        Args:
+            data: the sample, sign-extended to ``sample_width`` if signed.
+            we: high when ``data`` is a new sample.
+            index: the position of the sample in memory.
+            last: high with the last sample of a sequence, which emits an incomplete word.
+            sample_width: the bits per sample, a divisor of ``beat_width``.
+            beat_width: the bits per word.
+
+        Output signals:
+            out: the packed word.
+            out_we: high for one cycle when ``out`` is complete.
+            out_index: the position of ``out`` in memory.
+        """
+        lanes = beat_width // sample_width
+        if beat_width % sample_width or lanes & (lanes - 1):
+            raise ValueError(f"Cannot pack {sample_width}-bit samples into {beat_width}-bit words.")
+        lane_bits = lanes.bit_length() - 1
+        self.out = Signal(beat_width)
+        self.out_we = Signal()
+        self.out_index = Signal(max(len(index) - lane_bits, 1))
+
+        ###
+        sample = Signal((sample_width, data.signed))
+        self.comb += sample.eq(data)
+        if lanes == 1:
+            self.comb += [self.out.eq(sample), self.out_we.eq(we), self.out_index.eq(index)]
+            return
+        lane = Signal(lane_bits)
+        buffer = Signal(beat_width)
+
+        def lanes_of(word, i):
+            return word[i * sample_width : (i + 1) * sample_width]
+
+        self.comb += [
+            lane.eq(index[:lane_bits]),
+            self.out.eq(buffer),
+            Case(lane, {i: lanes_of(self.out, i).eq(sample) for i in range(lanes)}),
+            self.out_we.eq(we & ((lane == lanes - 1) | last)),
+            self.out_index.eq(index[lane_bits:]),
+        ]
+        self.sync += If(we, Case(lane, {i: lanes_of(buffer, i).eq(sample) for i in range(lanes - 1)}))
+
+
+class MigenSampleUnpacker(MigenModule):
+    def __init__(
+        self,
+        data: Signal,
+        next: Signal,
+        length: Signal,
+        reset: Signal = False,
+        sample_width: int = 16,
+        signed: bool = False,
+    ):
+        """
+        Unpacks the lanes of wider words into consecutive samples, the inverse
+        of :class:`MigenSamplePacker`.
+
+        Sample ``i`` of a sequence of ``length`` samples is lane ``i % lanes`` of
+        word ``i // lanes``. The sequence repeats, starting with the word after
+        the one of its last sample, such that a sequence whose last word is
+        incomplete can be repeated from a stream of words.
+
+        Args:
+            data: the current word.
+            next: advances to the next sample when high.
+            length: the number of samples in a sequence, at least one.
+            reset: restarts at the first sample of a sequence when high.
+            sample_width: the bits per sample, a divisor of the width of ``data``.
+            signed: whether the samples are signed.
+
+        Output signals:
+            out: the current sample.
+            re: high when ``next`` consumes the last sample of the current word.
+        """
+        beat_width = len(data)
+        lanes = beat_width // sample_width
+        if beat_width % sample_width or lanes & (lanes - 1):
+            raise ValueError(f"Cannot unpack {sample_width}-bit samples from {beat_width}-bit words.")
+        lane_bits = lanes.bit_length() - 1
+        self.out = Signal((sample_width, signed))
+        self.re = Signal()
+
+        ###
+        position = Signal(len(length))
+        last = Signal()
+        self.comb += last.eq(position == length - 1)
+        self.sync += If(reset, position.eq(0)).Elif(next, If(last, position.eq(0)).Else(position.eq(position + 1)))
+        if lanes == 1:
+            self.comb += [self.out.eq(data), self.re.eq(next)]
+            return
+        lane = Signal(lane_bits)
+        self.comb += [
+            lane.eq(position[:lane_bits]),
+            Case(lane, {i: self.out.eq(data[i * sample_width : (i + 1) * sample_width]) for i in range(lanes)}),
+            self.re.eq(next & ((lane == lanes - 1) | last)),
+        ]
@@ -74,6 +74,7 @@ class MigenPulseBurstGen(MigenModule):
         reset: Union[Signal, bool] = False,
         pulses: Union[Signal, int] = 0,
         period: Union[Signal, int] = 0,
+        timestamp_width: int = 0,
     ):
         """
         #DOC: make n pulses, Emits after trigger : | | | | |
@@ -88,12 +89,18 @@ class MigenPulseBurstGen(MigenModule):
               Set this to a negative number to indicate that the output should
               be constantly high. Set this to zero for a pulse every other clock
               cycle, to one for a pulse every third clock cycle, and so on.
+            timestamp_width: if nonzero, the width of a free-running cycle counter
+              whose value is latched when a burst sequence starts.
 
         Output signals:
             out: the pulse sequence, 0 between pulses and 1 for a single clock
               cycle during a pulse.
             count: the current count, going from ``pulses`` to zero during a
               burst sequence and staying zero afterwards.
+            time: the free-running cycle counter, counting from zero at the
+              end of the reset of the FPGA (only with ``timestamp_width``).
+            timestamp: the value of ``time`` in the cycle in which the trigger
+              of the last burst sequence was accepted (only with ``timestamp_width``).
         """
         self.out = Signal(reset=0)
         self.count = Signal(get_length(pulses), reset=0)
@@ -106,6 +113,12 @@ class MigenPulseBurstGen(MigenModule):
             high_after_on=False,
             first_cycle_period_offset=1,
         )
+        latch = []
+        if timestamp_width:
+            self.time = Signal(timestamp_width)
+            self.timestamp = Signal(timestamp_width)
+            self.sync += self.time.eq(self.time + 1)
+            latch = [self.timestamp.eq(self.time)]
         self.sync += [
             self.out.eq(0),
             pulsegen_on.eq(~reset & (self.busy | trigger)),
@@ -123,6 +136,7 @@ class MigenPulseBurstGen(MigenModule):
                     self.busy.eq(1),
                     self.out.eq(1),
                     self.count.eq(pulses),
+                    *latch,
                 ),
             )
             .Else(
@@ -130,7 +144,7 @@ class MigenPulseBurstGen(MigenModule):
                     self.pulsegen.out == 1,
                     If(
                         self.count == 0,
-                        If(trigger == 1, self.out.eq(1), self.count.eq(pulses),).Else(
+                        If(trigger == 1, self.out.eq(1), self.count.eq(pulses), *latch).Else(
                             self.busy.eq(0),
                         ),
                     ).Else(
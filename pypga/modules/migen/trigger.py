@@ -0,0 +1,126 @@
+from migen import Memory
+from migen.fhdl.structure import _Value, wrap
+
+from pypga.core import Case, If, MigenModule, Signal
+
+# the values of ``mode`` of MigenTrigger
+TRIGGER_MODES = {"off": 0, "above": 1, "below": 2, "rising": 3, "falling": 4}
+
+
+class MigenTrigger(MigenModule):
+    # the cycles from the input meeting the trigger condition to ``out``
+    latency = 2
+
+    def __init__(
+        self,
+        input: Signal,
+        mode: _Value,
+        level: _Value,
+        hysteresis: _Value = 0,
+        holdoff: _Value = 0,
+        enable: _Value = True,
+    ):
+        """
+        Trigger on the level or an edge of a signal, with hysteresis and holdoff.
+
+        In the modes "above" and "below", the trigger fires while ``input`` is above
+        or below ``level``. In the mode "rising", it fires when ``input`` rises above
+        ``level`` after it was at or below ``level - hysteresis``, and in the mode
+        "falling" when it falls below ``level`` after it was at or above
+        ``level + hysteresis``, such that noise smaller than the hysteresis does not
+        fire it repeatedly. The trigger only fires while ``enable`` is high, and
+        not within ``holdoff`` cycles after it fired, nor in two consecutive
+        cycles. An edge during the holdoff is ignored.
+
+        Args:
+            input: the signal to trigger on.
+            mode: one of the values of ``TRIGGER_MODES``.
+            level: the trigger level.
+            hysteresis: the non-negative hysteresis of the edge modes.
+            holdoff: the cycles after the trigger fired during which it does not fire again.
+            enable: the trigger only fires while this is high.
+
+        Output signals:
+            out: high for one cycle when the trigger fires, ``latency`` cycles
+              after ``input`` met the trigger condition.
+        """
+        self.out = Signal()
+        ###
+        # the comparisons are registered, with enough width for the thresholds to not overflow
+        width = max(len(input), len(wrap(level)), len(wrap(hysteresis))) + 2
+        low = Signal((width, True))
+        high = Signal((width, True))
+        self.comb += [
+            low.eq(level - hysteresis),
+            high.eq(level + hysteresis),
+        ]
+        above = Signal()
+        below = Signal()
+        below_low = Signal()
+        above_high = Signal()
+        self.sync += [
+            above.eq(input > level),
+            below.eq(input < level),
+            below_low.eq(input <= low),
+            above_high.eq(input >= high),
+        ]
+        # whether the input was beyond the hysteresis since the last edge
+        was_low = Signal()
+        was_high = Signal()
+        self.sync += [
+            If(below_low, was_low.eq(1)).Elif(above, was_low.eq(0)),
+            If(above_high, was_high.eq(1)).Elif(below, was_high.eq(0)),
+        ]
+        condition = Signal()
+        self.comb += Case(
+            mode,
+            {
+                TRIGGER_MODES["above"]: condition.eq(above),
+                TRIGGER_MODES["below"]: condition.eq(below),
+                TRIGGER_MODES["rising"]: condition.eq(was_low & above),
+                TRIGGER_MODES["falling"]: condition.eq(was_high & below),
+                "default": condition.eq(0),
+            },
+        )
+        remaining = Signal.like(holdoff) if isinstance(holdoff, _Value) else Signal(max=holdoff + 2)
+        self.sync += [
+            self.out.eq(0),
+            If(
+                condition & enable & ~self.out & (remaining == 0),
+                self.out.eq(1),
+                remaining.eq(holdoff),
+            ).Elif(remaining != 0, remaining.eq(remaining - 1)),
+        ]
+
+
+class MigenDelayLine(MigenModule):
+    def __init__(self, input: Signal, delay: _Value, depth: int):
+        """
+        Delays a signal by a variable number of cycles in a circular buffer in block RAM.
+
+        Args:
+            input: the signal to delay.
+            delay: the delay in cycles, between 2 and ``depth``.
+            depth: the size of the buffer, a power of two.
+
+        Output signals:
+            out: ``input`` from ``delay`` cycles ago.
+        """
+        if depth < 2 or depth & (depth - 1):
+            raise ValueError("The depth of a delay line must be a power of two.")
+        self.out = Signal.like(input)
+        ###
+        self.specials.memory = Memory(width=len(input), depth=depth)
+        write = self.memory.get_port(write_capable=True)
+        read = self.memory.get_port()
+        self.specials += write, read
+        pointer = Signal(max=depth)
+        self.sync += pointer.eq(pointer + 1)
+        # the read port takes one cycle, and the buffer wraps around with the pointer bits
+        self.comb += [
+            write.adr.eq(pointer),
+            write.dat_w.eq(input),
+            write.we.eq(1),
+            read.adr.eq(pointer - delay + 1),
+            self.out.eq(read.dat_r),
+        ]
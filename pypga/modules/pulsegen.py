@@ -3,6 +3,20 @@ from pypga.core import BoolRegister, Module, NumberRegister, logic
 from .migen.pulsegen import MigenPulseGen
 
 
+def read_timestamp(module: Module, name: str) -> int:
+    """Returns the 64-bit timestamp in the readonly registers ``{name}_high`` and ``{name}_low``.
+
+    A timestamp latched between the reads of both words changes the high word
+    at most once, which is detected by reading it again.
+    """
+    high = getattr(module, f"{name}_high")
+    low = getattr(module, f"{name}_low")
+    if getattr(module, f"{name}_high") != high:
+        high = getattr(module, f"{name}_high")
+        low = getattr(module, f"{name}_low")
+    return (high << 32) | low
+
+
 def PulseGen(default_period=8, default_on=True, high_after_on=True, period_width=32):
     class _PulseGen(Module):
         period: NumberRegister(
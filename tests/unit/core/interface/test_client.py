@@ -0,0 +1,63 @@
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+from pypga.core.interface.remote.client import Client
+
+TOKEN = "0" * 32
+
+
+def recv_exactly(connection, length):
+    data = b""
+    while len(data) < length:
+        data += connection.recv(length - len(data))
+    return data
+
+
+@pytest.fixture
+def server():
+    """Returns a function that starts a server confirming connections with the given protocol version."""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    received = []
+
+    def serve(version):
+        connection, _ = listener.accept()
+        with connection:
+            recv_exactly(connection, 32)
+            connection.sendall(str(version).encode("ascii") * 32)
+            # like the server, answer 'u' commands by echoing their header after the data
+            while True:
+                header = recv_exactly(connection, 8)
+                if header[:1] != b"u":
+                    return
+                length = int.from_bytes(header[1:4], "little")
+                received.append((int.from_bytes(header[4:8], "little"), recv_exactly(connection, 4 * length)))
+                connection.sendall(header)
+
+    def start(version):
+        threading.Thread(target=serve, args=(version,), daemon=True).start()
+        return Client(TOKEN, port=listener.getsockname()[1], timeout=1.0), received
+
+    yield start
+    listener.close()
+
+
+def test_write_to_ram(server):
+    client, received = server(version=2)
+    values = np.arange(10, dtype=np.uint32)
+    client.write_to_ram(16, values)
+    client.stop()
+    assert received == [(16, values.tobytes())]
+
+
+def test_write_to_ram_unsupported(server):
+    # older servers would interpret the data as commands, so nothing is sent
+    client, received = server(version=1)
+    with pytest.raises(RuntimeError, match="Rebuild the server"):
+        client.write_to_ram(0, np.arange(10, dtype=np.uint32))
+    client.stop()
+    assert received == []
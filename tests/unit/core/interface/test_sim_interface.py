@@ -0,0 +1,113 @@
+import time
+
+import numpy as np
+import pytest
+
+from pypga.core import BoolRegister, If, NumberRegister, TopModule, TriggerRegister, logic
+
+_sleep = time.sleep
+
+
+class Counter(TopModule):
+    value: NumberRegister(width=16, default=3)
+    double: NumberRegister(width=17, readonly=True)
+    table: NumberRegister(width=8, depth=4, default=[1, 2, 3, 4])
+    counting: BoolRegister(default=False)
+    count: NumberRegister(width=32, readonly=True, signed=False)
+    clear: TriggerRegister()
+
+    @logic
+    def _logic(self):
+        self.comb += self.double.eq(self.value << 1)
+        self.sync += If(self.clear, self.count.eq(0)).Elif(self.counting, self.count.eq(self.count + 1))
+
+
+@pytest.fixture
+def counter():
+    counter = Counter.run(simulate=True)
+    yield counter
+    counter.stop()
+
+
+class TestSimInterface:
+    def test_defaults(self, counter):
+        assert counter.value == 3
+        assert counter.double == 6
+        assert counter.counting is False
+        assert counter.count == 0
+
+    def test_write(self, counter):
+        counter.value = -1000
+        assert counter.value == -1000
+        assert counter.double == -2000
+
+    def test_array(self, counter):
+        assert list(counter.table) == [1, 2, 3, 4]
+        counter.table = [5, -6, 7, 8]
+        assert list(counter.table) == [5, -6, 7, 8]
+
+    def test_cycles(self, counter):
+        counter.counting = True
+        counter._interface.run(100)
+        counter.counting = False
+        count = counter.count
+        assert 100 < count < 110
+        counter._interface.run(100)
+        assert counter.count == count
+        counter.clear()
+        assert counter.count == 0
+
+    def test_addresses(self, counter):
+        # the register banks are laid out like on the board
+        assert counter._interface.name_to_address("top.value_csr") >= 0x80000800
+        assert np.all(np.diff(sorted(counter._interface.csrmap.address.values())) > 0)
+
+
+class TestVirtualClock:
+    def test_sleep(self, counter):
+        counter.counting = True
+        with counter._interface.virtual_clock() as clock:
+            start, perf_start = time.time(), time.perf_counter()
+            count = counter.count
+            time.sleep(1e-5)
+            assert 1250 <= counter.count - count < 1270
+            assert time.time() - start == pytest.approx(clock.elapsed, abs=1e-6)
+            assert time.perf_counter() - perf_start == pytest.approx(clock.elapsed)
+            assert clock.elapsed == pytest.approx((counter._interface.cycle - clock._start_cycle) * 8e-9)
+        assert (clock.sleeps, clock.slept_cycles) == (1, 1250)
+        assert time.sleep is _sleep
+
+    def test_max_sleep_cycles(self, counter):
+        counter.counting = True
+        with counter._interface.virtual_clock(max_sleep_cycles=100) as clock:
+            time.sleep(10)
+            assert clock.slept_cycles == 100
+            assert clock.elapsed < 1e-5
+
+    def test_restored_after_error(self, counter):
+        with pytest.raises(ZeroDivisionError):
+            with counter._interface.virtual_clock():
+                1 / 0
+        assert time.sleep is _sleep
+
+    def test_axiwriter_script(self):
+        # the measurement sequence of the integration test of the AXI writer, against the simulation
+        pytest.importorskip("migen_axi")
+        from pypga.core.axi_model import SimAxiSoc
+        from pypga.modules.axiwriter import AXIWriter
+
+        class AxiWriterTester(TopModule):
+            axiwriter: AXIWriter(axi_hp_index=0)
+
+        dut = AxiWriterTester.run(simulate=True, sim_soc=SimAxiSoc())
+        try:
+            with dut._interface.virtual_clock() as clock:
+                for value, offset in [(1, 0), (2345, 8), (111, 8000)]:
+                    dut.axiwriter.address = 0xA000000 + offset
+                    dut.axiwriter.data = value
+                    dut.axiwriter.we()
+                    time.sleep(1e-6)
+                    assert tuple(dut.axiwriter.read_from_ram(offset=offset, length=2)) == (value, value)
+            assert clock.slept_cycles == 3 * 125
+        finally:
+            dut.stop()
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("migen_axi")
+
+from migen import Module as MigenModule  # noqa: E402
+from migen.sim import run_simulation  # noqa: E402
+
+from pypga.core.axi_model import RAM_START, RESP_OKAY, RESP_SLVERR, SimAxiSoc  # noqa: E402
+from pypga.modules.axiwriter import AXIWriter  # noqa: E402
+
+
+def write_burst(bus, address, data, strb=0xFF, id_=0, responses=None):
+    """A well-behaved AXI master writing an INCR burst of 64-bit ``data``."""
+    yield bus.aw.addr.eq(address)
+    yield bus.aw.len.eq(len(data) - 1)
+    yield bus.aw.size.eq(3)
+    yield bus.aw.burst.eq(1)
+    yield bus.aw.id.eq(id_)
+    yield bus.aw.valid.eq(1)
+    yield
+    while not (yield bus.aw.ready):
+        yield
+    yield bus.aw.valid.eq(0)
+    for i, value in enumerate(data):
+        yield bus.w.data.eq(value)
+        yield bus.w.strb.eq(strb)
+        yield bus.w.last.eq(i == len(data) - 1)
+        yield bus.w.valid.eq(1)
+        yield
+        while not (yield bus.w.ready):
+            yield
+    yield bus.w.valid.eq(0)
+    yield bus.b.ready.eq(1)
+    yield
+    while not (yield bus.b.valid):
+        yield
+    if responses is not None:
+        responses.append(((yield bus.b.id), (yield bus.b.resp)))
+    yield bus.b.ready.eq(0)
+
+
+def simulate(soc, *masters):
+    run_simulation(MigenModule(), [*masters, *soc.sim_generators()])
+
+
+class TestAxiHpSlaveModel:
+    def test_burst(self):
+        soc = SimAxiSoc()
+        data = [0x0101010102020202 * (i + 1) for i in range(16)]
+        responses = []
+        simulate(soc, write_burst(soc.ps7.s_axi_hp1, RAM_START + 0x100, data, id_=5, responses=responses))
+        assert responses == [(5, RESP_OKAY)]
+        written = soc.read_from_ram(0x100, 32).view(np.uint64)
+        assert list(written) == data
+        hp = soc.hp[1]
+        assert (hp.bursts, hp.beats, hp.bytes_written, hp.errors) == (1, 16, 128, 0)
+        assert hp.aw_stall_cycles == hp.w_stall_cycles == 0
+        assert hp.throughput == pytest.approx(128 / (16 + 4), rel=0.2)
+
+    def test_strobe(self):
+        soc = SimAxiSoc()
+        soc.ram[:8] = 0xAA
+        simulate(soc, write_burst(soc.ps7.s_axi_hp0, RAM_START, [0x0807060504030201], strb=0b00001111))
+        assert list(soc.ram[:8]) == [1, 2, 3, 4, 0xAA, 0xAA, 0xAA, 0xAA]
+        assert soc.hp[0].bytes_written == 4
+
+    def test_backpressure(self):
+        soc = SimAxiSoc(backpressure=0.5, seed=1)
+        data = list(range(1, 17))
+        simulate(soc, write_burst(soc.ps7.s_axi_hp0, RAM_START, data))
+        assert list(soc.read_from_ram(0, 32).view(np.uint64)) == data
+        hp = soc.hp[0]
+        assert hp.w_stall_cycles > 0
+        assert hp.throughput < 8
+        stats = hp.statistics(clock_period=8e-9)
+        assert stats["throughput_bytes_per_second"] == pytest.approx(hp.throughput / 8e-9)
+
+    def test_latency(self):
+        fast, slow = SimAxiSoc(), SimAxiSoc(address_latency=10, response_latency=20)
+        for soc in fast, slow:
+            simulate(soc, write_burst(soc.ps7.s_axi_hp0, RAM_START, [1, 2]))
+        assert slow.hp[0].last_cycle - fast.hp[0].last_cycle == 30
+
+    def test_out_of_range(self):
+        soc = SimAxiSoc(ram_size=0x1000)
+        responses = []
+        simulate(soc, write_burst(soc.ps7.s_axi_hp0, RAM_START + 0x1000, [1], responses=responses))
+        assert responses == [(0, RESP_SLVERR)]
+        assert soc.hp[0].errors == 1
+        assert not soc.ram.any()
+
+    def test_axiwriter(self):
+        soc = SimAxiSoc()
+        query = {"address": {0: RAM_START + 0x10}, "data": {0: 0x12345678}, "we": {2: 1, 3: 0}}
+        AXIWriter(axi_hp_index=2).sim(60, query, soc=soc)
+        assert list(soc.read_from_ram(0x10, 2)) == [0x12345678, 0x12345678]
+        assert soc.hp[2].beats == 1
@@ -0,0 +1,39 @@
+from migen.build.generic_platform import GenericPlatform
+
+from pypga.core import Module, NumberRegister, Signal, logic
+from pypga.core.migen import AutoMigenModule, ElaborationProfile
+from pypga.modules.pulsegen import PulseGen
+
+
+class Inner(Module):
+    value: NumberRegister(width=8)
+
+    @logic
+    def _inner(self):
+        self.double = Signal(9)
+        self.sync += self.double.eq(self.value << 1)
+
+
+class Outer(Module):
+    inner: Inner
+    pulsegen: PulseGen()
+
+    @logic
+    def _outer(self):
+        self.out = Signal(9)
+        self.comb += self.out.eq(self.inner.double)
+
+
+class TestElaborate:
+    def test_profile(self):
+        profile = ElaborationProfile()
+        AutoMigenModule(Outer, GenericPlatform, None, omit_csr=True, profile=profile)
+        assert set(profile.timings) == {
+            "top.inner",
+            "top.inner._inner()",
+            "top.pulsegen",
+            "top.pulsegen._setup()",
+            "top._outer()",
+        }
+        assert profile.timings["top.inner"] >= profile.timings["top.inner._inner()"]
+        assert "top.pulsegen._setup()" in Outer.elaboration_report()
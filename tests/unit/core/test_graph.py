@@ -0,0 +1,66 @@
+import json
+import xml.etree.ElementTree as ET
+
+from migen import If, Memory, Module, Signal
+
+from pypga.core.graph import SignalGraph
+
+
+class Multiplier(Module):
+    def __init__(self):
+        self.a = Signal((16, True))
+        self.b = Signal((16, True))
+        self.product = Signal((32, True))
+        self.comb += self.product.eq(self.a * self.b)
+
+
+class Top(Module):
+    def __init__(self):
+        self.input = Signal((16, True))
+        self.enable = Signal()
+        self.factor = Signal((16, True))
+        self.output = Signal((16, True))
+        self.submodules.multiplier = Multiplier()
+        self.comb += [self.multiplier.a.eq(self.input + 1), self.multiplier.b.eq(self.factor)]
+        self.sync += If(self.enable, self.output.eq(self.multiplier.product >> 16))
+        self.specials.memory = Memory(16, 8)
+        self.port = self.memory.get_port(write_capable=True)
+        self.specials += self.port
+        self.comb += [self.port.adr.eq(self.input[:3]), self.port.dat_w.eq(self.output)]
+
+
+class TestSignalGraph:
+    def setup_method(self):
+        self.graph = SignalGraph(Top())
+
+    def test_hierarchy(self):
+        names = {node["name"] for node in self.graph.nodes.values()}
+        assert {"input", "output", "multiplier.a", "multiplier.product"} <= names
+        assert self.graph.nodes[self.graph.find("multiplier.product")]["driver"] == "comb"
+        assert self.graph.nodes[self.graph.find("output")]["driver"] == "sys"
+        assert self.graph.nodes[self.graph.find("input")]["driver"] is None
+
+    def test_fan(self):
+        assert self.graph.fan_in("output") == {"multiplier.product": "sys", "enable": "sys"}
+        assert self.graph.fan_out("input") == {"multiplier.a": "comb", "memory.port0.adr": "comb"}
+        assert "memory.port0.dat_r" in self.graph.fan_out("memory.port0.adr")
+
+    def test_longest_comb_chain(self):
+        depth, path = self.graph.longest_comb_chain()
+        # adder, multiplier, shift and the multiplexer of the If statement
+        assert depth == 4
+        assert path == ["input", "multiplier.a", "multiplier.product", "output"]
+
+    def test_cost(self):
+        graph = SignalGraph(Top(), cost=lambda operator: 10 if operator.op == "*" else 1)
+        assert graph.longest_comb_chain()[0] == 13
+
+    def test_export(self, tmp_path):
+        self.graph.to_json(tmp_path / "graph.json")
+        data = json.loads((tmp_path / "graph.json").read_text())
+        assert len(data["nodes"]) == len(self.graph.nodes)
+        assert len(data["edges"]) == len(self.graph.edges)
+        root = ET.fromstring(self.graph.to_graphml(tmp_path / "graph.graphml"))
+        namespace = {"g": "http://graphml.graphdrawing.org/xmlns"}
+        assert len(root.findall("g:graph/g:node", namespace)) == len(self.graph.nodes)
+        assert len(root.findall("g:graph/g:edge", namespace)) == len(self.graph.edges)
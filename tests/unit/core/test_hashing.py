@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from migen import If, Memory, Module, Signal
+from migen.fhdl.verilog import convert
+
+from pypga.core.hashing import hash_verilog, normalize_verilog
+
+
+class Leaf(Module):
+    def __init__(self, width):
+        self.x = Signal(width)
+        self.y = Signal(width)
+        count = Signal(8)
+        self.sync += [count.eq(count + 1), self.y.eq(self.x + count)]
+        self.comb += If(self.x == 0, self.y.eq(1))
+
+
+class Top(Module):
+    def __init__(self, names=("a", "b"), widths={"a": 4, "b": 5}):
+        for name in names:
+            setattr(self.submodules, name, Leaf(widths[name]))
+        tmp = [Signal(3) for _ in range(2)]
+        self.o = Signal(8)
+        self.sync += [tmp[0].eq(self.a.y), tmp[1].eq(self.b.y)]
+        self.comb += self.o.eq(tmp[0] + tmp[1])
+        self.specials.mem = Memory(8, 4, init=[1, 2, 3, 4])
+        port = self.mem.get_port(write_capable=True)
+        self.specials += port
+        self.comb += port.adr.eq(self.o)
+
+
+class Ports(Module):
+    def __init__(self, swapped=False):
+        self.a = Signal()
+        self.b = Signal()
+        # the ports are created in the opposite order and driven by the other input
+        if swapped:
+            self.out1 = Signal()
+            self.out0 = Signal()
+        else:
+            self.out0 = Signal()
+            self.out1 = Signal()
+        self.comb += [self.out0.eq(self.b if swapped else self.a), self.out1.eq(self.a if swapped else self.b)]
+
+
+def get_hash(module, ios=None):
+    verilog = convert(module, ios=ios)
+    return hash_verilog(verilog.main_source, sorted(verilog.data_files.items()))
+
+
+SCRIPT = """
+from tests.unit.core.test_hashing import Top, get_hash
+print(get_hash(Top()))
+"""
+
+
+class TestNormalizeVerilog:
+    def test_repeated_elaboration(self):
+        assert get_hash(Top()) == get_hash(Top())
+
+    def test_creation_order(self):
+        first, second = convert(Top(("a", "b"))).main_source, convert(Top(("b", "a"))).main_source
+        assert first != second
+        assert normalize_verilog(first) == normalize_verilog(second)
+
+    def test_different_hardware(self):
+        assert get_hash(Top()) != get_hash(Top(widths={"a": 4, "b": 6}))
+
+    def test_comments(self):
+        source = convert(Top()).main_source
+        assert normalize_verilog(source) == normalize_verilog("/* other header */\n" + source)
+
+    def test_separate_processes(self):
+        hashes = {
+            subprocess.run(
+                [sys.executable, "-c", SCRIPT],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=Path(__file__).parents[3],
+                env={**os.environ, "PYTHONHASHSEED": seed},
+            ).stdout.strip()
+            for seed in ["1", "2"]
+        }
+        assert hashes == {get_hash(Top())}
+
+    def test_port_names(self):
+        # pin constraints refer to the ports by name, so swapping their assignments changes the hardware
+        first, second = Ports(), Ports(swapped=True)
+        assert get_hash(first, {first.a, first.b, first.out0, first.out1}) != get_hash(
+            second, {second.a, second.b, second.out0, second.out1}
+        )
+
+    def test_csr_names_and_strings(self):
+        # the submodules are renumbered in this design
+        source = convert(Top(("b", "a"))).main_source
+        csrs = "wire csrbank0_value0_re;\nwire csrbank0_value1_re;\nassign csrbank0_value0_re = o[1];\nassign csrbank0_value1_re = o[0];"
+        source = source.replace("assign adr = o;", "assign adr = o;\n" + csrs)
+        normalized = normalize_verilog(source.replace('"mem.init"', '"leaf1_mem.init"'))
+        # the register map refers to CSRs by name, and data files are hashed under their original name
+        assert "assign csrbank0_value0_re = o[1];" in normalized
+        assert '"leaf1_mem.init"' in normalized
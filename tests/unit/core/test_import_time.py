@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+
+# generous budget for `import pypga.core` on a slow CI machine, the typical value is well below
+IMPORT_TIME_BUDGET = 1.5
+
+# modules that must only be loaded once they are actually needed
+LAZY_MODULES = [
+    "graphviz",
+    "misoc",
+    "paramiko",
+    "scp",
+    "pypga.boards",
+    "pypga.core.builder",
+    "pypga.core.interface.remote.interface",
+    "pypga.core.toolchain",
+    "pypga.modules",
+]
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import pypga.core
+from pypga.core import Module, TopModule, NumberRegister, logic
+duration = time.perf_counter() - start
+print(json.dumps({"duration": duration, "modules": sorted(sys.modules)}))
+"""
+
+
+def test_import_time():
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+    loaded = [name for name in LAZY_MODULES if name in result["modules"]]
+    assert loaded == []
+    assert result["duration"] < IMPORT_TIME_BUDGET
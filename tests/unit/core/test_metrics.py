@@ -0,0 +1,130 @@
+import inspect
+import json
+
+import pytest
+
+from pypga.core.metrics import (
+    METRICS_FILENAME,
+    MetricsRegistry,
+    parse_timing_paths,
+    parse_timing_summary,
+    parse_utilization_report,
+)
+
+UTILIZATION_REPORT = inspect.cleandoc(
+    """
+    1. Slice Logic
+    --------------
+
+    +----------------------------+------+-------+-----------+-------+
+    |          Site Type         | Used | Fixed | Available | Util% |
+    +----------------------------+------+-------+-----------+-------+
+    | Slice LUTs                 | 1760 |     0 |     17600 | 10.00 |
+    |   LUT as Logic             | 1700 |     0 |     17600 |  9.66 |
+    | Slice Registers            | 3520 |     0 |     35200 | 10.00 |
+    +----------------------------+------+-------+-----------+-------+
+
+    3. Memory
+    ---------
+
+    +----------------+------+-------+-----------+-------+
+    |    Site Type   | Used | Fixed | Available | Util% |
+    +----------------+------+-------+-----------+-------+
+    | Block RAM Tile |  1.5 |     0 |        60 |  2.50 |
+    +----------------+------+-------+-----------+-------+
+
+    4. DSP
+    ------
+
+    +-----------+------+-------+-----------+-------+
+    | Site Type | Used | Fixed | Available | Util% |
+    +-----------+------+-------+-----------+-------+
+    | DSPs      |    4 |     0 |        80 |  5.00 |
+    +-----------+------+-------+-----------+-------+
+    """
+)
+
+TIMING_SUMMARY_REPORT = """\
+------------------------------------------------------------------------------------------------
+| Design Timing Summary
+| ---------------------
+------------------------------------------------------------------------------------------------
+
+    WNS(ns)      TNS(ns)  TNS Failing Endpoints  TNS Total Endpoints      WHS(ns)      THS(ns)  THS Failing Endpoints  THS Total Endpoints     WPWS(ns)     TPWS(ns)  TPWS Failing Endpoints  TPWS Total Endpoints
+    -------      -------  ---------------------  -------------------      -------      -------  ---------------------  -------------------     --------     --------  ----------------------  --------------------
+     -0.250       -1.500                     12                 5000        0.040        0.000                      0                 5000        3.000        0.000                       0                  2000
+
+
+Timing constraints are not met.
+
+
+------------------------------------------------------------------------------------------------
+| Clock Summary
+| -------------
+------------------------------------------------------------------------------------------------
+
+Clock         Waveform(ns)       Period(ns)      Frequency(MHz)
+-----         ------------       ----------      --------------
+clk_adc       {0.000 4.000}      8.000           125.000
+clk_fpga_0    {0.000 4.000}      8.000           125.000
+clk_feedback  {0.000 4.000}      8.000           125.000
+
+
+------------------------------------------------------------------------------------------------
+| Intra Clock Table
+| -----------------
+------------------------------------------------------------------------------------------------
+
+Clock             WNS(ns)      TNS(ns)  TNS Failing Endpoints  TNS Total Endpoints      WHS(ns)      THS(ns)  THS Failing Endpoints  THS Total Endpoints     WPWS(ns)     TPWS(ns)  TPWS Failing Endpoints  TPWS Total Endpoints
+-----             -------      -------  ---------------------  -------------------      -------      -------  ---------------------  -------------------     --------     --------  ----------------------  --------------------
+clk_adc            -0.250       -1.500                     12                 4000        0.040        0.000                      0                 4000        3.000        0.000                       0                  1500
+clk_fpga_0          2.000        0.000                      0                 1000        0.100        0.000                      0                 1000        3.000        0.000                       0                   500
+clk_feedback                                                                                                                                                   6.000        0.000                       0                     2
+"""
+
+TIMING_PATHS_REPORT = inspect.cleandoc(
+    """
+    Startpoint                      Endpoint                        Slack(ns)
+    -------------------------------------------------------------------------
+    top_daq_oldsum_reg[3]/C         top_daq_average_value_reg[13]/D    -0.250
+    top_daq_count_reg[0]/C          top_daq_count_reg[19]/D             1.100
+    """
+)
+
+
+def test_parse_utilization_report():
+    utilization = parse_utilization_report(UTILIZATION_REPORT)
+    assert utilization["lut"] == {"used": 1760, "available": 17600, "percent": 10.0}
+    assert utilization["ff"]["used"] == 3520
+    assert utilization["bram"]["used"] == 1.5
+    assert utilization["dsp"]["used"] == 4
+
+
+def test_parse_timing_summary():
+    timing = parse_timing_summary(TIMING_SUMMARY_REPORT)
+    assert timing["wns"] == -0.25
+    assert timing["tns"] == -1.5
+    assert timing["tns_failing_endpoints"] == 12
+    assert timing["whs"] == 0.04
+    assert timing["clocks"]["clk_adc"]["fmax"] == pytest.approx(1e3 / 8.25)
+    assert timing["clocks"]["clk_fpga_0"]["fmax"] == pytest.approx(1e3 / 6.0)
+    assert "fmax" not in timing["clocks"]["clk_feedback"]
+
+
+def test_parse_timing_paths():
+    paths = parse_timing_paths(TIMING_PATHS_REPORT)
+    assert len(paths) == 2
+    assert paths[0]["endpoint"] == "top_daq_average_value_reg[13]/D"
+    assert paths[0]["slack"] == -0.25
+
+
+def test_registry(tmp_path):
+    for hash_, time, wns in [("b", "2024-02-01", 0.5), ("a", "2024-01-01", -0.25)]:
+        path = tmp_path / "stemlab125_14" / "DaqTest" / hash_
+        path.mkdir(parents=True)
+        with (path / METRICS_FILENAME).open("w") as f:
+            json.dump({"time": time, "timing": {"wns": wns}}, f)
+    registry = MetricsRegistry(result_path=tmp_path)
+    assert registry.history("timing.wns", module="DaqTest") == [("2024-01-01", -0.25), ("2024-02-01", 0.5)]
+    assert registry.history("timing.wns", module="OtherModule") == []
+    assert registry.history("utilization.dsp.used") == []
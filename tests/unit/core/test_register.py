@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from pypga.core import FixedPointRegister, Module, NumberRegister
+
+
+class RamInterface:
+    """Serves reads from RAM out of a byte array, like the server on the board."""
+
+    def __init__(self, ram: np.ndarray):
+        self.ram = ram
+
+    def read_from_ram(self, offset: int, length: int) -> np.ndarray:
+        return self.ram[offset : offset + 4 * length].view(np.uint32)
+
+
+def RamModule(ram_sample_width):
+    class _RamModule(Module):
+        data: NumberRegister(width=14, depth=11, readonly=True, ram_offset=64, ram_sample_width=ram_sample_width)
+        scaled: FixedPointRegister(
+            width=14, depth=11, readonly=True, decimals=13, ram_offset=64, ram_sample_width=ram_sample_width
+        )
+
+    return _RamModule
+
+
+@pytest.mark.parametrize("ram_sample_width", [16, 32, 64])
+def test_unpacking(ram_sample_width):
+    values = np.arange(-5, 6) * 700
+    ram = np.zeros(256, dtype=np.uint8)
+    dtype = {16: np.int16, 32: np.int32, 64: np.int64}[ram_sample_width]
+    ram[64 : 64 + values.size * ram_sample_width // 8] = values.astype(dtype).view(np.uint8)
+    module = RamModule(ram_sample_width)(interface=RamInterface(ram))
+    assert np.array_equal(module.data, values)
+    assert np.allclose(module.scaled, values / (2**13 - 1))
+
+
+class WritableRamInterface(RamInterface):
+    def write_to_ram(self, offset: int, values: np.ndarray):
+        self.ram[offset : offset + 4 * len(values)] = np.asarray(values, dtype=np.uint32).view(np.uint8)
+
+
+def WritableRamModule(ram_sample_width):
+    class _WritableRamModule(Module):
+        data: NumberRegister(width=14, depth=11, readonly=False, ram_offset=64, ram_sample_width=ram_sample_width)
+        scaled: FixedPointRegister(
+            width=14, depth=11, readonly=False, decimals=13, ram_offset=64, ram_sample_width=ram_sample_width
+        )
+
+    return _WritableRamModule
+
+
+@pytest.mark.parametrize("ram_sample_width", [16, 32, 64])
+def test_write_to_ram(ram_sample_width, caplog):
+    ram = np.zeros(256, dtype=np.uint8)
+    module = WritableRamModule(ram_sample_width)(interface=WritableRamInterface(ram))
+    values = np.arange(-5, 6) * 700
+    module.data = values
+    assert np.array_equal(module.data, values)
+    # the scaled values saturate with a single warning each way
+    scaled = np.linspace(-1.5, 1.5, 11)
+    module.scaled = scaled
+    assert np.allclose(module.scaled, np.clip(scaled, -1, 1), atol=1 / (2**13 - 1))
+    assert caplog.text.count("saturation") == 2
+    # and are converted like by from_python
+    register = type(module).scaled
+    values = np.linspace(-1.2, 1.2, 101)
+    assert list(register._from_python_array(values)) == [register.from_python(v) for v in values]
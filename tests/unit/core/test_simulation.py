@@ -0,0 +1,129 @@
+import shutil
+
+import numpy as np
+import pytest
+from migen import If, Module, Signal
+
+from pypga.core.simulation import _parse_samples, run_icarus, run_migen
+
+
+class Accumulator(Module):
+    def __init__(self):
+        self.input = Signal((8, True))
+        self.clear = Signal()
+        self.sum = Signal((16, True))
+        self.sync += If(self.clear, self.sum.eq(0)).Else(self.sum.eq(self.sum + self.input))
+
+
+QUERY = {
+    "input": lambda i: i % 7 - 3,
+    "clear": {0: 0, 20: 1, 21: 0},
+    "sum": None,
+}
+
+
+def expected_sum(num_steps):
+    sums = [0]
+    for i in range(num_steps - 1):
+        sums.append(0 if i == 21 else sums[-1] + ((i - 1) % 7 - 3 if i > 0 else 0))
+    return sums
+
+
+class TestMigenBackend:
+    def test_results(self):
+        result = run_migen(Accumulator(), 30, QUERY)
+        assert len(result) == 30
+        # stimuli take effect one cycle after they are set
+        assert list(result["input"][:3]) == [0, -3, -2]
+        assert list(result["sum"]) == expected_sum(30)
+
+    def test_step(self):
+        result = run_migen(Accumulator(), 30, QUERY)
+        t, value = result.step("sum")
+        assert list(t[:4]) == [0, 1, 1, 2]
+        assert list(value[::2]) == expected_sum(30)
+        t, results = result
+        assert np.array_equal(results["sum"], value)
+
+    def test_signal_dependent_stimulus(self):
+        query = {"sum": None, "input": lambda i, sum: 1 if sum < 5 else 0}
+        result = run_migen(Accumulator(), 20, query)
+        # the input is only cleared one cycle after the sum has reached 5
+        assert result["sum"][-1] == 6
+
+    def test_array_stimuli(self, tmp_path):
+        samples = np.array([i % 7 - 3 for i in range(30)])
+        np.save(tmp_path / "samples.npy", samples)
+        expected = run_migen(Accumulator(), 30, QUERY)["sum"]
+        for stimulus in [samples, list(samples), iter(samples), tmp_path / "samples.npy", str(tmp_path / "samples.npy")]:
+            result = run_migen(Accumulator(), 30, {**QUERY, "input": stimulus})
+            assert np.array_equal(result["sum"], expected)
+
+    def test_short_array(self):
+        result = run_migen(Accumulator(), 10, {"input": np.ones(3, dtype=int), "sum": None})
+        # the last value of the array is held by the signal
+        assert list(result["input"]) == [0] + [1] * 9
+        assert result["sum"][-1] == 8
+
+
+class TestIcarusBackend:
+    def test_signal_dependent_stimulus(self):
+        with pytest.raises(ValueError):
+            run_icarus(Accumulator(), 20, {"sum": None, "input": lambda i, sum: 1})
+
+    @pytest.mark.skipif(shutil.which("iverilog") is None, reason="Icarus Verilog is not installed")
+    def test_same_as_migen(self, tmp_path):
+        query = {**QUERY, "clear": iter([0] * 20 + [1, 0])}
+        icarus = run_icarus(Accumulator(), 30, query, build_dir=tmp_path)
+        migen = run_migen(Accumulator(), 30, QUERY)
+        for key in QUERY:
+            assert np.array_equal(icarus[key], migen[key])
+
+
+class Wide(Module):
+    def __init__(self):
+        self.value = Signal((72, True), reset=-(2**70))
+        self.sync += self.value.eq(self.value + 2**66)
+
+
+class TestWideSignals:
+    def test_parse_samples(self):
+        column = _parse_samples(np.array([str(2**71), "x", "5"]), Signal((72, True)))
+        assert list(column) == [-(2**71), 0, 5]
+        assert all(isinstance(value, int) for value in column)
+
+    @pytest.mark.skipif(shutil.which("iverilog") is None, reason="Icarus Verilog is not installed")
+    def test_same_as_migen(self, tmp_path):
+        # signals of 64 bits and more are returned as Python integers by both backends
+        icarus = run_icarus(Wide(), 40, {"value": None}, build_dir=tmp_path)
+        migen = run_migen(Wide(), 40, {"value": None})
+        assert list(icarus["value"]) == list(migen["value"])
+        assert min(icarus["value"]) < 0 < max(icarus["value"])
+
+
+class Outer(Module):
+    def __init__(self):
+        self.submodules.accumulator = Accumulator()
+        self.doubled = Signal(17)
+        self.comb += self.doubled.eq(self.accumulator.sum << 1)
+
+
+class TestWaveform:
+    def test_vcd(self, tmp_path):
+        filename = tmp_path / "waveform.vcd"
+        run_migen(Outer(), 30, {"accumulator.input": lambda i: 1, "doubled": None}, waveform=filename)
+        vcd = filename.read_text()
+        assert "$scope module accumulator $end" in vcd
+        assert "$var wire 16 " in vcd
+        # one timestamp per cycle in which a signal changes, and one marking the end
+        timestamps = [line for line in vcd.splitlines() if line.startswith("#")]
+        assert len(timestamps) == 31
+
+    def test_trace(self, tmp_path):
+        filename = tmp_path / "waveform.vcd"
+        run_migen(Outer(), 10, {"doubled": None}, waveform=filename, trace=["accumulator.s*"])
+        definitions = filename.read_text().split("$enddefinitions")[0]
+        assert definitions.count("$var") == 1
+        assert " sum $end" in definitions
+        with pytest.raises(ValueError):
+            run_migen(Outer(), 10, {"doubled": None}, waveform=filename, trace=["unknown"])
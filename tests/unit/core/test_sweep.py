@@ -0,0 +1,43 @@
+import numpy as np
+
+from pypga.core import Module, NumberRegister, Signal, logic
+from pypga.core.sweep import sweep
+
+
+def Scaler(factor: int = 1):
+    class _Scaler(Module):
+        offset: NumberRegister(width=8, default=0)
+
+        @logic
+        def _scale(self):
+            self.input = Signal((8, True))
+            self.output = Signal((16, True))
+            self.sync += self.output.eq(self.input * factor + self.offset)
+
+    return _Scaler
+
+
+def random_input(rng, offset, **params):
+    return {"offset": {0: offset}, "input": rng.integers(-100, 100, 20), "output": None}
+
+
+class TestSweep:
+    grid = {"factor": [1, 2, 3], "offset": [0, 5]}
+
+    def test_stacked(self):
+        result = sweep(Scaler, self.grid, random_input, 20, processes=1)
+        assert result["output"].shape == (3, 2, 20)
+        assert result["input"].shape == (3, 2, 20)
+        for i, factor in enumerate(self.grid["factor"]):
+            for j, offset in enumerate(self.grid["offset"]):
+                expected = result["input"][i, j, 1:-1] * factor + offset
+                assert np.array_equal(result["output"][i, j, 3:], expected[1:])
+
+    def test_deterministic(self):
+        first = sweep(Scaler, self.grid, random_input, 20, processes=1, seed=1)
+        second = sweep(Scaler, self.grid, random_input, 20, processes=2, seed=1)
+        assert np.array_equal(first["output"], second["output"])
+        # each combination receives a different random stimulus
+        assert not np.array_equal(first["input"][0, 0], first["input"][1, 0])
+        third = sweep(Scaler, self.grid, random_input, 20, processes=1, seed=2)
+        assert not np.array_equal(first["input"], third["input"])
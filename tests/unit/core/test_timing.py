@@ -0,0 +1,74 @@
+from migen import ClockDomain, If, Module, Signal
+
+from pypga.core.timing import estimate_timing
+
+
+class Average(Module):
+    """The division of the DAQ by multiplication with the inverse, optionally pipelined."""
+
+    def __init__(self, pipelined=False):
+        self.sum = Signal((34, True))
+        self.inverse = Signal(32)
+        self.average = Signal((14, True))
+        if pipelined:
+            self.sum_low = Signal((18, True))
+            self.sum_high = Signal((17, True))
+            self.product_low = Signal((50, True))
+            self.product_high = Signal((50, True))
+            self.sync += [
+                self.sum_low.eq(self.sum[:17]),
+                self.sum_high.eq(self.sum[17:]),
+                self.product_low.eq(self.sum_low * self.inverse[:16]),
+                self.product_high.eq(self.sum_high * self.inverse[:16]),
+                self.average.eq(((self.product_high << 17) + self.product_low) >> 16),
+            ]
+        else:
+            self.sync += self.average.eq((self.sum * self.inverse) >> 16)
+
+
+class TestEstimateTiming:
+    def test_wide_multiplication(self):
+        report = estimate_timing(Average())
+        [violation] = report.violations
+        assert violation.domain == "sys"
+        assert violation.names == ["sum", "average"]
+        assert violation.operators[0] == "*34x32"
+        assert violation.slack < 0
+        assert "average" in report.report()
+
+    def test_pipelined(self):
+        report = estimate_timing(Average(pipelined=True))
+        assert report.violations == []
+        assert report.paths[0].slack > 0
+
+    def test_clock_periods(self):
+        report = estimate_timing(Average(pipelined=True), clock_periods={"sys": 4.0})
+        assert report.violations
+        assert report.critical[: len(report.violations)] == report.violations
+
+    def test_domains(self):
+        class Counters(Module):
+            def __init__(self):
+                self.clock_domains.cd_fast = ClockDomain()
+                self.enable = Signal()
+                self.slow = Signal(8)
+                self.fast = Signal(64)
+                self.sync += If(self.enable, self.slow.eq(self.slow + 1))
+                self.sync.fast += self.fast.eq(self.fast + 1)
+
+        report = estimate_timing(Counters(), clock_periods={"fast": 2.0})
+        assert [path.names for path in report.domain("sys")] == [["slow", "slow"]]
+        [fast] = report.domain("fast")
+        assert fast.period == 2.0 and fast.slack < 0
+        assert fast.logic_levels == 1
+
+    def test_power_of_two(self):
+        class Scale(Module):
+            def __init__(self):
+                self.input = Signal(32)
+                self.output = Signal(40)
+                self.sync += self.output.eq(self.input * 256)
+
+        [path] = estimate_timing(Scale()).paths
+        assert path.operators == ["*32x9"]
+        assert path.slack > 7
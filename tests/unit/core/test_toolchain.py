@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+
+from pypga.core.toolchain import FakeToolchain, VivadoToolchain, get_toolchain
+
+
+class DummySoc:
+    """Mimics ``SoCCore.build`` by writing a Verilog file to the build folder."""
+
+    def __init__(self, verilog):
+        self.verilog = verilog
+
+    def build(self, build_dir, build_name="top", run=True):
+        assert not run
+        (build_dir / f"{build_name}.v").write_text(self.verilog)
+
+
+class TestGetToolchain:
+    def test_by_name(self):
+        assert isinstance(get_toolchain("fake"), FakeToolchain)
+        assert isinstance(get_toolchain("vivado"), VivadoToolchain)
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            get_toolchain("unknown")
+
+
+class TestFakeToolchain:
+    def run(self, path, verilog):
+        path.mkdir()
+        toolchain = FakeToolchain()
+        toolchain.generate(DummySoc(verilog), path)
+        toolchain.run(path)
+        return toolchain
+
+    def test_artifacts(self, tmp_path):
+        toolchain = self.run(tmp_path / "build", "module top(); endmodule")
+        assert (tmp_path / "build" / "bitstream.bin").is_file()
+        assert (tmp_path / "build" / "top_post_route_timing.rpt").is_file()
+        assert toolchain.timing_constraints_met(tmp_path / "build")
+
+    def test_deterministic(self, tmp_path):
+        self.run(tmp_path / "a", "module top(); endmodule")
+        self.run(tmp_path / "b", "module top(); endmodule")
+        self.run(tmp_path / "c", "module top(input x); endmodule")
+        a, b, c = [(tmp_path / p / "bitstream.bin").read_bytes() for p in "abc"]
+        assert a == b
+        assert a != c
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="the fake vivado is a shell script")
+class TestVivadoToolchain:
+    @pytest.fixture
+    def vivado(self, tmp_path, monkeypatch):
+        """Puts a fake vivado on the path that records its arguments and locale and exits with ``status``."""
+        bin_path = tmp_path / "bin"
+        bin_path.mkdir()
+        monkeypatch.setenv("PATH", f"{bin_path}{os.pathsep}{os.environ['PATH']}")
+
+        def install(status):
+            script = bin_path / "vivado"
+            script.write_text(f'#!/bin/sh\necho "$LC_ALL $*" > vivado_call.txt\nexit {status}\n')
+            script.chmod(0o755)
+
+        return install
+
+    def test_run(self, tmp_path, vivado):
+        vivado(status=0)
+        VivadoToolchain().run(tmp_path)
+        # migen's build script is generated and run in the build folder
+        assert (tmp_path / "build_top.sh").is_file()
+        assert (tmp_path / "vivado_call.txt").read_text().strip() == "C -mode batch -source top.tcl"
+
+    def test_failure(self, tmp_path, vivado):
+        vivado(status=1)
+        cwd = os.getcwd()
+        with pytest.raises(OSError):
+            VivadoToolchain().run(tmp_path)
+        assert os.getcwd() == cwd
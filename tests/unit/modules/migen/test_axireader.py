@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("migen_axi")
+
+from migen import Signal, run_simulation  # noqa: E402
+
+from pypga.core.axi_model import RAM_START, SimAxiSoc  # noqa: E402
+from pypga.modules.migen.axireader import MigenAxiReader  # noqa: E402
+
+
+class TestMigenAxiReader:
+    def simulate(self, soc, length, cycles, read_every=1, reset_at=(), **kwargs):
+        beats = Signal(32, reset=length)
+        re = Signal()
+        reset = Signal()
+        dut = MigenAxiReader(address=RAM_START, length=beats, re=re, reset=reset, axi_hp=soc.ps7.s_axi_hp0, **kwargs)
+        received = []
+        status = {}
+
+        def stimulus():
+            # prefetch before the first read
+            for _ in range(100):
+                yield
+            for cycle in range(cycles):
+                read = cycle % read_every == 0
+                yield re.eq(read)
+                yield reset.eq(cycle in reset_at)
+                yield
+                # the beat in data is consumed at the next edge
+                if read and (yield dut.valid):
+                    received.append((yield dut.data))
+                if cycle in reset_at:
+                    received.append(None)
+            yield re.eq(0)
+            yield
+            for name in ("underflow", "error"):
+                status[name] = (yield getattr(dut, name))
+
+        run_simulation(dut, [stimulus(), *soc.sim_generators()])
+        return received, status
+
+    def ram(self, soc, words):
+        values = np.arange(words, dtype=np.uint64) * 7 + 3
+        soc.write_to_ram(0, values.view(np.uint32))
+        return values
+
+    @pytest.mark.parametrize("length", [16, 37])
+    def test_repeat(self, length):
+        soc = SimAxiSoc()
+        values = self.ram(soc, 64)
+        received, status = self.simulate(soc, length, cycles=3 * length)
+        assert status == {"underflow": 0, "error": 0}
+        # the stream is read at one beat per cycle and wraps around after length beats
+        assert received == [int(values[i % length]) for i in range(3 * length)]
+
+    def test_backpressure(self):
+        soc = SimAxiSoc(backpressure=0.3, read_latency=30)
+        values = self.ram(soc, 1000)
+        received, status = self.simulate(soc, 1000, cycles=4000, read_every=2, fifo_depth=128)
+        # the FIFO covers the latency of the reads, the port sustains a beat every other cycle
+        assert status == {"underflow": 0, "error": 0}
+        assert received == [int(values[i % 1000]) for i in range(2000)]
+        assert soc.hp[0].read_beats >= 2000
+
+    def test_reset(self):
+        soc = SimAxiSoc(read_latency=10)
+        values = self.ram(soc, 100)
+        received, status = self.simulate(soc, 100, cycles=200, reset_at=(50,))
+        restart = received.index(None)
+        assert received[:restart] == [int(v) for v in values[:restart]]
+        # the beats in flight at the reset are discarded, and the stream restarts at its first beat
+        assert received[restart + 1 :] == [int(v) for v in values[: len(received) - restart - 1]]
+        # reading while the FIFO refills underflows
+        assert status["underflow"] == 1
+
+    def test_out_of_range(self):
+        soc = SimAxiSoc(ram_size=64 * 8)
+        received, status = self.simulate(soc, 100, cycles=100)
+        assert status["error"] == 1
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("migen_axi")
+
+from migen import Signal, run_simulation  # noqa: E402
+
+from pypga.core.axi_model import RAM_START, SimAxiSoc  # noqa: E402
+from pypga.modules.migen.axiwriter import MigenAxiWriter  # noqa: E402
+
+
+class TestMigenAxiWriter:
+    samples = 1024
+
+    def simulate(self, soc, addresses, values, we=None, reset_at=(), **kwargs):
+        address = Signal(32)
+        data = Signal(64)
+        write = Signal()
+        reset = Signal()
+        dut = MigenAxiWriter(address=address, data=data, we=write, reset=reset, axi_hp=soc.ps7.s_axi_hp0, **kwargs)
+        status = {}
+
+        def stimulus():
+            for i, (a, v) in enumerate(zip(addresses, values)):
+                yield address.eq(int(a))
+                yield data.eq(int(v))
+                yield write.eq(1 if we is None else int(we[i]))
+                yield reset.eq(i in reset_at)
+                yield
+            yield write.eq(0)
+            yield reset.eq(0)
+            for _ in range(1000):
+                yield
+                if (yield dut.idle):
+                    break
+            for name in ("idle", "overflow", "error", "beats_written"):
+                status[name] = (yield getattr(dut, name))
+
+        run_simulation(dut, [stimulus(), *soc.sim_generators()])
+        return status
+
+    def test_sustained_throughput(self):
+        soc = SimAxiSoc()
+        values = np.arange(self.samples) * 3 + 1
+        status = self.simulate(soc, RAM_START + 8 * np.arange(self.samples), values)
+        assert status == {"idle": 1, "overflow": 0, "error": 0, "beats_written": self.samples}
+        assert np.array_equal(soc.read_from_ram(0, 2 * self.samples).view(np.uint64), values)
+        hp = soc.hp[0]
+        assert hp.bursts == self.samples // 16
+        # one sample per cycle at 125 MHz is 1 GB/s
+        assert hp.throughput > 7.5
+        assert hp.statistics()["throughput_bytes_per_second"] > 0.9e9
+
+    def test_backpressure(self):
+        soc = SimAxiSoc(backpressure=0.3, address_latency=5, response_latency=10)
+        values = np.arange(self.samples) + 100
+        # sample every other cycle, which the port sustains despite backpressure
+        we = np.arange(2 * self.samples) % 2 == 0
+        addresses = RAM_START + 8 * np.repeat(np.arange(self.samples), 2)
+        status = self.simulate(soc, addresses, np.repeat(values, 2), we=we)
+        assert status == {"idle": 1, "overflow": 0, "error": 0, "beats_written": self.samples}
+        assert np.array_equal(soc.read_from_ram(0, 2 * self.samples).view(np.uint64), values)
+        assert soc.hp[0].w_stall_cycles > 0
+
+    def test_overflow(self):
+        soc = SimAxiSoc(backpressure=0.9)
+        status = self.simulate(soc, RAM_START + 8 * np.arange(256), np.arange(256), fifo_depth=16)
+        assert status["overflow"] == 1
+
+    def test_scattered_addresses(self):
+        soc = SimAxiSoc()
+        # non-consecutive samples and a 4 kB boundary split the bursts
+        offsets = np.array([0, 8, 16, 800, 808, 4096 - 8, 4096, 4104, 24])
+        values = np.arange(len(offsets)) + 1
+        status = self.simulate(soc, RAM_START + offsets, values, burst_length=4)
+        assert status["idle"] == 1
+        ram = soc.read_from_ram(0, 2 * 1024).view(np.uint64)
+        assert list(ram[offsets // 8]) == list(values)
+        assert soc.hp[0].bursts == 5
+        assert soc.hp[0].errors == 0
+
+    @pytest.mark.parametrize("burst_length", [1, 2, 16])
+    def test_burst_length(self, burst_length):
+        soc = SimAxiSoc()
+        values = np.arange(40) + 7
+        self.simulate(soc, RAM_START + 8 * np.arange(40), values, burst_length=burst_length)
+        assert np.array_equal(soc.read_from_ram(0, 80).view(np.uint64), values)
+        assert soc.hp[0].bursts == -(-40 // burst_length)
+
+    def test_reset_with_outstanding_responses(self):
+        soc = SimAxiSoc(response_latency=50)
+        # a burst is written, and the writer is reset before its response arrives
+        we = np.concatenate([np.ones(16), np.zeros(30), np.ones(8)])
+        addresses = RAM_START + 8 * np.concatenate([np.arange(16), np.zeros(30), np.arange(8)])
+        status = self.simulate(soc, addresses, np.arange(len(we)), we=we, reset_at=(40,))
+        assert soc.hp[0].bursts == 2
+        # only the beats queued after the reset are counted
+        assert status == {"idle": 1, "overflow": 0, "error": 0, "beats_written": 8}
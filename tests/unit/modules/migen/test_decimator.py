@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from migen import Memory, Module, Signal, run_simulation
+
+from pypga.modules.migen.decimator import MigenCicDecimator, MigenFirFilter
+
+
+class Cic(Module):
+    def __init__(self, rate, stages):
+        self.input = Signal((14, True))
+        self.strobe = Signal()
+        self.submodules.cic = MigenCicDecimator(self.input, self.strobe, rate=rate, stages=stages, max_rate_bits=8)
+
+
+def run_cic(rate, stages, values):
+    dut = Cic(rate, stages)
+    outputs = []
+
+    def stimulus():
+        for cycle, value in enumerate(values):
+            yield dut.input.eq(int(value))
+            yield dut.strobe.eq(cycle % rate == rate - 1)
+            yield
+            if (yield dut.cic.out_strobe):
+                outputs.append((yield dut.cic.out))
+
+    run_simulation(dut, stimulus())
+    return np.array(outputs)
+
+
+@pytest.mark.parametrize("rate, gain", [(8, 1), (6, (6 / 8) ** 3)])
+def test_cic_gain(rate, gain):
+    outputs = run_cic(rate, 3, [-1000] * rate * 12)
+    # the output settles after the delay line of each comb is filled
+    assert outputs[4:] == pytest.approx(-1000 * gain, abs=1)
+
+
+def test_cic_alias_rejection():
+    rate = 8
+    cycles = np.arange(rate * 40)
+    # a tone between the zeros of the average at multiples of the output rate aliases into the passband,
+    # the CIC attenuates it more
+    tone = np.round(4000 * np.cos(2 * np.pi * cycles * 1.5 / rate)).astype(int)
+    assert np.max(np.abs(run_cic(rate, 3, tone)[4:])) < np.max(np.abs(run_cic(rate, 1, tone)[4:])) / 4
+
+
+class Fir(Module):
+    def __init__(self, coefficients):
+        self.input = Signal((14, True))
+        self.strobe = Signal()
+        memory = Memory(18, len(coefficients), init=[c & (2**18 - 1) for c in coefficients])
+        port = memory.get_port()
+        self.specials += memory, port
+        coefficient = Signal((18, True))
+        self.comb += coefficient.eq(port.dat_r)
+        self.submodules.fir = MigenFirFilter(self.input, self.strobe, coefficient, taps=len(coefficients), decimals=8)
+        self.comb += port.adr.eq(self.fir.coefficient_index)
+
+
+def test_fir_impulse_response():
+    coefficients = [256, -128, 64, 512, -3]
+    dut = Fir(coefficients)
+    interval = dut.fir.latency
+    impulse = [256] + [0] * 7
+    outputs = []
+
+    def stimulus():
+        for value in impulse:
+            yield dut.input.eq(value)
+            yield dut.strobe.eq(1)
+            yield
+            yield dut.strobe.eq(0)
+            for _ in range(interval):
+                yield
+                if (yield dut.fir.out_strobe):
+                    outputs.append((yield dut.fir.out))
+
+    run_simulation(dut, stimulus())
+    assert outputs == coefficients + [0] * 3
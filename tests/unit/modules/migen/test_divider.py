@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from migen import Signal, run_simulation
+
+from pypga.modules.migen.divider import MigenPipelinedMultiplier, MigenReciprocal
+
+
+def test_reciprocal():
+    divisor = Signal(21)
+    dut = MigenReciprocal(divisor, fraction_bits=34)
+    results = {}
+
+    def stimulus():
+        for value in [2, 3, 7, 10, 1000, 2**20 + 1]:
+            yield divisor.eq(value)
+            yield
+            yield
+            assert (yield dut.busy)
+            while (yield dut.busy):
+                yield
+            results[value] = yield dut.out
+
+    run_simulation(dut, stimulus())
+    assert results == {value: round(2**34 / value) for value in results}
+
+
+@pytest.mark.parametrize("latency", [3, 5])
+def test_multiplier(latency):
+    a = Signal((34, True))
+    b = Signal(34)
+    dut = MigenPipelinedMultiplier(a, b, latency=latency)
+    rng = np.random.default_rng(0)
+    inputs = [(int(x), int(y)) for x, y in zip(rng.integers(-(2**33), 2**33, 20), rng.integers(0, 2**34, 20))]
+    inputs += [(-(2**33), 2**34 - 1), (2**33 - 1, 2**34 - 1)]
+    outputs = []
+
+    def stimulus():
+        for x, y in inputs + [(0, 0)] * (latency + 1):
+            yield a.eq(x)
+            yield b.eq(y)
+            yield
+            outputs.append((yield dut.out))
+
+    run_simulation(dut, stimulus())
+    # the inputs are applied at the next edge, and their product appears ``latency`` edges later
+    assert outputs[latency : latency + len(inputs)] == [x * y for x, y in inputs]
+
+
+def test_multiplier_latency():
+    with pytest.raises(ValueError):
+        MigenPipelinedMultiplier(Signal((34, True)), Signal(34), latency=2)
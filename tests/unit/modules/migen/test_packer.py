@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from migen import Signal, run_simulation
+
+from pypga.modules.migen.packer import MigenSamplePacker, MigenSampleUnpacker
+
+
+@pytest.mark.parametrize("sample_width", [16, 32, 64])
+@pytest.mark.parametrize("samples", [8, 11])
+def test_packing(sample_width, samples):
+    data = Signal((14, True))
+    we = Signal()
+    index = Signal(16)
+    last = Signal()
+    dut = MigenSamplePacker(data=data, we=we, index=index, last=last, sample_width=sample_width)
+    values = np.random.default_rng(0).integers(-(2**13), 2**13, samples)
+    words = {}
+
+    def stimulus():
+        for i, value in enumerate(values):
+            yield data.eq(int(value))
+            yield index.eq(i)
+            yield last.eq(i == samples - 1)
+            yield we.eq(1)
+            yield
+            if (yield dut.out_we):
+                words[(yield dut.out_index)] = (yield dut.out)
+            # samples do not need to arrive in consecutive cycles
+            yield we.eq(0)
+            yield
+
+    run_simulation(dut, stimulus())
+    lanes = 64 // sample_width
+    assert sorted(words) == list(range(-(-samples // lanes)))
+    memory = np.array([words[i] for i in sorted(words)], dtype=np.uint64)
+    unpacked = memory.view(np.int16 if sample_width == 16 else np.int32)
+    if sample_width == 64:
+        unpacked = unpacked[::2]
+    assert np.array_equal(unpacked[:samples], values)
+
+
+def test_invalid_width():
+    with pytest.raises(ValueError):
+        MigenSamplePacker(data=Signal(8), we=Signal(), index=Signal(8), sample_width=24)
+
+
+@pytest.mark.parametrize("sample_width", [16, 32, 64])
+def test_unpacking(sample_width):
+    samples = 11
+    lanes = 64 // sample_width
+    values = np.random.default_rng(0).integers(-(2**13), 2**13, samples)
+    # the words of the sequence, whose last one is incomplete
+    memory = np.zeros(-(-samples // lanes) * lanes, dtype=np.int16 if sample_width == 16 else np.int64)
+    memory[:samples] = values
+    if sample_width == 32:
+        memory = memory.astype(np.int32)
+    words = memory.view(np.uint64)
+    data = Signal(64)
+    next = Signal()
+    dut = MigenSampleUnpacker(data=data, next=next, length=Signal(8, reset=samples), sample_width=sample_width, signed=True)
+    unpacked = []
+
+    def stimulus():
+        word = 0
+        # the sequence is repeated twice
+        for _ in range(2 * samples):
+            yield data.eq(int(words[word % len(words)]))
+            yield next.eq(1)
+            yield
+            unpacked.append((yield dut.out))
+            if (yield dut.re):
+                word += 1
+            yield next.eq(0)
+            yield
+
+    run_simulation(dut, stimulus())
+    assert unpacked == list(values) * 2
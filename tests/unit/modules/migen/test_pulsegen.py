@@ -171,3 +171,21 @@ class TestMigenPulseBurstGenContinuous(TestMigenPulseBurstGenIntPulses):
 @pytest.mark.skip(reason="period of zero is not yet supported")
 class TestMigenPulseBurstGenIntPulsesFast(TestMigenPulseBurstGenIntPulses):
     period = 0  # actual period is two clock cycles more than the setting
+
+
+def test_burst_timestamp():
+    trigger = Signal(1, reset=False)
+    dut = MigenPulseBurstGen(trigger=trigger, pulses=2, period=1, timestamp_width=64)
+    starts = []
+
+    def stimulus():
+        for cycle in range(40):
+            # a trigger during a burst is ignored, a trigger at its end starts the next one
+            yield trigger.eq(cycle in (5, 7, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29))
+            yield
+            if (yield dut.out) and (yield dut.count) == 2:
+                starts.append((yield dut.timestamp))
+
+    run_simulation(dut, stimulus())
+    # the trigger is applied at the next edge, and the timestamp is the cycle in which it is accepted
+    assert starts == [6, 21, 30]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from migen import Signal, run_simulation
+
+from pypga.modules.migen.trigger import TRIGGER_MODES, MigenDelayLine, MigenTrigger
+
+
+def run_trigger(values, mode, level, hysteresis=0, holdoff=0):
+    input = Signal((14, True))
+    dut = MigenTrigger(input, TRIGGER_MODES[mode], level, hysteresis=hysteresis, holdoff=holdoff)
+    fired = []
+
+    def stimulus():
+        for cycle, value in enumerate(values, start=1):
+            yield input.eq(int(value))
+            yield
+            if (yield dut.out):
+                fired.append(cycle)
+
+    run_simulation(dut, stimulus())
+    return np.array(fired)
+
+
+def test_edges():
+    # a triangle wave between -50 and 49 with a period of 200 cycles
+    values = np.concatenate([np.arange(-50, 50), np.arange(49, -51, -1)] * 3)
+    rising = run_trigger(values, "rising", level=10)
+    falling = run_trigger(values, "falling", level=10)
+    # the input is applied at the next edge, and the trigger fires ``latency`` cycles after it crosses the level
+    assert list(rising) == [61 + 1 + 2 + 200 * i for i in range(3)]
+    assert list(falling) == [140 + 1 + 2 + 200 * i for i in range(3)]
+
+
+def test_levels():
+    values = [0, 0, 20, 20, 20, 20, 20, 0, -20, -20, 0, 0, 0]
+    # the level modes fire every other cycle while the condition holds
+    assert len(run_trigger(values, "above", level=10)) == 3
+    assert len(run_trigger(values, "below", level=-10)) == 1
+    assert len(run_trigger(values, "off", level=-10)) == 0
+
+
+def test_hysteresis():
+    # noise around the level crosses it repeatedly on each rising edge
+    noise = np.tile([0, 3, -3, 4, -2, 2], 5)
+    values = np.concatenate([np.full(20, -100), noise, np.full(20, 100), np.full(20, -100), noise])
+    assert len(run_trigger(values, "rising", level=0)) > 4
+    assert len(run_trigger(values, "rising", level=0, hysteresis=5)) == 2
+
+
+def test_holdoff():
+    values = np.tile(np.repeat([-10, 10], 5), 10)
+    assert len(run_trigger(values, "rising", level=0)) == 10
+    # a holdoff of 25 cycles skips the two following edges
+    assert len(run_trigger(values, "rising", level=0, holdoff=25)) == 4
+
+
+@pytest.mark.parametrize("delay", [2, 5, 16])
+def test_delay_line(delay):
+    input = Signal(8)
+    dut = MigenDelayLine(input, delay, depth=16)
+    outputs = []
+
+    def stimulus():
+        for value in range(40):
+            yield input.eq(value)
+            yield
+            outputs.append((yield dut.out))
+
+    run_simulation(dut, stimulus())
+    # the input is applied at the next edge, after which the output follows ``delay`` edges later
+    assert outputs[delay:] == list(range(40 - delay))
+
+
+def test_delay_line_depth():
+    with pytest.raises(ValueError):
+        MigenDelayLine(Signal(8), 2, depth=12)
@@ -0,0 +1,99 @@
+import time
+
+import numpy as np
+import pytest
+
+from pypga.core import TopModule, logic
+from pypga.modules.awg import Awg
+from pypga.modules.daq import DAQ
+
+
+class Loop(TopModule):
+    awg: Awg(data_depth=16)
+    daq: DAQ(data_depth=16, data_width=14, data_signed=True)
+
+    @logic
+    def _loop(self):
+        # the DAQ acquires the waveform from its first point on
+        self.comb += [
+            self.daq.input.eq(self.awg.out),
+            self.daq.trigger.eq(self.awg.out_trigger),
+        ]
+
+
+@pytest.fixture
+def loop():
+    dut = Loop.run(simulate=True)
+    yield dut
+    dut.stop()
+
+
+def test_trigger_timestamps(loop):
+    with loop._interface.virtual_clock():
+        loop.awg.software_trigger()
+        time.sleep(2e-6)
+        first = loop.awg.trigger_timestamp
+        loop.awg.software_trigger()
+        time.sleep(2e-6)
+    assert loop.awg.trigger_timestamp > first
+    assert loop.awg.trigger_time == loop.awg.trigger_timestamp * 8e-9
+    # the DAQ is triggered by the first point of the waveform, a cycle after the trigger of the AWG
+    assert loop.daq.trigger_timestamp - loop.awg.trigger_timestamp == 1
+    assert loop.daq.trigger_time - loop.awg.trigger_time == pytest.approx(8e-9)
+
+
+def test_wide_bram_data():
+    # the width of the samples in RAM only constrains streaming AWGs
+    class Wide(TopModule):
+        awg: Awg(data_depth=16, data_width=24, data_decimals=23)
+
+    dut = Wide.run(simulate=True)
+    try:
+        waveform = np.linspace(-1, 1, 16)
+        dut.awg.data = waveform
+        assert dut.awg.data == pytest.approx(waveform, abs=2**-23)
+    finally:
+        dut.stop()
+
+
+@pytest.fixture
+def streaming():
+    pytest.importorskip("migen_axi")
+    from pypga.core.axi_model import SimAxiSoc
+
+    class Streaming(TopModule):
+        awg: Awg(data_depth=4096, data_width=14, data_decimals=13, axi_hp_index=1)
+        daq: DAQ(data_depth=64, data_width=14, data_decimals=13, data_signed=True)
+
+        @logic
+        def _loop(self):
+            self.comb += self.daq.input.eq(self.awg.out)
+
+    dut = Streaming.run(simulate=True, sim_soc=SimAxiSoc(read_latency=30, backpressure=0.2))
+    dut.awg.sampling_period_cycles = 8
+    dut.daq.sampling_period_cycles = 8
+    dut.daq.reduce_mode = 3
+    yield dut
+    dut.stop()
+
+
+@pytest.mark.parametrize("points", [37, 20])
+def test_streaming(streaming, points):
+    awg, daq = streaming.awg, streaming.daq
+    waveform = np.random.default_rng(points).integers(-(2**13) + 1, 2**13, points) / (2**13 - 1)
+    awg.upload(waveform)
+    assert awg.length == points
+    assert np.allclose(awg.data[:points], waveform)
+    with streaming._interface.virtual_clock():
+        # the beats of bursts in flight at the rewind are discarded before the first points are prefetched
+        time.sleep(3e-6)
+        awg.always_on = True
+        time.sleep(2e-6)
+        daq.software_trigger()
+        time.sleep(5e-6)
+        awg.always_on = False
+    assert not awg.underflow and not awg.error
+    # the waveform repeats without gaps, starting at some point of it
+    samples = np.round(daq.data[1 : daq.length - 1] * (2**13 - 1)).astype(int)
+    repeated = np.round(np.tile(waveform, 5) * (2**13 - 1)).astype(int)
+    assert any(np.array_equal(samples, repeated[k : k + len(samples)]) for k in range(points))
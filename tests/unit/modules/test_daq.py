@@ -0,0 +1,251 @@
+import time
+
+import numpy as np
+import pytest
+
+from pypga.core import TopModule, logic
+from pypga.modules.daq import DAQ, cic_compensation
+
+
+def _ramp_dut(slope=1, sim_soc=None, **daq_kwargs):
+    """Runs a simulated design whose DAQ acquires a ramp rising by ``slope`` per cycle."""
+
+    class Ramp(TopModule):
+        daq: DAQ(data_width=14, data_decimals=13, data_signed=True, **daq_kwargs)
+
+        @logic
+        def _ramp(self):
+            self.sync += self.daq.input.eq(self.daq.input + slope)
+
+    return Ramp.run(simulate=True, sim_soc=sim_soc)
+
+
+@pytest.fixture
+def ramp_dut():
+    """Returns :func:`_ramp_dut`, stopping the designs it ran after the test."""
+    duts = []
+
+    def run(*args, **kwargs):
+        duts.append(_ramp_dut(*args, **kwargs))
+        return duts[-1]
+
+    yield run
+    for dut in duts:
+        dut.stop()
+
+
+@pytest.fixture
+def ramp(ramp_dut):
+    pytest.importorskip("migen_axi")
+    from pypga.core.axi_model import SimAxiSoc
+
+    dut = ramp_dut(sim_soc=SimAxiSoc(), data_depth=64, axi_hp_index=0, dma_sample_width=16)
+    dut.daq.reduce_mode = 3
+    dut.daq.sampling_period_cycles = 4
+    dut.daq.length = 16
+    return dut
+
+
+def assert_ramp(samples, step):
+    # the difference of consecutive samples of the 14-bit ramp
+    raw = np.round(samples * (2**13 - 1)).astype(int)
+    assert np.all((np.diff(raw) - step) % 2**14 == 0)
+
+
+class TestContinuous:
+    def test_stream(self, ramp):
+        daq = ramp.daq
+        chunks = []
+        with ramp._interface.virtual_clock():
+            for chunk in daq.stream(poll_interval=2e-6):
+                chunks.append(chunk)
+                if sum(len(c) for c in chunks) > 3 * 64:
+                    break
+            assert not daq.continuous
+            time.sleep(1e-6)
+            assert not daq.busy
+        samples = np.concatenate(chunks)
+        assert len(chunks) > 3
+        assert_ramp(samples, step=daq.sampling_period_cycles)
+
+    def test_overrun(self, ramp, caplog):
+        daq = ramp.daq
+        with ramp._interface.virtual_clock():
+            daq.start_continuous()
+            time.sleep(10e-6)
+            samples = daq.read_continuous()
+            daq.stop_continuous()
+        assert len(samples) == 64
+        assert "overran" in caplog.text
+        assert_ramp(samples, step=daq.sampling_period_cycles)
+
+
+@pytest.fixture(params=[None, 0], ids=["bram", "axi"])
+def pingpong(request, ramp_dut):
+    soc = None
+    if request.param is not None:
+        pytest.importorskip("migen_axi")
+        from pypga.core.axi_model import SimAxiSoc
+
+        soc = SimAxiSoc()
+    dut = ramp_dut(sim_soc=soc, data_depth=16, axi_hp_index=request.param, dma_sample_width=16, banks=2)
+    dut.daq.reduce_mode = 3
+    dut.daq.sampling_period_cycles = 4
+    return dut
+
+
+class TestPingPong:
+    def test_alternating_banks(self, pingpong):
+        daq = pingpong.daq
+        first = []
+        with pingpong._interface.virtual_clock():
+            for bank in [0, 1, 0]:
+                daq.software_trigger()
+                # the DAQ acquires length - 1 samples, in chronological order in block RAM and in RAM
+                samples = daq.read_next_bank(poll_interval=1e-7)[: daq.length - 1]
+                assert daq.completed_bank == bank
+                assert_ramp(samples, step=daq.sampling_period_cycles)
+                first.append(samples[0])
+            assert daq.completed_bursts == 3
+        assert first[0] < first[1] < first[2]
+
+    def test_missed(self, pingpong, caplog):
+        daq = pingpong.daq
+        with pingpong._interface.virtual_clock():
+            daq.software_trigger()
+            daq.read_next_bank(poll_interval=1e-7)
+            for _ in range(2):
+                daq.software_trigger()
+                time.sleep(1e-6)
+            daq.read_next_bank()
+            assert "1 acquisition(s)" in caplog.text
+            with pytest.raises(TimeoutError):
+                daq.read_next_bank(timeout=1e-6, poll_interval=1e-7)
+
+
+class TestTraceAveraging:
+    def test_average(self, ramp_dut):
+        dut = ramp_dut(data_depth=16, trace_averaging_bits=4)
+        daq = dut.daq
+        daq.reduce_mode = 3
+        daq.sampling_period_cycles = 4
+        with dut._interface.virtual_clock():
+            traces = []
+            daq.start_averaging(3)
+            for _ in range(4):
+                daq.software_trigger()
+                time.sleep(1e-6)
+                traces.append(daq.traces)
+            average = daq.get_average()
+            assert daq.traces == 3
+            assert traces == [1, 2, 3, 3]
+            # the ramp averaged over the traces, which are offset by the time between triggers
+            # and the DAQ acquires length - 1 samples
+            assert_ramp(average[: daq.length - 1], step=daq.sampling_period_cycles)
+            daq.start_averaging(1)
+            daq.software_trigger()
+            single = daq.get_average(poll_interval=1e-7)
+            assert daq.traces == 1
+            assert np.min(single[: daq.length - 1]) > np.max(average[: daq.length - 1])
+
+
+class TestAverage:
+    @pytest.mark.parametrize("period", [4, 7])
+    def test_average(self, ramp_dut, period):
+        dut = ramp_dut(data_depth=16)
+        daq = dut.daq
+        # no reciprocal register needs to be written along with the sampling period
+        daq.sampling_period_cycles = period
+        with dut._interface.virtual_clock():
+            # the reciprocal of the samples per period is recomputed in the meantime
+            time.sleep(1e-6)
+            daq.software_trigger()
+            time.sleep(1e-6)
+            assert not daq.busy
+            # the DAQ acquires length - 1 samples whose first one averages the samples before the trigger
+            samples = daq.data[1 : daq.length - 1]
+        # the average of each period of the ramp is exact to the last bit
+        assert_ramp(samples, step=period)
+
+    def test_timing(self):
+        report = DAQ(data_depth=1024, data_width=14, data_signed=True).timing_report(omit_csr=False)
+        assert report.violations == []
+
+
+class TestDecimationFilter:
+    def test_cic_fir(self, ramp_dut):
+        dut = ramp_dut(data_depth=16, cic_stages=3, fir_taps=4)
+        daq = dut.daq
+        daq.reduce_mode = 7
+        daq.sampling_period_cycles = 8
+        daq.set_fir_coefficients([0.5, 0.5])
+        assert list(daq.fir_coefficients) == [2**15, 2**15, 0, 0]
+        with dut._interface.virtual_clock():
+            time.sleep(1e-6)
+            daq.software_trigger()
+            time.sleep(2e-6)
+            samples = daq.data[1 : daq.length - 1]
+        # a ramp passes both filters with a unity gain for the power-of-two decimation, once they settled
+        assert_ramp(samples[5:], step=8)
+
+    def test_timing(self):
+        daq = DAQ(data_depth=1024, data_width=14, data_signed=True, cic_stages=3, fir_taps=16)
+        assert daq.timing_report(omit_csr=False).violations == []
+
+
+def test_cic_compensation():
+    coefficients = cic_compensation(15, stages=3)
+    assert np.sum(coefficients) == pytest.approx(1)
+    frequencies = np.linspace(0, 0.15, 10)
+    response = np.abs(np.exp(-2j * np.pi * np.outer(frequencies, np.arange(15))) @ coefficients)
+    # flat passband of the CIC filter followed by the compensation
+    assert response * np.abs(np.sinc(frequencies)) ** 3 == pytest.approx(1, abs=0.02)
+
+
+class TestHardwareTrigger:
+    level = 1000
+    # the 14-bit ramp rises through the level every 2**14 // slope cycles
+    slope = 16
+    ramp_period = 2**14 // slope
+
+    @pytest.fixture
+    def dut(self, ramp_dut):
+        dut = ramp_dut(slope=self.slope, data_depth=16, hardware_trigger=True, pretrigger_depth=64)
+        dut.daq.reduce_mode = 3
+        dut.daq.sampling_period_cycles = 4
+        return dut
+
+    def acquire(self, dut, pretrigger_cycles=0):
+        daq = dut.daq
+        daq.pretrigger_cycles = pretrigger_cycles
+        with dut._interface.virtual_clock():
+            daq.set_trigger("rising", level=self.level / (2**13 - 1))
+            time.sleep(self.ramp_period * 8e-9)
+            daq.set_trigger("off")
+            time.sleep(1e-6)
+            return daq.data[: daq.length - 1], daq.trigger_timestamp
+
+    def test_trigger(self, dut):
+        samples, timestamp = self.acquire(dut)
+        assert_ramp(samples[1:], step=4 * self.slope)
+        # the first sample follows the crossing of the level by a period
+        assert self.level < np.round(samples[1] * (2**13 - 1)) <= self.level + 8 * self.slope
+        # the free-running counter and the ramp both start at zero, the trigger fires 2 cycles after the crossing
+        crossing = self.level // self.slope + 1
+        assert timestamp % self.ramp_period == crossing + 2
+
+    def test_pretrigger(self, dut):
+        samples, timestamp = self.acquire(dut)
+        early_samples, early_timestamp = self.acquire(dut, pretrigger_cycles=20)
+        assert early_timestamp > timestamp
+        assert np.round((samples - early_samples) * (2**13 - 1)).tolist() == [20 * self.slope] * len(samples)
+
+    def test_holdoff(self, dut):
+        dut.daq.set_trigger("above", level=self.level / (2**13 - 1), holdoff=1e-3)
+        assert dut.daq.trigger_holdoff_cycles == 125000
+        with pytest.raises(ValueError):
+            dut.daq.set_trigger("sideways")
+
+    def test_timing(self):
+        daq = DAQ(data_depth=1024, data_width=14, data_signed=True, hardware_trigger=True, pretrigger_depth=1024)
+        assert daq.timing_report(omit_csr=False).violations == []